@@ -0,0 +1,168 @@
+"""
+Content-addressed storage for module section bodies
+Each distinct section body is stored once in module_content_blobs under its
+sha256, gzip-compressed above a size threshold. Sections point at the hash,
+so redeploying unchanged content writes nothing and module content hashes
+double as HTTP ETags.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Tuple
+
+from shared.database.db_models import Module, ModuleContentBlob, ModuleSection
+from .database import db
+
+# Bodies at least this large (bytes) are stored gzip-compressed
+COMPRESS_THRESHOLD = int(os.getenv('SECTION_COMPRESS_THRESHOLD', '2048'))
+
+# Section columns compared on redeploy besides the body hash
+SECTION_FIELDS = ('section_type', 'title', 'media_url', 'duration_seconds')
+
+# Module fields folded into the module content hash
+MODULE_HASH_FIELDS = (
+    'module_id', 'title', 'description', 'category', 'estimated_minutes',
+    'target_audience', 'status', 'tags', 'prerequisites', 'related_modules',
+    'university_id', 'created_by_id',
+)
+
+
+def hash_content(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def encode_body(text: str) -> Tuple[str, bytes]:
+    """(encoding, stored bytes) for a body, compressing only when it pays off"""
+    raw = text.encode('utf-8')
+    if len(raw) >= COMPRESS_THRESHOLD:
+        compressed = gzip.compress(raw, mtime=0)
+        if len(compressed) < len(raw):
+            return 'gzip', compressed
+    return 'identity', raw
+
+
+def store_content(text: str) -> str:
+    """Ensure a blob exists for text and return its hash"""
+    content_hash = hash_content(text)
+    if db.session.get(ModuleContentBlob, content_hash) is None:
+        encoding, body = encode_body(text)
+        db.session.add(ModuleContentBlob(
+            content_hash=content_hash,
+            encoding=encoding,
+            body=body,
+            size=len(text.encode('utf-8'))
+        ))
+    return content_hash
+
+
+def store_contents(bodies: Dict[str, str]) -> None:
+    """Ensure blobs exist for many {content_hash: text} bodies with one lookup"""
+    if not bodies:
+        return
+    existing = {
+        content_hash for (content_hash,) in db.session.query(ModuleContentBlob.content_hash)
+        .filter(ModuleContentBlob.content_hash.in_(list(bodies)))
+    }
+    for content_hash, text in bodies.items():
+        if content_hash not in existing:
+            encoding, body = encode_body(text)
+            db.session.add(ModuleContentBlob(
+                content_hash=content_hash,
+                encoding=encoding,
+                body=body,
+                size=len(text.encode('utf-8'))
+            ))
+
+
+def section_body(section_data: Dict) -> str:
+    """Body text for a section dict; notion_page record maps are stored as JSON"""
+    if section_data.get('section_type') == 'notion_page' and 'record_map' in section_data:
+        return json.dumps(section_data['record_map'], sort_keys=True, separators=(',', ':'))
+    return section_data['content']
+
+
+def module_content_hash(module_data: Dict, section_hashes: Iterable[str]) -> str:
+    """Hash over module metadata and its ordered section hashes"""
+    digest = hashlib.sha256()
+    meta = {field: module_data.get(field) for field in MODULE_HASH_FIELDS}
+    digest.update(json.dumps(meta, sort_keys=True, default=str).encode('utf-8'))
+    for section_hash in section_hashes:
+        digest.update(section_hash.encode('ascii'))
+    return digest.hexdigest()
+
+
+def sync_sections(module: Module, sections_data: List[Dict]) -> Dict[str, int]:
+    """
+    Bring a module's sections in line with sections_data, touching only rows
+    whose content hash or metadata changed. Returns counts per outcome.
+    """
+    existing = {s.section_number: s for s in module.sections}
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    seen = set()
+
+    planned = []
+    for section_data in sections_data:
+        body = section_body(section_data)
+        planned.append((section_data, body, hash_content(body)))
+
+    # Store new bodies up front, before any section row points at them
+    store_contents({
+        content_hash: body for section_data, body, content_hash in planned
+        if getattr(existing.get(section_data['section_number']), 'content_hash', None) != content_hash
+    })
+
+    for section_data, body, content_hash in planned:
+        number = section_data['section_number']
+        seen.add(number)
+        values = {
+            'section_type': section_data['section_type'],
+            'title': section_data.get('title', ''),
+            'media_url': section_data.get('media_url'),
+            'duration_seconds': section_data.get('duration_seconds'),
+        }
+
+        section = existing.get(number)
+        if section is not None and section.content_hash == content_hash and \
+                all(getattr(section, field) == values[field] for field in SECTION_FIELDS):
+            counts['unchanged'] += 1
+            continue
+
+        if section is None:
+            section = ModuleSection(section_number=number)
+            module.sections.append(section)
+            counts['added'] += 1
+        else:
+            counts['updated'] += 1
+
+        for field, value in values.items():
+            setattr(section, field, value)
+        section.content = None
+        section.content_hash = content_hash
+        section.content_size = len(body.encode('utf-8'))
+
+    for number, section in existing.items():
+        if number not in seen:
+            module.sections.remove(section)
+            counts['removed'] += 1
+
+    return counts
+
+
+def migrate_inline_sections(batch_size: int = 200) -> int:
+    """Move legacy inline section bodies into the content store"""
+    moved = 0
+    while True:
+        sections = ModuleSection.query.filter(
+            ModuleSection.content_hash.is_(None),
+            ModuleSection.content.isnot(None)
+        ).limit(batch_size).all()
+        if not sections:
+            return moved
+        for section in sections:
+            section.content_hash = store_content(section.content)
+            section.content_size = len(section.content.encode('utf-8'))
+            section.content = None
+        db.session.commit()
+        moved += len(sections)
@@ -0,0 +1,103 @@
+"""
+Due-date scanner for module assignments
+Finds required assignments that are overdue or due soon and not completed,
+using a range scan on (due_date, required) and an anti-join against
+module_progress, so the cost tracks assignments inside the window rather
+than the whole table. Reminders are written to assignment_notifications in
+batches, once per assignment and kind.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, exists, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from shared.database.db_models import AssignmentNotification, ModuleAssignment, ModuleProgress
+from .database import db
+
+# Assignments due within this many hours count as due soon
+DUE_SOON_HOURS = int(os.getenv('DUE_SOON_HOURS', '48'))
+
+# Overdue assignments older than this many days are no longer reported
+OVERDUE_LOOKBACK_DAYS = int(os.getenv('OVERDUE_LOOKBACK_DAYS', '30'))
+
+SCAN_BATCH_SIZE = 500
+
+
+def due_assignments_query(now: datetime, window_hours: int = DUE_SOON_HOURS,
+                          lookback_days: int = OVERDUE_LOOKBACK_DAYS,
+                          student_id: Optional[str] = None, module_id: Optional[int] = None,
+                          kind: Optional[str] = None):
+    """Select due-soon/overdue incomplete required assignments, ordered by (due_date, id)"""
+    completed = exists().where(and_(
+        ModuleProgress.module_id == ModuleAssignment.module_id,
+        ModuleProgress.student_id == ModuleAssignment.student_id,
+        ModuleProgress.status == 'completed'
+    ))
+    query = select(
+        ModuleAssignment.id.label('assignment_id'),
+        ModuleAssignment.student_id,
+        ModuleAssignment.module_id,
+        ModuleAssignment.due_date,
+        case((ModuleAssignment.due_date < now, literal('overdue')), else_=literal('due_soon')).label('kind')
+    ).where(
+        ModuleAssignment.due_date >= now - timedelta(days=lookback_days),
+        ModuleAssignment.due_date < now + timedelta(hours=window_hours),
+        ModuleAssignment.required.is_(True),
+        ~completed
+    ).order_by(ModuleAssignment.due_date, ModuleAssignment.id)
+    if student_id:
+        query = query.where(ModuleAssignment.student_id == student_id)
+    if module_id:
+        query = query.where(ModuleAssignment.module_id == module_id)
+    if kind == 'overdue':
+        query = query.where(ModuleAssignment.due_date < now)
+    elif kind == 'due_soon':
+        query = query.where(ModuleAssignment.due_date >= now)
+    return query
+
+
+def find_due_assignments(now: Optional[datetime] = None, **filters) -> List[Dict]:
+    """Current due-soon/overdue assignments as dicts (no writes)"""
+    now = now or datetime.utcnow()
+    return [dict(row._mapping) for row in db.session.execute(due_assignments_query(now, **filters))]
+
+
+def _insert_notifications():
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(AssignmentNotification.__table__)
+
+
+def scan_due_assignments(now: Optional[datetime] = None, window_hours: int = DUE_SOON_HOURS,
+                         lookback_days: int = OVERDUE_LOOKBACK_DAYS,
+                         batch_size: int = SCAN_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Write notification rows for every due-soon/overdue assignment, one batch
+    per transaction, keyset-paginated on (due_date, id) so each batch
+    continues the due-date range scan. Reminders already
+    sent for the same kind are skipped by the unique key.
+    """
+    now = now or datetime.utcnow()
+    query = due_assignments_query(now, window_hours, lookback_days)
+    counts = {'scanned': 0, 'notified': 0}
+    page = query
+
+    while True:
+        rows = db.session.execute(page.limit(batch_size)).all()
+        if not rows:
+            return counts
+
+        stmt = _insert_notifications().values([
+            dict(row._mapping, created_at=now) for row in rows
+        ]).on_conflict_do_nothing(index_elements=['assignment_id', 'kind'])
+        result = db.session.execute(stmt)
+        db.session.commit()
+
+        counts['scanned'] += len(rows)
+        counts['notified'] += max(result.rowcount, 0)
+        last = rows[-1]
+        page = query.where(
+            tuple_(ModuleAssignment.due_date, ModuleAssignment.id) > (last.due_date, last.assignment_id)
+        )
@@ -0,0 +1,204 @@
+"""
+Ghost replay benchmarks for Ascent Basecamp race mode
+Per-module percentile curves of completion time and mastery score are
+precomputed from learner_performance into ghost_benchmarks, packed in a
+small versioned binary format. Races fetch them once (cached, ETagged) and
+percentile lookups interpolate along the curve instead of counting rows.
+"""
+
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional
+
+import psycopg2.extras
+
+# Percentile grid every curve is sampled at (format version 1)
+PERCENTILES = tuple(range(0, 101, 5))
+FORMAT_VERSION = 1
+
+# magic, format version, sample size, then len(PERCENTILES) float32 time
+# values followed by the same number of float32 score values
+_HEADER = struct.Struct('<2sBI')
+_CURVES = struct.Struct(f'<{2 * len(PERCENTILES)}f')
+MAGIC = b'GB'
+
+BENCHMARK_TTL_SECONDS = int(os.getenv('GHOST_BENCHMARK_TTL_SECONDS', '300'))
+
+CURVES_SQL = """
+    SELECT
+        module_id,
+        COUNT(*) AS sample_size,
+        percentile_cont(%(grid)s::float8[]) WITHIN GROUP (ORDER BY time_spent_seconds) AS time_curve,
+        percentile_cont(%(grid)s::float8[]) WITHIN GROUP (ORDER BY mastery_score) AS score_curve
+    FROM learner_performance
+    WHERE completed = TRUE
+      AND time_spent_seconds IS NOT NULL
+      AND mastery_score IS NOT NULL
+      {where}
+    GROUP BY module_id;
+"""
+
+# The version only moves when the curves actually change, so ETags stay
+# valid across no-op refreshes
+UPSERT_BENCHMARK_SQL = """
+    INSERT INTO ghost_benchmarks (module_id, format_version, sample_size, payload)
+    VALUES %s
+    ON CONFLICT (module_id) DO UPDATE SET
+        version = ghost_benchmarks.version + 1,
+        format_version = EXCLUDED.format_version,
+        sample_size = EXCLUDED.sample_size,
+        payload = EXCLUDED.payload,
+        computed_at = CURRENT_TIMESTAMP
+    WHERE ghost_benchmarks.payload IS DISTINCT FROM EXCLUDED.payload;
+"""
+
+BENCHMARK_SQL = """
+    SELECT module_id, version, format_version, payload
+    FROM ghost_benchmarks
+    WHERE module_id = %s;
+"""
+
+
+class GhostBenchmark:
+    """Decoded percentile curves for one module"""
+
+    def __init__(self, module_id: int, version: int, sample_size: int,
+                 time_curve: List[float], score_curve: List[float]):
+        self.module_id = module_id
+        self.version = version
+        self.sample_size = sample_size
+        self.time_curve = time_curve
+        self.score_curve = score_curve
+
+    @property
+    def etag(self) -> str:
+        return f"ghost-{self.module_id}-{FORMAT_VERSION}-{self.version}"
+
+    def median_time(self) -> float:
+        return self.time_curve[len(PERCENTILES) // 2]
+
+    def median_score(self) -> float:
+        return self.score_curve[len(PERCENTILES) // 2]
+
+    def summary(self) -> Dict:
+        """The few numbers a race needs up front; full curves come from the benchmark endpoint"""
+        return {
+            'version': self.version,
+            'sample_size': self.sample_size,
+            'median_time': round(self.median_time()),
+            'median_score': round(self.median_score(), 2),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'module_id': self.module_id,
+            'version': self.version,
+            'format_version': FORMAT_VERSION,
+            'sample_size': self.sample_size,
+            'percentiles': list(PERCENTILES),
+            'time': [round(v, 2) for v in self.time_curve],
+            'score': [round(v, 2) for v in self.score_curve],
+        }
+
+
+def encode_curves(sample_size: int, time_curve: List[float], score_curve: List[float]) -> bytes:
+    """Pack curves into the compact binary payload"""
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, sample_size) + _CURVES.pack(*time_curve, *score_curve)
+
+
+def decode_curves(payload: bytes):
+    """Unpack a binary payload into (sample_size, time_curve, score_curve)"""
+    magic, format_version, sample_size = _HEADER.unpack_from(payload)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported ghost benchmark format: {magic!r} v{format_version}")
+    values = _CURVES.unpack_from(payload, _HEADER.size)
+    size = len(PERCENTILES)
+    return sample_size, list(values[:size]), list(values[size:])
+
+
+def percent_below(curve: List[float], value: float) -> float:
+    """
+    Share (0-100) of the historical distribution below value, linearly
+    interpolated between the curve's percentile points. A value equal to a
+    flat stretch of the curve gets the middle of that stretch (mid-rank).
+    """
+    value = float(value)
+    low_idx = bisect_left(curve, value)
+    high_idx = bisect_right(curve, value)
+    if low_idx < high_idx:
+        return (PERCENTILES[low_idx] + PERCENTILES[high_idx - 1]) / 2
+    if low_idx == 0:
+        return 0.0
+    if low_idx == len(curve):
+        return 100.0
+    low, high = curve[low_idx - 1], curve[low_idx]
+    p_low, p_high = PERCENTILES[low_idx - 1], PERCENTILES[low_idx]
+    return p_low + (p_high - p_low) * (value - low) / (high - low)
+
+
+def refresh_ghost_benchmarks(cur, module_id: Optional[int] = None) -> int:
+    """
+    Recompute percentile curves from completed learner_performance rows and
+    upsert them into ghost_benchmarks. Returns the number of modules seen.
+    """
+    where = "AND module_id = %(module_id)s" if module_id else ""
+    cur.execute(CURVES_SQL.format(where=where), {
+        'grid': [p / 100 for p in PERCENTILES],
+        'module_id': module_id,
+    })
+    rows = [
+        (r['module_id'], FORMAT_VERSION, r['sample_size'],
+         psycopg2.Binary(encode_curves(r['sample_size'], r['time_curve'], r['score_curve'])))
+        for r in cur.fetchall()
+    ]
+    if rows:
+        psycopg2.extras.execute_values(cur, UPSERT_BENCHMARK_SQL, rows)
+    return len(rows)
+
+
+class GhostBenchmarkStore:
+    """Process-wide cache of decoded benchmarks, reloaded after a TTL"""
+
+    def __init__(self, connect: Callable, ttl_seconds: int = BENCHMARK_TTL_SECONDS):
+        self._connect = connect
+        self._ttl = ttl_seconds
+        self._cache: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, module_id: int, cur) -> Optional[GhostBenchmark]:
+        cur.execute(BENCHMARK_SQL, (module_id,))
+        row = cur.fetchone()
+        benchmark = None
+        if row is not None and row['format_version'] == FORMAT_VERSION:
+            sample_size, time_curve, score_curve = decode_curves(bytes(row['payload']))
+            benchmark = GhostBenchmark(module_id, row['version'], sample_size, time_curve, score_curve)
+        self._cache[module_id] = (time.monotonic(), benchmark)
+        return benchmark
+
+    def get(self, module_id: int, cur=None) -> Optional[GhostBenchmark]:
+        """
+        Benchmark for a module, or None if none has been computed. Uses cur
+        if given or a fresh connection when the cached copy is stale.
+        """
+        with self._lock:
+            cached = self._cache.get(module_id)
+            if cached is not None and time.monotonic() - cached[0] < self._ttl:
+                return cached[1]
+            if cur is not None:
+                return self._load(module_id, cur)
+            conn = self._connect()
+            try:
+                with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as own_cur:
+                    return self._load(module_id, own_cur)
+            finally:
+                conn.close()
+
+    def invalidate(self, module_id: Optional[int] = None) -> None:
+        with self._lock:
+            if module_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(module_id, None)
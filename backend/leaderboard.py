@@ -0,0 +1,251 @@
+"""
+Materialized leaderboard for Ascent Basecamp
+leaderboard_entries holds best score, best time and attempt counts per
+(student, module) and is upserted on every completion. Ranked boards are
+kept in memory as sorted lists rebuilt from that table, so top-N and
+"my rank" lookups are bisections instead of window queries.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psycopg2.extras
+
+# Boards older than this are reloaded so writes from other workers show up
+LEADERBOARD_TTL_SECONDS = int(os.getenv('LEADERBOARD_TTL_SECONDS', '60'))
+
+# Written as INSERT ... SELECT so it can also run as a CTE gated on another
+# CTE's rows by filling {source} (e.g. "FROM completion")
+UPSERT_ENTRY_SQL = """
+    INSERT INTO leaderboard_entries (
+        student_id, module_id, subsystem, best_score, best_time,
+        attempts, score_sum, time_sum, updated_at
+    )
+    SELECT
+        %(student_id)s, %(module_id)s,
+        COALESCE((SELECT subsystem FROM modules WHERE id = %(module_id)s), 'general'),
+        %(score)s, %(time)s, 1, %(score)s, %(time)s, CURRENT_TIMESTAMP
+    {source}
+    ON CONFLICT (student_id, module_id) DO UPDATE SET
+        best_score = GREATEST(leaderboard_entries.best_score, EXCLUDED.best_score),
+        best_time = LEAST(leaderboard_entries.best_time, EXCLUDED.best_time),
+        attempts = leaderboard_entries.attempts + 1,
+        score_sum = leaderboard_entries.score_sum + EXCLUDED.score_sum,
+        time_sum = leaderboard_entries.time_sum + EXCLUDED.time_sum,
+        subsystem = EXCLUDED.subsystem,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING student_id, module_id, subsystem, best_score, best_time, attempts
+"""
+
+MODULE_BOARD_SQL = """
+    SELECT student_id, best_score, best_time, attempts
+    FROM leaderboard_entries
+    WHERE module_id = %s;
+"""
+
+OVERALL_BOARD_SQL = """
+    SELECT
+        student_id,
+        SUM(score_sum) / NULLIF(SUM(attempts), 0) AS avg_score,
+        SUM(time_sum) AS total_time,
+        COUNT(*) AS modules_completed,
+        SUM(attempts) AS attempts
+    FROM leaderboard_entries
+    {where}
+    GROUP BY student_id;
+"""
+
+
+def _module_row(row: Dict) -> Dict:
+    return {
+        'student_id': row['student_id'],
+        'best_score': float(row['best_score'] or 0),
+        'best_time': int(row['best_time'] or 0),
+        'attempts': int(row['attempts'] or 0),
+    }
+
+
+def _overall_row(row: Dict) -> Dict:
+    return {
+        'student_id': row['student_id'],
+        'avg_score': float(row['avg_score'] or 0),
+        'total_time': int(row['total_time'] or 0),
+        'modules_completed': int(row['modules_completed'] or 0),
+        'attempts': int(row['attempts'] or 0),
+    }
+
+
+def module_sort_key(best_score: float, best_time: int) -> Tuple:
+    """Module boards rank by best score DESC, then best time ASC"""
+    return (-float(best_score), int(best_time))
+
+
+def overall_sort_key(avg_score: float, modules_completed: int) -> Tuple:
+    """Overall boards rank by average score DESC, then modules completed DESC"""
+    return (-float(avg_score), -int(modules_completed))
+
+
+class RankedBoard:
+    """
+    Sorted leaderboard for one scope.
+
+    Entries are kept as (sort_key..., student_id) tuples so RANK() semantics
+    (ties share a rank) fall out of a bisect on the sort key alone.
+    """
+
+    def __init__(self, rows: List[Dict], key_fn: Callable[[Dict], Tuple]):
+        self._key_fn = key_fn
+        self._rows: Dict[str, Dict] = {}
+        self._keys: Dict[str, Tuple] = {}
+        self._order: List[Tuple] = []
+        self.loaded_at = time.monotonic()
+        for row in rows:
+            self._rows[row['student_id']] = row
+            self._keys[row['student_id']] = key_fn(row)
+        self._order = sorted(key + (sid,) for sid, key in self._keys.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def upsert(self, row: Dict) -> None:
+        """Insert or reposition a student's entry"""
+        student_id = row['student_id']
+        old_key = self._keys.get(student_id)
+        if old_key is not None:
+            idx = bisect_left(self._order, old_key + (student_id,))
+            del self._order[idx]
+        key = self._key_fn(row)
+        self._rows[student_id] = row
+        self._keys[student_id] = key
+        insort(self._order, key + (student_id,))
+
+    def remove(self, student_id: str) -> None:
+        """Drop a student's entry if present"""
+        key = self._keys.pop(student_id, None)
+        if key is not None:
+            del self._order[bisect_left(self._order, key + (student_id,))]
+            del self._rows[student_id]
+
+    def rank_for(self, key: Tuple) -> int:
+        """Rank a sort key would receive (1 + entries strictly ahead of it)"""
+        return bisect_left(self._order, key) + 1
+
+    def position(self, student_id: str) -> Optional[Dict]:
+        """A student's row with rank attached, or None if not ranked"""
+        key = self._keys.get(student_id)
+        if key is None:
+            return None
+        return dict(self._rows[student_id], rank=self.rank_for(key))
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """Every entry with rank <= limit (ties may extend past limit rows)"""
+        result = []
+        for entry in self._order:
+            key, student_id = entry[:-1], entry[-1]
+            rank = self.rank_for(key)
+            if rank > limit:
+                break
+            result.append(dict(self._rows[student_id], rank=rank))
+        return result
+
+
+class LeaderboardIndex:
+    """Process-wide cache of RankedBoards keyed by scope"""
+
+    def __init__(self, connect: Callable, ttl_seconds: int = LEADERBOARD_TTL_SECONDS):
+        self._connect = connect
+        self._ttl = ttl_seconds
+        self._boards: Dict[Tuple, RankedBoard] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, scope: Tuple) -> Optional[RankedBoard]:
+        board = self._boards.get(scope)
+        if board is not None and time.monotonic() - board.loaded_at < self._ttl:
+            return board
+        return None
+
+    def _load(self, scope: Tuple, cur) -> RankedBoard:
+        if scope[0] == 'module':
+            cur.execute(MODULE_BOARD_SQL, (scope[1],))
+            rows = [_module_row(r) for r in cur.fetchall()]
+            board = RankedBoard(rows, lambda r: module_sort_key(r['best_score'], r['best_time']))
+        else:
+            subsystem = scope[1]
+            where = "WHERE subsystem = %s" if subsystem else ""
+            cur.execute(OVERALL_BOARD_SQL.format(where=where),
+                        (subsystem,) if subsystem else None)
+            rows = [_overall_row(r) for r in cur.fetchall()]
+            board = RankedBoard(rows, lambda r: overall_sort_key(r['avg_score'], r['modules_completed']))
+        self._boards[scope] = board
+        return board
+
+    def board(self, module_id: Optional[int] = None, subsystem: Optional[str] = None,
+              cur=None) -> RankedBoard:
+        """
+        Return the board for a module, or the overall board (optionally
+        restricted to one subsystem). Loads from leaderboard_entries when
+        missing or stale, using cur if given or a fresh connection.
+        """
+        scope = ('module', module_id) if module_id else ('overall', subsystem)
+        with self._lock:
+            board = self._fresh(scope)
+            if board is not None:
+                return board
+            if cur is not None:
+                return self._load(scope, cur)
+            conn = self._connect()
+            try:
+                with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as own_cur:
+                    return self._load(scope, own_cur)
+            finally:
+                conn.close()
+
+    def record_completion(self, cur, student_id: str, module_id: int,
+                          mastery_score: float, time_seconds: int) -> Dict:
+        """
+        Upsert a completion into leaderboard_entries on the caller's cursor,
+        so it commits with the completion itself, and return the entry row.
+        Loaded boards are not touched: call apply_completion with the entry
+        once the transaction has committed.
+        """
+        cur.execute(UPSERT_ENTRY_SQL.format(source="") + ";", {
+            'student_id': student_id,
+            'module_id': module_id,
+            'score': mastery_score,
+            'time': time_seconds,
+        })
+        return dict(cur.fetchone())
+
+    def apply_completion(self, entry: Dict, mastery_score: float, time_seconds: int) -> None:
+        """
+        Reposition a student in the loaded boards after a completion, given
+        the leaderboard_entries row the upsert returned. Overall boards are
+        updated by delta, so no extra query is needed.
+        """
+        with self._lock:
+            board = self._boards.get(('module', entry['module_id']))
+            if board is not None:
+                board.upsert(_module_row(entry))
+
+            first_completion = int(entry['attempts']) == 1
+            for subsystem in (None, entry['subsystem']):
+                board = self._boards.get(('overall', subsystem))
+                if board is None:
+                    continue
+                current = board.position(entry['student_id'])
+                if current is None:
+                    row = {'student_id': entry['student_id'], 'avg_score': float(mastery_score),
+                           'total_time': int(time_seconds), 'modules_completed': 1, 'attempts': 1}
+                else:
+                    attempts = current['attempts'] + 1
+                    row = {
+                        'student_id': entry['student_id'],
+                        'avg_score': (current['avg_score'] * current['attempts'] + float(mastery_score)) / attempts,
+                        'total_time': current['total_time'] + int(time_seconds),
+                        'modules_completed': current['modules_completed'] + (1 if first_completion else 0),
+                        'attempts': attempts,
+                    }
+                board.upsert(row)
@@ -0,0 +1,50 @@
+"""
+Short-lived in-process caches for LMS read endpoints
+Entries are grouped by an owner key (e.g. a student id) so every cached
+view for that owner can be dropped at once when their data changes.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe TTL cache with per-group invalidation"""
+
+    def __init__(self, ttl_seconds: float, max_groups: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_groups = max_groups
+        self._groups: Dict[Hashable, Dict[Hashable, Tuple[float, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, group: Hashable, key: Hashable = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._groups.get(group, {}).get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._groups[group][key]
+                return None
+            return value
+
+    def set(self, group: Hashable, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if group not in self._groups and len(self._groups) >= self.max_groups:
+                # Drop the oldest group (dicts keep insertion order)
+                self._groups.pop(next(iter(self._groups)))
+            self._groups.setdefault(group, {})[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, group: Hashable) -> None:
+        with self._lock:
+            self._groups.pop(group, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._groups.clear()
+
+
+# Student dashboards are cached briefly and dropped on that student's writes
+dashboard_cache = TTLCache(float(os.getenv('DASHBOARD_CACHE_SECONDS', '30')))
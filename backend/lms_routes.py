@@ -11,17 +11,28 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, make_response, stream_with_context
 from sqlalchemy.orm import joinedload
-from sqlalchemy import func
+from sqlalchemy import func, and_, column, select, text, true
 from shared.database.db_models import (
     Module, ModuleSection, ModuleProgress, ModuleAssignment,
     ModuleAnalyticsEvent, ModuleFeedback
 )
 from .database import db
+from .module_stats import get_module_stats, record_feedback, record_progress
+from .leaderboard import LeaderboardIndex, UPSERT_ENTRY_SQL, module_sort_key
+from .ghost_replay import GhostBenchmarkStore, encode_curves, percent_below
+from .race_hub import RaceHub
+from .module_graph import get_module_graph, completed_mask_for_student
+from .lms_cache import dashboard_cache
+from .module_search import search_modules
+from .module_assignments import COHORT_FIELDS, bulk_assign, unknown_student_ids
+from .due_date_scanner import DUE_SOON_HOURS, find_due_assignments
 from datetime import datetime
+import json
 import logging
 import os
+import queue
 import psycopg2
 import psycopg2.extras
 from dotenv import load_dotenv
@@ -86,30 +97,86 @@ def get_all_modules():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lms_bp.route('/modules/search', methods=['GET'])
+def search_module_library():
+    """
+    GET /api/lms/modules/search?q=<text>
+    
+    Ranked full-text search over module titles, tags, descriptions and
+    section text.
+    
+    Query parameters:
+        - q (required): Search text
+        - page, per_page (optional): Pagination (default 1, 20; max 100)
+        - category, university_id, target_audience (optional): Exact filters
+        - status (optional): Filter by status (default: "published")
+    
+    Returns:
+        Ranked modules + facet counts (category, status, target_audience)
+    """
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'success': False, 'error': 'q is required'}), 400
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        filters = {
+            'category': request.args.get('category'),
+            'university_id': request.args.get('university_id'),
+            'target_audience': request.args.get('target_audience'),
+            'status': request.args.get('status', 'published'),
+        }
+        
+        results, total, facets = search_modules(q, filters, page, per_page)
+        
+        return jsonify({
+            'success': True,
+            'query': q,
+            'count': len(results),
+            'modules': [dict(module.to_dict(), rank=round(rank, 4)) for module, rank in results],
+            'facets': facets,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'pages': (total + per_page - 1) // per_page
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to search modules: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def module_etag(module, variant):
+    """ETag value for a module representation: its content hash, or updated_at for undeployed rows"""
+    if module.content_hash:
+        return f"{module.content_hash[:32]}-{variant}"
+    stamp = module.updated_at.timestamp() if module.updated_at else 0
+    return f"{module.id}-{stamp}-{variant}"
+
+
 @lms_bp.route('/modules/<int:module_id>', methods=['GET'])
 def get_module_details(module_id):
     """
     GET /api/lms/modules/<id>
     
-    Returns full module details including all sections.
+    Returns module details with a section outline (number, title, type,
+    duration, size). Section bodies are fetched on demand from
+    /modules/<id>/sections, or inline with include_sections=true.
     
     Query parameters:
-        - include_sections (optional): Include sections array (default: true)
+        - include_sections (optional): Include full sections array (default: false)
     
     Returns:
-        JSON object with module info + sections array
+        JSON object with module info + outline (or sections array)
     """
     try:
-        # Check if sections should be included
-        include_sections = request.args.get('include_sections', 'true').lower() == 'true'
+        # Check if section bodies should be included
+        include_sections = request.args.get('include_sections', 'false').lower() == 'true'
         
-        # Fetch module with sections eagerly loaded if requested
-        if include_sections:
-            module = Module.query.options(
-                joinedload(Module.sections)
-            ).filter_by(id=module_id).first()
-        else:
-            module = Module.query.filter_by(id=module_id).first()
+        module = Module.query.filter_by(id=module_id).first()
         
         if not module:
             return jsonify({
@@ -117,25 +184,128 @@ def get_module_details(module_id):
                 'error': 'Module not found'
             }), 404
         
+        # Deployed modules carry a content hash over metadata and section
+        # bodies, so a matching ETag means nothing needs to be loaded
+        etag = module_etag(module, 'full' if include_sections else 'outline')
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+        
         # Build response
         module_data = module.to_dict()
         
         if include_sections:
-            # Get sections ordered by section_number
-            sections = ModuleSection.query.filter_by(module_id=module_id)\
+            # Get sections ordered by section_number (single query, bodies included)
+            sections = ModuleSection.query.options(joinedload(ModuleSection.blob))\
+                .filter_by(module_id=module_id)\
                 .order_by(ModuleSection.section_number).all()
             module_data['sections'] = [section.to_dict() for section in sections]
+        else:
+            module_data['outline'] = section_outline(module_id)
         
-        return jsonify({
+        response = make_response(jsonify({
             'success': True,
             'module': module_data
-        }), 200
+        }))
+        response.set_etag(etag)
+        return response
         
     except Exception as e:
         logger.error(f"Failed to fetch module {module_id}: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def section_outline(module_id):
+    """Section metadata and body sizes for a module, without loading bodies"""
+    rows = db.session.query(
+        ModuleSection.section_number,
+        ModuleSection.title,
+        ModuleSection.section_type,
+        ModuleSection.duration_seconds,
+        func.coalesce(ModuleSection.content_size, func.length(ModuleSection.content)).label('size')
+    ).filter_by(module_id=module_id).order_by(ModuleSection.section_number).all()
+    
+    return [{
+        'section_number': r.section_number,
+        'title': r.title,
+        'section_type': r.section_type,
+        'duration_seconds': r.duration_seconds,
+        'size': r.size or 0
+    } for r in rows]
+
+
+# Most sections returned by one range request
+SECTION_RANGE_LIMIT = 25
+
+
+@lms_bp.route('/modules/<int:module_id>/sections', methods=['GET'])
+def get_module_sections(module_id):
+    """
+    GET /api/lms/modules/<id>/sections?from=<n>&to=<m>
+    
+    Streams full sections numbered from..to (inclusive), at most
+    SECTION_RANGE_LIMIT per request. Bodies are read and serialized one
+    section at a time.
+    
+    Query parameters:
+        - from (optional): First section number (default: 1)
+        - to (optional): Last section number (default: from + limit - 1)
+    
+    Returns:
+        JSON object with the requested sections array
+    """
+    try:
+        try:
+            first = int(request.args.get('from', 1))
+            last = int(request.args.get('to', first + SECTION_RANGE_LIMIT - 1))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'from and to must be integers'}), 400
+        
+        if last < first:
+            return jsonify({'success': False, 'error': 'to must be >= from'}), 400
+        if last - first + 1 > SECTION_RANGE_LIMIT:
+            return jsonify({
+                'success': False,
+                'error': f'At most {SECTION_RANGE_LIMIT} sections per request'
+            }), 400
+        
+        module = Module.query.filter_by(id=module_id).first()
+        
+        if not module:
+            return jsonify({
+                'success': False, 
+                'error': 'Module not found'
+            }), 404
+        
+        etag = module_etag(module, f'sections-{first}-{last}')
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+        
+        sections = ModuleSection.query.options(joinedload(ModuleSection.blob))\
+            .filter(ModuleSection.module_id == module_id,
+                    ModuleSection.section_number.between(first, last))\
+            .order_by(ModuleSection.section_number)\
+            .yield_per(5)
+        
+        def generate():
+            yield json.dumps({'success': True, 'module_id': module_id,
+                              'from': first, 'to': last})[:-1] + ', "sections": ['
+            for i, section in enumerate(sections):
+                yield (', ' if i else '') + json.dumps(section.to_dict())
+            yield ']}'
+        
+        response = Response(stream_with_context(generate()), mimetype='application/json')
+        response.set_etag(etag)
+        return response
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch sections for module {module_id}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @lms_bp.route('/modules/<int:module_id>/progress', methods=['GET', 'POST'])
 def handle_progress(module_id):
     """
@@ -225,6 +395,11 @@ def handle_progress(module_id):
                 student_id=student_id
             ).first()
             
+            # Track the transition so module_stats can be updated by delta
+            previous_status = None
+            time_delta = 0
+            new_sections = []
+            
             if not progress:
                 progress = ModuleProgress(
                     module_id=module_id,
@@ -237,23 +412,28 @@ def handle_progress(module_id):
                 db.session.add(progress)
             else:
                 # Update existing progress
+                previous_status = progress.status
                 progress.progress_percent = progress_percent
                 progress.status = status
                 progress.last_accessed_at = datetime.utcnow()
-                progress.total_time_seconds = progress.total_time_seconds + time_spent
+                progress.total_time_seconds = (progress.total_time_seconds or 0) + time_spent
+                time_delta = time_spent
                 
                 if section_number is not None:
                     progress.current_section = section_number
                     # Add to completed sections if not already there
                     completed = progress.completed_sections or []
                     if section_number not in completed and progress_percent >= 100:
-                        completed.append(section_number)
-                        progress.completed_sections = completed
+                        progress.completed_sections = completed + [section_number]
+                        new_sections.append(section_number)
                 
                 if status == 'completed' and not progress.completed_at:
                     progress.completed_at = datetime.utcnow()
             
+            db.session.flush()
+            record_progress(progress, previous_status, time_delta, new_sections)
             db.session.commit()
+            dashboard_cache.invalidate(student_id)
             
             # Log analytics event if section completed
             if section_number and progress_percent >= 100:
@@ -300,36 +480,30 @@ def get_module_analytics(module_id):
         if not module:
             return jsonify({'success': False, 'error': 'Module not found'}), 404
         
-        # Get all progress records for this module
-        progress_records = ModuleProgress.query.filter_by(module_id=module_id).all()
+        # Read the maintained stats row instead of rescanning module_progress
+        stats = get_module_stats(module_id)
         
-        total_students = len(progress_records)
-        completed_count = sum(1 for p in progress_records if p.status == 'completed')
+        total_students = stats.student_count
+        completed_count = stats.completed_count
         completion_rate = (completed_count / total_students * 100) if total_students > 0 else 0.0
         
         # Calculate average time spent (in minutes)
-        total_time = sum(p.total_time_seconds for p in progress_records if p.total_time_seconds)
-        avg_time_minutes = (total_time / total_students / 60) if total_students > 0 else 0
+        avg_time_minutes = (stats.total_time_seconds / total_students / 60) if total_students > 0 else 0
         
         # Status breakdown
-        status_counts = db.session.query(
-            ModuleProgress.status,
-            func.count(ModuleProgress.id)
-        ).filter_by(module_id=module_id).group_by(ModuleProgress.status).all()
-        
-        status_breakdown = {status: count for status, count in status_counts}
+        status_breakdown = stats.status_counts or {}
         
         # Section analytics
-        sections = ModuleSection.query.filter_by(module_id=module_id)\
-            .order_by(ModuleSection.section_number).all()
+        sections = db.session.query(
+            ModuleSection.section_number,
+            ModuleSection.title
+        ).filter_by(module_id=module_id).order_by(ModuleSection.section_number).all()
         
+        section_completions = stats.section_completions or {}
         section_analytics = []
         for section in sections:
             # Count how many students completed this section
-            completed_section_count = sum(
-                1 for p in progress_records 
-                if p.completed_sections and section.section_number in p.completed_sections
-            )
+            completed_section_count = section_completions.get(str(section.section_number), 0)
             section_completion_rate = (completed_section_count / total_students * 100) if total_students > 0 else 0.0
             
             section_analytics.append({
@@ -363,8 +537,8 @@ def get_module_analytics(module_id):
 @lms_bp.route('/modules/<int:module_id>/feedback', methods=['GET', 'POST'])
 def handle_feedback(module_id):
     """
-    GET /api/lms/modules/<id>/feedback
-    Returns all feedback for a module.
+    GET /api/lms/modules/<id>/feedback?page=1&per_page=20
+    Returns aggregate feedback statistics and one page of feedback for a module.
     
     POST /api/lms/modules/<id>/feedback
     Submits student feedback for a module.
@@ -390,35 +564,29 @@ def handle_feedback(module_id):
             if not module:
                 return jsonify({'success': False, 'error': 'Module not found'}), 404
             
-            # Get all feedback for this module
-            feedback_records = ModuleFeedback.query.filter_by(module_id=module_id)\
-                .order_by(ModuleFeedback.submitted_at.desc()).all()
+            page = max(request.args.get('page', 1, type=int), 1)
+            per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
             
-            # Calculate aggregate statistics
-            total_feedback = len(feedback_records)
-            if total_feedback > 0:
-                avg_rating = sum(f.rating for f in feedback_records if f.rating) / total_feedback
-                avg_clarity = sum(f.clarity for f in feedback_records if f.clarity) / total_feedback
-                avg_usefulness = sum(f.usefulness for f in feedback_records if f.usefulness) / total_feedback
-                
-                difficulty_counts = {}
-                for f in feedback_records:
-                    if f.difficulty:
-                        difficulty_counts[f.difficulty] = difficulty_counts.get(f.difficulty, 0) + 1
-            else:
-                avg_rating = avg_clarity = avg_usefulness = 0
-                difficulty_counts = {}
+            # Aggregates come from the maintained stats row
+            stats = get_module_stats(module_id)
+            total_feedback = stats.feedback_count
+            
+            # Only the requested page of raw feedback is loaded
+            feedback_records = ModuleFeedback.query.filter_by(module_id=module_id)\
+                .order_by(ModuleFeedback.submitted_at.desc(), ModuleFeedback.id.desc())\
+                .offset((page - 1) * per_page).limit(per_page).all()
             
             return jsonify({
                 'success': True,
                 'count': total_feedback,
-                'aggregate': {
-                    'avg_rating': round(avg_rating, 2) if total_feedback > 0 else None,
-                    'avg_clarity': round(avg_clarity, 2) if total_feedback > 0 else None,
-                    'avg_usefulness': round(avg_usefulness, 2) if total_feedback > 0 else None,
-                    'difficulty_breakdown': difficulty_counts
-                },
-                'feedback': [f.to_dict() for f in feedback_records]
+                'aggregate': stats.feedback_aggregate(),
+                'feedback': [f.to_dict() for f in feedback_records],
+                'pagination': {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': total_feedback,
+                    'pages': (total_feedback + per_page - 1) // per_page
+                }
             }), 200
             
         except Exception as e:
@@ -454,6 +622,8 @@ def handle_feedback(module_id):
             )
             
             db.session.add(feedback)
+            db.session.flush()
+            record_feedback(feedback)
             db.session.commit()
             
             logger.info(f"Feedback received for module {module_id} from student {data['student_id']}")
@@ -477,11 +647,15 @@ def handle_assignments(module_id):
     Returns all assignments for this module.
     
     POST /api/lms/modules/<id>/assignments
-    Creates a new assignment (assigns module to students).
+    Creates a new assignment (assigns module to students). Students can be
+    listed explicitly and/or selected as a cohort of active students by
+    team_id, university_id and status; existing assignments are skipped.
+    Unknown student ids are rejected with a 400 listing them.
     
     Request body:
         {
             "student_ids": ["student1", "student2"],
+            "cohort": {"university_id": "uni1", "status": "incoming"},
             "due_date": "2025-12-31T23:59:59",
             "required": true,
             "assigned_by_id": "faculty123"
@@ -509,42 +683,45 @@ def handle_assignments(module_id):
         try:
             data = request.get_json()
             
-            if not data or 'student_ids' not in data:
+            if not data or ('student_ids' not in data and 'cohort' not in data):
                 return jsonify({
                     'success': False,
-                    'error': 'Missing required field: student_ids'
+                    'error': 'Missing required field: student_ids or cohort'
+                }), 400
+            
+            cohort = data.get('cohort') or {}
+            unknown = set(cohort) - set(COHORT_FIELDS)
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown cohort fields: {', '.join(sorted(unknown))}"
                 }), 400
             
             module = Module.query.get(module_id)
             if not module:
                 return jsonify({'success': False, 'error': 'Module not found'}), 404
             
-            student_ids = data['student_ids']
-            due_date = datetime.fromisoformat(data['due_date']) if 'due_date' in data else None
-            required = data.get('required', True)
-            assigned_by_id = data.get('assigned_by_id')
+            missing = unknown_student_ids(data.get('student_ids') or [])
+            if missing:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown student ids: {', '.join(missing)}",
+                    'unknown_student_ids': missing
+                }), 400
             
-            created_assignments = []
-            for student_id in student_ids:
-                # Check if assignment already exists
-                existing = ModuleAssignment.query.filter_by(
-                    module_id=module_id,
-                    student_id=student_id
-                ).first()
-                
-                if not existing:
-                    assignment = ModuleAssignment(
-                        module_id=module_id,
-                        student_id=student_id,
-                        due_date=due_date,
-                        required=required,
-                        assigned_by_id=assigned_by_id,
-                        assigned_at=datetime.utcnow()
-                    )
-                    db.session.add(assignment)
-                    created_assignments.append(assignment)
+            # One INSERT ... ON CONFLICT DO NOTHING for every selected student
+            created_assignments = bulk_assign(
+                module_id,
+                student_ids=data.get('student_ids'),
+                cohort=cohort,
+                due_date=datetime.fromisoformat(data['due_date']) if data.get('due_date') else None,
+                required=data.get('required', True),
+                assigned_by_id=data.get('assigned_by_id')
+            )
             
             db.session.commit()
+            for assignment in created_assignments:
+                dashboard_cache.invalidate(assignment.student_id)
             
             return jsonify({
                 'success': True,
@@ -558,6 +735,47 @@ def handle_assignments(module_id):
             return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lms_bp.route('/assignments/due', methods=['GET'])
+def get_due_assignments():
+    """
+    GET /api/lms/assignments/due
+
+    Returns required assignments that are overdue or due soon and not yet
+    completed, read through the (due_date, required) index.
+
+    Query parameters:
+        - window_hours (optional): How far ahead counts as due soon (default: 48)
+        - student_id (optional): Only this student's assignments
+        - module_id (optional): Only this module's assignments
+        - kind (optional): 'overdue' or 'due_soon'
+    """
+    try:
+        window_hours = min(max(request.args.get('window_hours', DUE_SOON_HOURS, type=int), 1), 24 * 30)
+        kind = request.args.get('kind')
+        if kind and kind not in ('overdue', 'due_soon'):
+            return jsonify({'success': False, 'error': f'Unknown kind: {kind}'}), 400
+
+        due = find_due_assignments(
+            window_hours=window_hours,
+            student_id=request.args.get('student_id'),
+            module_id=request.args.get('module_id', type=int),
+            kind=kind
+        )
+
+        return jsonify({
+            'success': True,
+            'count': len(due),
+            'assignments': [
+                dict(row, due_date=row['due_date'].isoformat() if row['due_date'] else None)
+                for row in due
+            ]
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Failed to fetch due assignments: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @lms_bp.route('/students/<student_id>/modules', methods=['GET'])
 def get_student_modules(student_id):
     """
@@ -636,6 +854,86 @@ def get_student_modules(student_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lms_bp.route('/students/<student_id>/unlocked_modules', methods=['GET'])
+def get_unlocked_modules(student_id):
+    """
+    GET /api/lms/students/<id>/unlocked_modules
+    
+    Returns published modules the student has not completed whose
+    prerequisites are all completed.
+    
+    Returns:
+        JSON array of modules ready to start next
+    """
+    try:
+        graph = get_module_graph()
+        completed = completed_mask_for_student(graph, student_id)
+        
+        unlocked_ids = [
+            key for key in graph.unlocked(completed)
+            if graph.modules[key]['status'] == 'published'
+        ]
+        
+        modules = Module.query.filter(Module.id.in_(unlocked_ids)).all() if unlocked_ids else []
+        order = {key: i for i, key in enumerate(graph.topological_order)}
+        modules.sort(key=lambda m: order[m.id])
+        
+        return jsonify({
+            'success': True,
+            'student_id': student_id,
+            'count': len(modules),
+            'modules': [module.to_dict() for module in modules]
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch unlocked modules: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@lms_bp.route('/modules/<int:module_id>/learning_path', methods=['GET'])
+def get_learning_path(module_id):
+    """
+    GET /api/lms/modules/<id>/learning_path?student_id=<id>
+    
+    Returns every transitive prerequisite of a module in the order they
+    should be taken, ending with the module itself.
+    
+    Query parameters:
+        - student_id (optional): Mark modules the student has completed
+    
+    Returns:
+        Ordered list of {id, module_id, title, completed}
+    """
+    try:
+        graph = get_module_graph()
+        if module_id not in graph.position:
+            return jsonify({'success': False, 'error': 'Module not found'}), 404
+        
+        student_id = request.args.get('student_id')
+        completed = completed_mask_for_student(graph, student_id) if student_id else 0
+        
+        path = []
+        for key in graph.learning_path(module_id):
+            module = graph.modules[key]
+            path.append({
+                'id': key,
+                'module_id': module['module_id'],
+                'title': module['title'],
+                'completed': bool(completed >> graph.position[key] & 1)
+            })
+        
+        return jsonify({
+            'success': True,
+            'module_id': module_id,
+            'count': len(path),
+            'path': path
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to build learning path for module {module_id}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ============================================================================
 # ASCENT BASECAMP LEARNING SYSTEM ENDPOINTS
 # Direct Postgres access for learner_performance, subsystem_competency, etc.
@@ -646,6 +944,85 @@ def get_postgres_conn():
     return psycopg2.connect(DATABASE_URL)
 
 
+# Ranked boards maintained from leaderboard_entries (see backend/leaderboard.py)
+leaderboard_index = LeaderboardIndex(get_postgres_conn)
+
+# Precomputed race percentile curves (see backend/ghost_replay.py)
+ghost_benchmarks = GhostBenchmarkStore(get_postgres_conn)
+
+# Live race sessions; checkpoint ticks stay in memory (see backend/race_hub.py)
+race_hub = RaceHub()
+
+# Seconds between SSE keep-alive comments on idle race streams
+RACE_STREAM_HEARTBEAT_SECONDS = 15
+
+# Attempt numbers are allocated from learner_attempt_counters: one upsert
+# bumps the counter and the new learner_performance row is inserted from it
+# in the same statement, so concurrent starts can never share a number.
+# Returns no row if the module does not exist.
+START_ATTEMPT_SQL = """
+    WITH module AS (
+        SELECT id, title FROM modules WHERE id = %(module_id)s
+    ),
+    counter AS (
+        INSERT INTO learner_attempt_counters (student_id, module_id, last_attempt)
+        SELECT %(student_id)s, id, 1 FROM module
+        ON CONFLICT (student_id, module_id)
+        DO UPDATE SET last_attempt = learner_attempt_counters.last_attempt + 1
+        RETURNING module_id, last_attempt
+    ),
+    attempt AS (
+        INSERT INTO learner_performance (
+            student_id, module_id, attempt_number,
+            time_spent_seconds, errors_count, mastery_score, completed
+        )
+        SELECT %(student_id)s, module_id, last_attempt, 0, 0, 0.0, FALSE
+        FROM counter
+        RETURNING log_id, attempt_number, timestamp
+    )
+    SELECT attempt.log_id, attempt.attempt_number, attempt.timestamp, module.title
+    FROM attempt, module;
+"""
+
+# Minimum modules_completed for each competency level above orientation.
+# Override with e.g. COMPETENCY_THRESHOLDS="competency:3,integration:6,autonomy:10"
+COMPETENCY_LEVELS = ('orientation', 'competency', 'integration', 'autonomy')
+
+
+def parse_competency_thresholds(spec):
+    """Parse "level:count,..." into [(count, level)] sorted highest first"""
+    thresholds = []
+    for item in spec.split(','):
+        level, _, count = item.strip().partition(':')
+        if level not in COMPETENCY_LEVELS[1:]:
+            raise ValueError(f"Unknown competency level in COMPETENCY_THRESHOLDS: {level!r}")
+        thresholds.append((int(count), level))
+    return sorted(thresholds, reverse=True)
+
+
+COMPETENCY_THRESHOLDS = parse_competency_thresholds(
+    os.getenv('COMPETENCY_THRESHOLDS', 'competency:3,integration:6,autonomy:10')
+)
+
+
+def competency_level_sql(count_expr):
+    """CASE expression mapping a modules_completed expression to a level"""
+    whens = ' '.join(
+        f"WHEN {count_expr} >= {count} THEN '{level}'" for count, level in COMPETENCY_THRESHOLDS
+    )
+    return f"CASE {whens} ELSE '{COMPETENCY_LEVELS[0]}' END"
+
+
+# Resolves the attempt being updated: the explicit attempt_number if given,
+# otherwise the counter's latest. Both are primary/unique key lookups.
+CURRENT_ATTEMPT_SQL = """
+    FROM learner_attempt_counters c
+    WHERE c.student_id = %(student_id)s AND c.module_id = %(module_id)s
+      AND lp.student_id = c.student_id AND lp.module_id = c.module_id
+      AND lp.attempt_number = COALESCE(%(attempt_number)s, c.last_attempt)
+"""
+
+
 @lms_bp.route('/students/<student_id>/modules/<int:module_id>/start', methods=['POST'])
 def start_module(student_id, module_id):
     """
@@ -661,35 +1038,18 @@ def start_module(student_id, module_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Check if module exists
-        cur.execute("SELECT id, title FROM modules WHERE id = %s;", (module_id,))
-        module = cur.fetchone()
-        if not module:
+        # Check the module exists, allocate the attempt and insert it in one statement
+        cur.execute(START_ATTEMPT_SQL, {'student_id': student_id, 'module_id': module_id})
+        
+        new_record = cur.fetchone()
+        if not new_record:
+            conn.rollback()
             cur.close()
             conn.close()
             return jsonify({'success': False, 'error': 'Module not found'}), 404
         
-        # Get current attempt number
-        cur.execute("""
-            SELECT COALESCE(MAX(attempt_number), 0) as last_attempt
-            FROM learner_performance
-            WHERE student_id = %s AND module_id = %s;
-        """, (student_id, module_id))
-        
-        result = cur.fetchone()
-        attempt_number = result['last_attempt'] + 1
-        
-        # Insert new learner_performance record
-        cur.execute("""
-            INSERT INTO learner_performance (
-                student_id, module_id, attempt_number,
-                time_spent_seconds, errors_count, mastery_score, completed
-            ) VALUES (%s, %s, %s, 0, 0, 0.0, FALSE)
-            RETURNING log_id, timestamp;
-        """, (student_id, module_id, attempt_number))
-        
-        new_record = cur.fetchone()
         conn.commit()
+        attempt_number = new_record['attempt_number']
         
         logger.info(f"Student {student_id} started module {module_id} (attempt #{attempt_number})")
         
@@ -700,7 +1060,7 @@ def start_module(student_id, module_id):
             'success': True,
             'log_id': new_record['log_id'],
             'attempt_number': attempt_number,
-            'module_title': module['title'],
+            'module_title': new_record['title'],
             'started_at': new_record['timestamp'].isoformat()
         }), 201
         
@@ -734,37 +1094,28 @@ def log_activity(student_id, module_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Find the record to update
-        if attempt_number:
-            cur.execute("""
-                SELECT log_id FROM learner_performance
-                WHERE student_id = %s AND module_id = %s AND attempt_number = %s;
-            """, (student_id, module_id, attempt_number))
-        else:
-            # Get most recent attempt
-            cur.execute("""
-                SELECT log_id FROM learner_performance
-                WHERE student_id = %s AND module_id = %s
-                ORDER BY timestamp DESC LIMIT 1;
-            """, (student_id, module_id))
-        
-        record = cur.fetchone()
-        if not record:
+        # Update the given attempt, or the latest one, in a single statement
+        cur.execute(f"""
+            UPDATE learner_performance lp
+            SET time_spent_seconds = %(time_spent)s,
+                errors_count = %(errors)s,
+                timestamp = CURRENT_TIMESTAMP
+            {CURRENT_ATTEMPT_SQL}
+            RETURNING lp.log_id, lp.time_spent_seconds, lp.errors_count, lp.timestamp;
+        """, {
+            'time_spent': time_spent,
+            'errors': errors,
+            'student_id': student_id,
+            'module_id': module_id,
+            'attempt_number': attempt_number or None
+        })
+        
+        updated = cur.fetchone()
+        if not updated:
             cur.close()
             conn.close()
             return jsonify({'success': False, 'error': 'No active session found. Call /start first'}), 404
         
-        # Update the record
-        cur.execute("""
-            UPDATE learner_performance
-            SET time_spent_seconds = %s,
-                errors_count = %s,
-                timestamp = CURRENT_TIMESTAMP
-            WHERE log_id = %s
-            RETURNING log_id, time_spent_seconds, errors_count, timestamp;
-        """, (time_spent, errors, record['log_id']))
-        
-        updated = cur.fetchone()
         conn.commit()
         
         cur.close()
@@ -810,95 +1161,88 @@ def complete_module(student_id, module_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Get module subsystem
-        cur.execute("SELECT subsystem FROM modules WHERE id = %s;", (module_id,))
-        module = cur.fetchone()
-        if not module:
+        # Complete the attempt, upsert subsystem competency (recomputing its
+        # level) and update the leaderboard in a single round trip
+        cur.execute(f"""
+            WITH module AS (
+                SELECT id, COALESCE(subsystem, 'general') AS subsystem
+                FROM modules WHERE id = %(module_id)s
+            ),
+            completion AS (
+                UPDATE learner_performance lp
+                SET time_spent_seconds = %(time)s,
+                    errors_count = %(errors)s,
+                    mastery_score = %(score)s,
+                    completed = TRUE,
+                    timestamp = CURRENT_TIMESTAMP
+                {CURRENT_ATTEMPT_SQL}
+                  AND EXISTS (SELECT 1 FROM module)
+                RETURNING lp.log_id, lp.timestamp
+            ),
+            competency AS (
+                INSERT INTO subsystem_competency (
+                    student_id, subsystem, modules_completed,
+                    competency_level, last_activity
+                )
+                SELECT %(student_id)s, module.subsystem, 1,
+                       {competency_level_sql('1')}, CURRENT_TIMESTAMP
+                FROM module, completion
+                ON CONFLICT (student_id, subsystem) DO UPDATE SET
+                    modules_completed = subsystem_competency.modules_completed + 1,
+                    competency_level = {competency_level_sql('subsystem_competency.modules_completed + 1')},
+                    last_activity = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING modules_completed, competency_level
+            ),
+            leaderboard AS (
+                {UPSERT_ENTRY_SQL.format(source="FROM completion")}
+            )
+            SELECT
+                (SELECT subsystem FROM module) AS subsystem,
+                completion.timestamp,
+                competency.modules_completed,
+                competency.competency_level,
+                leaderboard.student_id,
+                leaderboard.module_id,
+                leaderboard.subsystem AS entry_subsystem,
+                leaderboard.best_score,
+                leaderboard.best_time,
+                leaderboard.attempts
+            FROM (SELECT 1) AS one
+            LEFT JOIN completion ON TRUE
+            LEFT JOIN competency ON TRUE
+            LEFT JOIN leaderboard ON TRUE;
+        """, {
+            'time': time_spent,
+            'errors': errors,
+            'score': mastery_score,
+            'student_id': student_id,
+            'module_id': module_id,
+            'attempt_number': attempt_number or None
+        })
+        
+        result = cur.fetchone()
+        if result['subsystem'] is None:
+            conn.rollback()
             cur.close()
             conn.close()
             return jsonify({'success': False, 'error': 'Module not found'}), 404
         
-        subsystem = module['subsystem'] if module['subsystem'] else 'general'
-        
-        # Find and update learner_performance record
-        if attempt_number:
-            cur.execute("""
-                UPDATE learner_performance
-                SET time_spent_seconds = %s,
-                    errors_count = %s,
-                    mastery_score = %s,
-                    completed = TRUE,
-                    timestamp = CURRENT_TIMESTAMP
-                WHERE student_id = %s AND module_id = %s AND attempt_number = %s
-                RETURNING log_id, timestamp;
-            """, (time_spent, errors, mastery_score, student_id, module_id, attempt_number))
-        else:
-            cur.execute("""
-                UPDATE learner_performance
-                SET time_spent_seconds = %s,
-                    errors_count = %s,
-                    mastery_score = %s,
-                    completed = TRUE,
-                    timestamp = CURRENT_TIMESTAMP
-                WHERE student_id = %s AND module_id = %s
-                  AND log_id = (
-                      SELECT log_id FROM learner_performance
-                      WHERE student_id = %s AND module_id = %s
-                      ORDER BY timestamp DESC LIMIT 1
-                  )
-                RETURNING log_id, timestamp;
-            """, (time_spent, errors, mastery_score, student_id, module_id, student_id, module_id))
-        
-        completion = cur.fetchone()
-        if not completion:
+        if result['timestamp'] is None:
+            conn.rollback()
             cur.close()
             conn.close()
             return jsonify({'success': False, 'error': 'No active session found'}), 404
         
-        # Update subsystem_competency
-        cur.execute("""
-            INSERT INTO subsystem_competency (student_id, subsystem, modules_completed, last_activity)
-            VALUES (%s, %s, 1, CURRENT_TIMESTAMP)
-            ON CONFLICT (student_id, subsystem)
-            DO UPDATE SET
-                modules_completed = subsystem_competency.modules_completed + 1,
-                last_activity = CURRENT_TIMESTAMP
-            RETURNING competency_id, modules_completed, competency_level;
-        """, (student_id, subsystem))
-        
-        # Wait, there's no ON CONFLICT constraint. Let me do it differently:
-        cur.execute("""
-            SELECT competency_id, modules_completed, competency_level
-            FROM subsystem_competency
-            WHERE student_id = %s AND subsystem = %s;
-        """, (student_id, subsystem))
-        
-        competency = cur.fetchone()
-        
-        if competency:
-            # Update existing
-            new_count = competency['modules_completed'] + 1
-            cur.execute("""
-                UPDATE subsystem_competency
-                SET modules_completed = %s,
-                    last_activity = CURRENT_TIMESTAMP,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE competency_id = %s
-                RETURNING modules_completed, competency_level;
-            """, (new_count, competency['competency_id']))
-            competency = cur.fetchone()
-        else:
-            # Insert new
-            cur.execute("""
-                INSERT INTO subsystem_competency (
-                    student_id, subsystem, modules_completed,
-                    competency_level, last_activity
-                ) VALUES (%s, %s, 1, 'orientation', CURRENT_TIMESTAMP)
-                RETURNING modules_completed, competency_level;
-            """, (student_id, subsystem))
-            competency = cur.fetchone()
+        subsystem = result['subsystem']
         
         conn.commit()
+        dashboard_cache.invalidate(student_id)
+        
+        # Reposition the student in any in-memory leaderboards
+        leaderboard_index.apply_completion(
+            dict(result, subsystem=result['entry_subsystem']), mastery_score, time_spent
+        )
         
         logger.info(f"Student {student_id} completed module {module_id} (score: {mastery_score})")
         
@@ -907,11 +1251,11 @@ def complete_module(student_id, module_id):
         
         return jsonify({
             'success': True,
-            'completed_at': completion['timestamp'].isoformat(),
+            'completed_at': result['timestamp'].isoformat(),
             'mastery_score': mastery_score,
             'subsystem': subsystem,
-            'modules_completed': competency['modules_completed'],
-            'competency_level': competency['competency_level']
+            'modules_completed': result['modules_completed'],
+            'competency_level': result['competency_level']
         }), 200
         
     except Exception as e:
@@ -933,15 +1277,31 @@ def get_ghost_cohorts(module_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Get ghost cohorts for this module
+        # Cohorts share the module's subsystem; race targets come along in the same query
         cur.execute("""
-            SELECT gc.cohort_id, gc.cohort_name, gc.semester, gc.university, gc.subsystem
-            FROM ghost_cohorts gc
-            JOIN race_metadata rm ON rm.module_id = %s
-            WHERE rm.ghost_data IS NOT NULL;
+            SELECT
+                rm.time_targets,
+                rm.checkpoints,
+                COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'cohort_id', gc.cohort_id,
+                        'cohort_name', gc.cohort_name,
+                        'semester', gc.semester,
+                        'university', gc.university,
+                        'subsystem', gc.subsystem
+                    ) ORDER BY gc.cohort_id)
+                    FROM ghost_cohorts gc
+                    WHERE gc.subsystem = m.subsystem
+                ), '[]'::json) AS cohorts
+            FROM modules m
+            LEFT JOIN race_metadata rm ON rm.module_id = m.id
+            WHERE m.id = %s
+            ORDER BY rm.race_id
+            LIMIT 1;
         """, (module_id,))
         
-        cohorts = cur.fetchall()
+        race_data = cur.fetchone()
+        cohorts = race_data['cohorts'] if race_data else []
         
         if not cohorts:
             # No ghost cohorts found
@@ -954,14 +1314,7 @@ def get_ghost_cohorts(module_id):
                 'message': 'No ghost cohorts available for this module'
             }), 200
         
-        # Get race metadata with ghost data
-        cur.execute("""
-            SELECT ghost_data, time_targets, checkpoints
-            FROM race_metadata
-            WHERE module_id = %s;
-        """, (module_id,))
-        
-        race_data = cur.fetchone()
+        benchmark = ghost_benchmarks.get(module_id, cur=cur)
         
         cur.close()
         conn.close()
@@ -969,10 +1322,10 @@ def get_ghost_cohorts(module_id):
         result = {
             'success': True,
             'count': len(cohorts),
-            'ghost_cohorts': [dict(c) for c in cohorts],
-            'time_targets': race_data['time_targets'] if race_data else None,
-            'checkpoints': race_data['checkpoints'] if race_data else None,
-            'ghost_data': race_data['ghost_data'] if race_data else None
+            'ghost_cohorts': cohorts,
+            'time_targets': race_data['time_targets'],
+            'checkpoints': race_data['checkpoints'],
+            'benchmark': benchmark.summary() if benchmark else None
         }
         
         return jsonify(result), 200
@@ -982,6 +1335,52 @@ def get_ghost_cohorts(module_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lms_bp.route('/modules/<int:module_id>/ghost_benchmark', methods=['GET'])
+def get_ghost_benchmark(module_id):
+    """
+    GET /api/lms/modules/<id>/ghost_benchmark
+    
+    Percentile curves of completion time and mastery score for this module,
+    precomputed by scripts/refresh_ghost_benchmarks.py. Responses carry an
+    ETag tied to the benchmark version and honour If-None-Match.
+    
+    Query params:
+        - format: 'json' (default) or 'binary' for the packed payload
+    
+    Returns:
+        Curves sampled at fixed percentiles, or 304 if unchanged
+    """
+    try:
+        benchmark = ghost_benchmarks.get(module_id)
+        
+        if benchmark is None:
+            return jsonify({
+                'success': False,
+                'error': 'No ghost benchmark for this module'
+            }), 404
+        
+        binary = request.args.get('format') == 'binary'
+        etag = benchmark.etag + ('-bin' if binary else '')
+        
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        elif binary:
+            response = make_response(encode_curves(
+                benchmark.sample_size, benchmark.time_curve, benchmark.score_curve
+            ))
+            response.mimetype = 'application/octet-stream'
+        else:
+            response = make_response(jsonify({'success': True, 'benchmark': benchmark.to_dict()}))
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'public, max-age=300'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Failed to fetch ghost benchmark: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @lms_bp.route('/students/<student_id>/leaderboard', methods=['GET'])
 def get_leaderboard(student_id):
     """
@@ -990,7 +1389,7 @@ def get_leaderboard(student_id):
     Get leaderboard rankings for a student.
     
     Query parameters:
-        - subsystem (optional): Filter by subsystem
+        - subsystem (optional): Restrict the overall leaderboard to one subsystem
         - module_id (optional): Specific module leaderboard
     
     Returns:
@@ -1000,62 +1399,12 @@ def get_leaderboard(student_id):
         subsystem = request.args.get('subsystem')
         module_id = request.args.get('module_id', type=int)
         
-        conn = get_postgres_conn()
-        cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-        
-        # Build query based on filters
-        if module_id:
-            # Module-specific leaderboard
-            query = """
-                WITH ranked AS (
-                    SELECT 
-                        student_id,
-                        MAX(mastery_score) as best_score,
-                        MIN(time_spent_seconds) as best_time,
-                        COUNT(*) as attempts,
-                        RANK() OVER (ORDER BY MAX(mastery_score) DESC, MIN(time_spent_seconds) ASC) as rank
-                    FROM learner_performance
-                    WHERE module_id = %s AND completed = TRUE
-                    GROUP BY student_id
-                )
-                SELECT * FROM ranked WHERE rank <= 10 OR student_id = %s
-                ORDER BY rank;
-            """
-            cur.execute(query, (module_id, student_id))
-        else:
-            # Overall leaderboard (total mastery across all modules)
-            query = """
-                WITH ranked AS (
-                    SELECT 
-                        student_id,
-                        AVG(mastery_score) as avg_score,
-                        SUM(time_spent_seconds) as total_time,
-                        COUNT(DISTINCT module_id) as modules_completed,
-                        RANK() OVER (ORDER BY AVG(mastery_score) DESC, COUNT(DISTINCT module_id) DESC) as rank
-                    FROM learner_performance
-                    WHERE completed = TRUE
-                    GROUP BY student_id
-                )
-                SELECT * FROM ranked WHERE rank <= 10 OR student_id = %s
-                ORDER BY rank;
-            """
-            cur.execute(query, (student_id,))
-        
-        rankings = cur.fetchall()
-        
-        # Find student's position
-        student_rank = None
-        top_10 = []
-        
-        for r in rankings:
-            rank_data = dict(r)
-            if rank_data['student_id'] == student_id:
-                student_rank = rank_data
-            if rank_data['rank'] <= 10:
-                top_10.append(rank_data)
+        # Module boards rank best score/time per student; overall boards rank
+        # average score across completed modules, optionally per subsystem
+        board = leaderboard_index.board(module_id=module_id, subsystem=subsystem)
         
-        cur.close()
-        conn.close()
+        top_10 = board.top(10)
+        student_rank = board.position(student_id)
         
         return jsonify({
             'success': True,
@@ -1087,41 +1436,58 @@ def get_subsystem_competency(student_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Get all competencies
+        # Competencies plus up to 3 shortest uncompleted published modules per
+        # subsystem in one round trip. The LATERAL subquery walks
+        # idx_modules_subsystem_status_minutes in order and anti-joins the
+        # student's completions, stopping after 3 hits.
         cur.execute("""
             SELECT 
-                subsystem,
-                competency_level,
-                modules_completed,
-                last_activity
-            FROM subsystem_competency
-            WHERE student_id = %s
-            ORDER BY modules_completed DESC;
-        """, (student_id,))
-        
-        competencies = [dict(c) for c in cur.fetchall()]
-        
-        # For each subsystem, suggest next modules
-        # (This is a simple implementation - could be more sophisticated)
-        for comp in competencies:
-            subsystem = comp['subsystem']
-            
-            # Get uncompleted modules in this subsystem
-            cur.execute("""
+                sc.subsystem,
+                sc.competency_level,
+                sc.modules_completed,
+                sc.last_activity,
+                rec.id AS rec_id,
+                rec.title AS rec_title,
+                rec.estimated_minutes AS rec_estimated_minutes
+            FROM subsystem_competency sc
+            LEFT JOIN LATERAL (
                 SELECT m.id, m.title, m.estimated_minutes
                 FROM modules m
-                WHERE m.subsystem = %s
+                WHERE m.subsystem = sc.subsystem
                   AND m.status = 'published'
-                  AND m.id NOT IN (
-                      SELECT DISTINCT module_id 
-                      FROM learner_performance
-                      WHERE student_id = %s AND completed = TRUE
+                  AND NOT EXISTS (
+                      SELECT 1 FROM learner_performance lp
+                      WHERE lp.student_id = sc.student_id
+                        AND lp.module_id = m.id
+                        AND lp.completed = TRUE
                   )
                 ORDER BY m.estimated_minutes ASC
-                LIMIT 3;
-            """, (subsystem, student_id))
-            
-            comp['recommended_modules'] = [dict(m) for m in cur.fetchall()]
+                LIMIT 3
+            ) rec ON TRUE
+            WHERE sc.student_id = %s
+            ORDER BY sc.modules_completed DESC, sc.subsystem, rec.estimated_minutes ASC;
+        """, (student_id,))
+        
+        competencies = []
+        by_subsystem = {}
+        for row in cur.fetchall():
+            comp = by_subsystem.get(row['subsystem'])
+            if comp is None:
+                comp = {
+                    'subsystem': row['subsystem'],
+                    'competency_level': row['competency_level'],
+                    'modules_completed': row['modules_completed'],
+                    'last_activity': row['last_activity'],
+                    'recommended_modules': []
+                }
+                by_subsystem[row['subsystem']] = comp
+                competencies.append(comp)
+            if row['rec_id'] is not None:
+                comp['recommended_modules'].append({
+                    'id': row['rec_id'],
+                    'title': row['rec_title'],
+                    'estimated_minutes': row['rec_estimated_minutes']
+                })
         
         cur.close()
         conn.close()
@@ -1162,7 +1528,7 @@ def start_race(student_id):
         
         # Get race metadata
         cur.execute("""
-            SELECT race_id, ghost_data, time_targets, checkpoints
+            SELECT race_id, time_targets, checkpoints
             FROM race_metadata
             WHERE module_id = %s;
         """, (module_id,))
@@ -1178,25 +1544,16 @@ def start_race(student_id):
             }), 404
         
         # Start a new learner_performance session
-        cur.execute("""
-            SELECT COALESCE(MAX(attempt_number), 0) as last_attempt
-            FROM learner_performance
-            WHERE student_id = %s AND module_id = %s;
-        """, (student_id, module_id))
-        
-        result = cur.fetchone()
-        attempt_number = result['last_attempt'] + 1
-        
-        cur.execute("""
-            INSERT INTO learner_performance (
-                student_id, module_id, attempt_number,
-                time_spent_seconds, errors_count, mastery_score, completed
-            ) VALUES (%s, %s, %s, 0, 0, 0.0, FALSE)
-            RETURNING log_id, timestamp;
-        """, (student_id, module_id, attempt_number))
+        cur.execute(START_ATTEMPT_SQL, {'student_id': student_id, 'module_id': module_id})
         
         session = cur.fetchone()
         conn.commit()
+        attempt_number = session['attempt_number']
+        
+        # Only a summary goes out here; full curves are fetched (and cached)
+        # from the ghost_benchmark endpoint
+        benchmark = ghost_benchmarks.get(module_id, cur=cur)
+        race_hub.join(module_id, student_id, len(race_meta['checkpoints'] or []), benchmark)
         
         logger.info(f"Student {student_id} started race for module {module_id}")
         
@@ -1209,7 +1566,7 @@ def start_race(student_id):
             'session_id': session['log_id'],
             'attempt_number': attempt_number,
             'started_at': session['timestamp'].isoformat(),
-            'ghost_data': race_meta['ghost_data'],
+            'ghost_data': benchmark.summary() if benchmark else None,
             'time_targets': race_meta['time_targets'],
             'checkpoints': race_meta['checkpoints']
         }), 201
@@ -1235,6 +1592,7 @@ def complete_race(student_id):
     Returns:
         Results + comparison to ghost cohorts + celebration metadata
     """
+    conn = None
     try:
         data = request.get_json()
         module_id = data.get('module_id')
@@ -1248,22 +1606,24 @@ def complete_race(student_id):
         conn = get_postgres_conn()
         cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        # Update most recent learner_performance record
-        cur.execute("""
-            UPDATE learner_performance
-            SET time_spent_seconds = %s,
-                errors_count = %s,
-                mastery_score = %s,
+        # Update the latest attempt for this module
+        cur.execute(f"""
+            UPDATE learner_performance lp
+            SET time_spent_seconds = %(time_spent)s,
+                errors_count = %(errors)s,
+                mastery_score = %(mastery_score)s,
                 completed = TRUE,
                 timestamp = CURRENT_TIMESTAMP
-            WHERE student_id = %s AND module_id = %s
-              AND log_id = (
-                  SELECT log_id FROM learner_performance
-                  WHERE student_id = %s AND module_id = %s
-                  ORDER BY timestamp DESC LIMIT 1
-              )
-            RETURNING log_id, timestamp;
-        """, (time_seconds, errors, mastery_score, student_id, module_id, student_id, module_id))
+            {CURRENT_ATTEMPT_SQL}
+            RETURNING lp.log_id, lp.timestamp;
+        """, {
+            'time_spent': time_seconds,
+            'errors': errors,
+            'mastery_score': mastery_score,
+            'student_id': student_id,
+            'module_id': module_id,
+            'attempt_number': None
+        })
         
         completion = cur.fetchone()
         
@@ -1274,29 +1634,42 @@ def complete_race(student_id):
         
         # Get race metadata for comparison
         cur.execute("""
-            SELECT ghost_data, time_targets, leaderboard_data
+            SELECT time_targets
             FROM race_metadata
             WHERE module_id = %s;
         """, (module_id,))
         
         race_meta = cur.fetchone()
+        benchmark = ghost_benchmarks.get(module_id, cur=cur)
         
-        # Calculate ranking among all completions of this module
-        cur.execute("""
-            SELECT 
-                COUNT(*) + 1 as rank,
-                COUNT(*) as total_completions
-            FROM learner_performance
-            WHERE module_id = %s 
-              AND completed = TRUE
-              AND (mastery_score > %s OR 
-                   (mastery_score = %s AND time_spent_seconds < %s));
-        """, (module_id, mastery_score, mastery_score, time_seconds))
+        # Update the materialized leaderboard with the completion
+        entry = leaderboard_index.record_completion(cur, student_id, module_id, mastery_score, time_seconds)
         
-        ranking = cur.fetchone()
+        conn.commit()
+        dashboard_cache.invalidate(student_id)
+        
+        # Only committed completions reach the in-memory boards; rank against them
+        leaderboard_index.apply_completion(entry, mastery_score, time_seconds)
+        board = leaderboard_index.board(module_id=module_id, cur=cur)
+        ranking = {
+            'rank': board.rank_for(module_sort_key(mastery_score, time_seconds)),
+            'total_completions': len(board)
+        }
         
-        # Determine celebration level
-        percentile = (ranking['rank'] / max(ranking['total_completions'], 1)) * 100
+        # Determine celebration level (percentile = top X% of finishers)
+        ghost_comparison = None
+        if benchmark:
+            percentile = 100 - percent_below(benchmark.score_curve, mastery_score)
+            faster_than = 100 - percent_below(benchmark.time_curve, time_seconds)
+            ghost_comparison = {
+                'benchmark_version': benchmark.version,
+                'median_time': round(benchmark.median_time()),
+                'median_score': round(benchmark.median_score(), 2),
+                'faster_than_percent': round(faster_than, 1),
+                'improvement': f"Faster than {round(faster_than)}% of past finishers"
+            }
+        else:
+            percentile = (ranking['rank'] / max(ranking['total_completions'], 1)) * 100
         
         if percentile <= 10:
             celebration = 'legendary'
@@ -1307,7 +1680,7 @@ def complete_race(student_id):
         else:
             celebration = 'complete'
         
-        conn.commit()
+        race_hub.finish(module_id, student_id)
         
         logger.info(f"Student {student_id} completed race for module {module_id} (rank: {ranking['rank']})")
         
@@ -1324,15 +1697,213 @@ def complete_race(student_id):
             'total_completions': ranking['total_completions'],
             'percentile': percentile,
             'celebration': celebration,
-            'ghost_comparison': race_meta['ghost_data'] if race_meta else None,
+            'ghost_comparison': ghost_comparison,
             'time_targets': race_meta['time_targets'] if race_meta else None
         }), 200
         
     except Exception as e:
+        if conn is not None and not conn.closed:
+            conn.rollback()
+            conn.close()
         logger.error(f"Failed to complete race: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@lms_bp.route('/students/<student_id>/race/checkpoint', methods=['POST'])
+def race_checkpoint(student_id):
+    """
+    POST /api/lms/students/<id>/race/checkpoint
+    
+    Report progress during a race. Handled entirely in memory; subscribers
+    of the module's race stream receive the updated standing.
+    
+    Request body:
+        - module_id: int
+        - checkpoint: int (checkpoints reached so far)
+        - elapsed_seconds: float
+    
+    Returns:
+        Rank among live racers + projected ghost percentile
+    """
+    try:
+        data = request.get_json()
+        module_id = data.get('module_id')
+        
+        if not module_id:
+            return jsonify({'success': False, 'error': 'module_id required'}), 400
+        
+        standing = race_hub.checkpoint(
+            int(module_id), student_id,
+            int(data.get('checkpoint', 0)),
+            float(data.get('elapsed_seconds', 0))
+        )
+        
+        if standing is None:
+            return jsonify({'success': False, 'error': 'No active race session'}), 404
+        
+        return jsonify({'success': True, 'standing': standing}), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to record race checkpoint: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@lms_bp.route('/modules/<int:module_id>/race/stream', methods=['GET'])
+def race_stream(module_id):
+    """
+    GET /api/lms/modules/<id>/race/stream
+    
+    Server-Sent Events stream of live race standings for a module. Starts
+    with a 'snapshot' event of every active racer, then one event per
+    join/checkpoint/finish.
+    """
+    events = race_hub.subscribe(module_id)
+    
+    def generate():
+        try:
+            snapshot = {'event': 'snapshot', 'standings': race_hub.standings(module_id)}
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+            while True:
+                try:
+                    message = events.get(timeout=RACE_STREAM_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            race_hub.unsubscribe(module_id, events)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+DASHBOARD_FIELDS = ('assignments', 'competencies', 'rank')
+
+# One row holding the student's competency summaries as a JSON array
+DASHBOARD_COMPETENCIES_SQL = text("""
+    SELECT COALESCE(json_agg(c ORDER BY c.modules_completed DESC), '[]') AS competencies
+    FROM (
+        SELECT subsystem, competency_level, modules_completed, last_activity
+        FROM subsystem_competency
+        WHERE student_id = :student_id
+    ) c
+""").columns(column('competencies'))
+
+
+@lms_bp.route('/students/<student_id>/dashboard', methods=['GET'])
+def get_student_dashboard(student_id):
+    """
+    GET /api/lms/students/<id>/dashboard
+    
+    Everything the student dashboard needs in one request: assignments with
+    progress (soonest due first), competency summaries and overall rank.
+    Cached briefly per student and dropped when their progress changes.
+    
+    Query parameters:
+        - fields (optional): Comma-separated subset of assignments,competencies,rank
+    
+    Returns:
+        JSON object with the requested sections
+    """
+    try:
+        requested = request.args.get('fields')
+        fields = tuple(f for f in DASHBOARD_FIELDS
+                       if not requested or f in requested.split(','))
+        
+        cached = dashboard_cache.get(student_id, fields)
+        if cached is not None:
+            return jsonify(cached), 200
+        
+        dashboard = {'success': True, 'student_id': student_id}
+        
+        # Assignments with module summary and progress, and the competency
+        # summaries, come back from one statement on the session connection
+        assignment = select(
+            ModuleAssignment.due_date,
+            ModuleAssignment.required,
+            ModuleAssignment.assigned_at,
+            Module.id,
+            Module.title,
+            Module.category,
+            Module.estimated_minutes,
+            ModuleProgress.status.label('progress_status'),
+            ModuleProgress.progress_percent,
+            ModuleProgress.current_section,
+            ModuleProgress.last_accessed_at,
+            ModuleProgress.completed_at
+        ).join(
+            Module, Module.id == ModuleAssignment.module_id
+        ).outerjoin(
+            ModuleProgress, and_(
+                ModuleProgress.module_id == ModuleAssignment.module_id,
+                ModuleProgress.student_id == ModuleAssignment.student_id
+            )
+        ).where(
+            ModuleAssignment.student_id == student_id
+        ).subquery('assignment')
+        competency = DASHBOARD_COMPETENCIES_SQL.bindparams(student_id=student_id).subquery('competency')
+        
+        if 'assignments' in fields:
+            columns = [assignment]
+            source = assignment
+            if 'competencies' in fields:
+                # The one competency row, left joined so it survives having no assignments
+                columns.insert(0, competency.c.competencies)
+                source = competency.outerjoin(assignment, true())
+            rows = db.session.execute(
+                select(*columns).select_from(source).order_by(
+                    assignment.c.due_date.is_(None),
+                    assignment.c.due_date,
+                    assignment.c.assigned_at
+                )
+            ).all()
+            if 'competencies' in fields:
+                dashboard['competencies'] = rows[0].competencies
+                rows = [row for row in rows if row.id is not None]
+            
+            now = datetime.utcnow()
+            assignments = []
+            summary = {'total': len(rows), 'completed': 0, 'in_progress': 0, 'overdue': 0}
+            for row in rows:
+                status = row.progress_status or 'not_started'
+                if status in ('completed', 'in_progress'):
+                    summary[status] += 1
+                if row.due_date and row.due_date < now and status != 'completed':
+                    summary['overdue'] += 1
+                assignments.append({
+                    'module_id': row.id,
+                    'title': row.title,
+                    'category': row.category,
+                    'estimated_minutes': row.estimated_minutes,
+                    'due_date': row.due_date.isoformat() if row.due_date else None,
+                    'required': row.required,
+                    'assigned_at': row.assigned_at.isoformat() if row.assigned_at else None,
+                    'progress': {
+                        'status': status,
+                        'progress_percent': row.progress_percent or 0,
+                        'current_section': row.current_section,
+                        'last_accessed_at': row.last_accessed_at.isoformat() if row.last_accessed_at else None,
+                        'completed_at': row.completed_at.isoformat() if row.completed_at else None
+                    }
+                })
+            dashboard['assignments'] = assignments
+            dashboard['summary'] = summary
+        elif 'competencies' in fields:
+            dashboard['competencies'] = db.session.execute(select(competency.c.competencies)).scalar_one()
+        
+        if 'rank' in fields:
+            dashboard['rank'] = leaderboard_index.board().position(student_id)
+        
+        dashboard_cache.set(student_id, fields, dashboard)
+        return jsonify(dashboard), 200
+        
+    except Exception as e:
+        logger.error(f"Failed to build dashboard for {student_id}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 # ============================================================================
 # END ASCENT BASECAMP ENDPOINTS
 # ============================================================================
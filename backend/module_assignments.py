@@ -0,0 +1,77 @@
+"""
+Set-based module assignment
+Assignments are created with a single INSERT ... ON CONFLICT DO NOTHING
+against the unique (module_id, student_id) key. Cohort selectors are
+resolved inside the same statement as an INSERT ... SELECT over students;
+explicit student ids go through the same SELECT, so ids with no student
+row are never inserted (see unknown_student_ids to report them).
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, false, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from shared.database.db_models import ModuleAssignment, StudentModel
+from .database import db
+
+# Student columns that can select a cohort
+COHORT_FIELDS = ('team_id', 'university_id', 'status')
+
+_RETURNING = (
+    ModuleAssignment.id, ModuleAssignment.module_id, ModuleAssignment.student_id,
+    ModuleAssignment.assigned_at, ModuleAssignment.due_date, ModuleAssignment.required,
+    ModuleAssignment.assigned_by_id,
+)
+
+
+def _insert():
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(ModuleAssignment.__table__)
+
+
+def unknown_student_ids(student_ids: List[str]) -> List[str]:
+    """Ids from student_ids with no row in students, in the order given"""
+    student_ids = list(dict.fromkeys(student_ids))
+    if not student_ids:
+        return []
+    known = set(db.session.execute(
+        select(StudentModel.id).where(StudentModel.id.in_(student_ids))
+    ).scalars())
+    return [student_id for student_id in student_ids if student_id not in known]
+
+
+def bulk_assign(module_id: int, student_ids: Optional[List[str]] = None,
+                cohort: Optional[Dict] = None, due_date: Optional[datetime] = None,
+                required: bool = True, assigned_by_id: Optional[str] = None) -> List[ModuleAssignment]:
+    """
+    Assign a module to explicit students and/or an active-student cohort in
+    one statement. Explicit ids without a student row are skipped; existing
+    assignments are left untouched. Returns only the newly created ones
+    (caller commits).
+    """
+    student_ids = list(dict.fromkeys(student_ids or []))
+    assigned_at = datetime.utcnow()
+
+    if not cohort and not student_ids:
+        return []
+
+    selected = StudentModel.id.in_(student_ids) if student_ids else false()
+    if cohort:
+        conditions = [StudentModel.active.is_(True)] + [
+            getattr(StudentModel, field) == value for field, value in cohort.items()
+        ]
+        selected = or_(and_(*conditions), selected)
+    source = select(
+        literal(module_id), StudentModel.id, literal(assigned_at),
+        literal(due_date, ModuleAssignment.due_date.type),
+        literal(required), literal(assigned_by_id, ModuleAssignment.assigned_by_id.type)
+    ).where(selected)
+    stmt = _insert().from_select(
+        ['module_id', 'student_id', 'assigned_at', 'due_date', 'required', 'assigned_by_id'],
+        source
+    )
+    stmt = stmt.on_conflict_do_nothing(index_elements=['module_id', 'student_id']).returning(*_RETURNING)
+    rows = db.session.execute(stmt).all()
+    return [ModuleAssignment(**row._mapping) for row in rows]
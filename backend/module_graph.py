@@ -0,0 +1,196 @@
+"""
+Module prerequisite graph
+Resolves Module.prerequisites into an adjacency index once per catalog
+version, with cycle detection, a cached topological order and transitive
+prerequisite closures. Completed sets are int bitmasks over the graph's
+node positions, so unlock checks are single AND operations.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from shared.database.db_models import Module, ModuleProgress
+from .database import db
+
+
+class PrerequisiteCycleError(ValueError):
+    """Raised when module prerequisites form a cycle"""
+
+    def __init__(self, cycle: List):
+        self.cycle = cycle
+        super().__init__("Prerequisite cycle: " + " -> ".join(str(k) for k in cycle))
+
+
+class ModuleGraph:
+    """
+    Prerequisite DAG over a module catalog.
+
+    Each module dict needs 'key' (node identity, e.g. the database id),
+    'module_id', 'title' and 'prerequisites'. Prerequisite references are
+    resolved against module_id first and then case-insensitive title, since
+    exported modules reference each other both ways.
+    """
+
+    def __init__(self, modules: Iterable[Dict], version=None):
+        self.version = version
+        self.keys: List = []
+        self.position: Dict = {}
+        self.modules: Dict = {}
+        self.unresolved: List[Tuple] = []
+
+        for module in modules:
+            self.position[module['key']] = len(self.keys)
+            self.keys.append(module['key'])
+            self.modules[module['key']] = module
+
+        aliases = {}
+        for key, module in self.modules.items():
+            aliases.setdefault(str(module['module_id']), key)
+        for key, module in self.modules.items():
+            if module.get('title'):
+                aliases.setdefault(module['title'].strip().lower(), key)
+
+        size = len(self.keys)
+        self.prereqs: List[List[int]] = [[] for _ in range(size)]
+        self.dependents: List[List[int]] = [[] for _ in range(size)]
+        self.prereq_mask: List[int] = [0] * size
+
+        for key, module in self.modules.items():
+            pos = self.position[key]
+            for ref in module.get('prerequisites') or []:
+                target = aliases.get(str(ref)) or aliases.get(str(ref).strip().lower())
+                if target is None:
+                    self.unresolved.append((key, ref))
+                    continue
+                target_pos = self.position[target]
+                if self.prereq_mask[pos] >> target_pos & 1:
+                    continue
+                self.prereqs[pos].append(target_pos)
+                self.dependents[target_pos].append(pos)
+                self.prereq_mask[pos] |= 1 << target_pos
+
+        self.roots_mask = sum(1 << pos for pos in range(size) if not self.prereqs[pos])
+        self.topological_order = self._toposort()
+        self._closure: Optional[List[int]] = None
+
+    def _toposort(self) -> List:
+        """Kahn's algorithm; raises PrerequisiteCycleError on a cycle"""
+        indegree = [len(p) for p in self.prereqs]
+        ready = [pos for pos, deg in enumerate(indegree) if deg == 0]
+        order = []
+        while ready:
+            pos = ready.pop()
+            order.append(pos)
+            for dependent in self.dependents[pos]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(self.keys):
+            raise PrerequisiteCycleError(self._find_cycle(indegree))
+        return [self.keys[pos] for pos in order]
+
+    def _find_cycle(self, indegree: List[int]) -> List:
+        """Walk prerequisite edges among unsorted nodes until one repeats"""
+        start = next(pos for pos, deg in enumerate(indegree) if deg > 0)
+        seen = {}
+        path = []
+        pos = start
+        while pos not in seen:
+            seen[pos] = len(path)
+            path.append(pos)
+            pos = next(p for p in self.prereqs[pos] if indegree[p] > 0)
+        cycle = path[seen[pos]:] + [pos]
+        return [self.keys[p] for p in reversed(cycle)]
+
+    @property
+    def closure_masks(self) -> List[int]:
+        """Transitive prerequisite bitmask per node, computed once in topo order"""
+        if self._closure is None:
+            closure = [0] * len(self.keys)
+            for key in self.topological_order:
+                pos = self.position[key]
+                mask = self.prereq_mask[pos]
+                for prereq in self.prereqs[pos]:
+                    mask |= closure[prereq]
+                closure[pos] = mask
+            self._closure = closure
+        return self._closure
+
+    def mask_for(self, keys: Iterable) -> int:
+        """Bitmask of the given node keys (unknown keys are ignored)"""
+        mask = 0
+        for key in keys:
+            pos = self.position.get(key)
+            if pos is not None:
+                mask |= 1 << pos
+        return mask
+
+    def unlocked(self, completed_mask: int) -> List:
+        """
+        Modules not yet completed whose prerequisites are all completed.
+
+        Only roots and dependents of completed modules can be unlocked, so
+        the work is proportional to that frontier, not the whole graph.
+        """
+        candidates = self.roots_mask
+        remaining = completed_mask
+        while remaining:
+            low = remaining & -remaining
+            for dependent in self.dependents[low.bit_length() - 1]:
+                candidates |= 1 << dependent
+            remaining ^= low
+        candidates &= ~completed_mask
+
+        unlocked = []
+        while candidates:
+            low = candidates & -candidates
+            pos = low.bit_length() - 1
+            if self.prereq_mask[pos] & completed_mask == self.prereq_mask[pos]:
+                unlocked.append(self.keys[pos])
+            candidates ^= low
+        return unlocked
+
+    def learning_path(self, key) -> List:
+        """All transitive prerequisites of a module, in topological order, ending with it"""
+        mask = self.closure_masks[self.position[key]] | (1 << self.position[key])
+        return [k for k in self.topological_order if mask >> self.position[k] & 1]
+
+
+_graph_lock = threading.Lock()
+_graph_cache: Dict[str, ModuleGraph] = {}
+
+
+def catalog_version() -> Tuple:
+    """Cheap fingerprint of the module catalog: row count and latest update"""
+    count, latest = db.session.query(func.count(Module.id), func.max(Module.updated_at)).one()
+    return (count, latest.isoformat() if latest else None)
+
+
+def get_module_graph() -> ModuleGraph:
+    """Return the graph for the current catalog version, rebuilding it only on change"""
+    version = catalog_version()
+    with _graph_lock:
+        graph = _graph_cache.get('graph')
+        if graph is not None and graph.version == version:
+            return graph
+
+        rows = db.session.query(
+            Module.id, Module.module_id, Module.title, Module.prerequisites, Module.status
+        ).order_by(Module.id).all()
+        graph = ModuleGraph(
+            ({'key': r.id, 'module_id': r.module_id, 'title': r.title,
+              'prerequisites': r.prerequisites, 'status': r.status} for r in rows),
+            version=version
+        )
+        _graph_cache['graph'] = graph
+        return graph
+
+
+def completed_mask_for_student(graph: ModuleGraph, student_id: str) -> int:
+    """Bitmask of the modules a student has completed"""
+    rows = db.session.query(ModuleProgress.module_id).filter_by(
+        student_id=student_id, status='completed'
+    ).all()
+    return graph.mask_for(module_id for (module_id,) in rows)
@@ -0,0 +1,183 @@
+"""
+Full-text module search
+Each module gets one search document built from its title, tags,
+description and section text. On Postgres it is a weighted tsvector in
+module_search behind a GIN index; on SQLite (local development) it is a row
+in the module_search_fts FTS5 table. Documents are rebuilt on deploy.
+
+The Postgres table and index are created by
+scripts/create_ascent_basecamp_schema.py; searches never run DDL.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from shared.database.db_models import Module
+from .database import db
+
+# Cap on section text per module; a tsvector must stay under 1MB
+MAX_BODY_CHARS = 200000
+
+# Module columns with facet counts in search results
+FACET_FIELDS = ('category', 'status', 'target_audience')
+
+# Filters accepted by search_modules, applied to the modules table
+FILTER_FIELDS = ('category', 'status', 'university_id', 'target_audience')
+
+SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS module_search_fts USING fts5(
+        title, tags, description, body, module_id UNINDEXED,
+        tokenize = 'porter unicode61'
+    )
+    """,
+]
+
+POSTGRES_UPSERT = """
+    INSERT INTO module_search (module_id, search_vector)
+    VALUES (
+        :module_id,
+        setweight(to_tsvector('english', :title), 'A') ||
+        setweight(to_tsvector('english', :tags), 'B') ||
+        setweight(to_tsvector('english', :description), 'C') ||
+        setweight(to_tsvector('english', :body), 'D')
+    )
+    ON CONFLICT (module_id) DO UPDATE SET
+        search_vector = EXCLUDED.search_vector,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+SQLITE_UPSERT = [
+    "DELETE FROM module_search_fts WHERE module_id = :module_id",
+    """
+    INSERT INTO module_search_fts (title, tags, description, body, module_id)
+    VALUES (:title, :tags, :description, :body, :module_id)
+    """,
+]
+
+# (module_id, rank) for every document matching :q, higher rank first
+POSTGRES_MATCH = """
+    SELECT module_id, ts_rank_cd(search_vector, query) AS rank
+    FROM module_search, websearch_to_tsquery('english', :q) AS query
+    WHERE search_vector @@ query
+"""
+
+SQLITE_MATCH = """
+    SELECT module_id, -bm25(module_search_fts, 10.0, 5.0, 2.0, 1.0) AS rank
+    FROM module_search_fts
+    WHERE module_search_fts MATCH :q
+"""
+
+
+def _is_postgres() -> bool:
+    return db.engine.dialect.name == 'postgresql'
+
+
+def ensure_search_index() -> None:
+    """Create the SQLite FTS table if missing (write paths only; caller commits)"""
+    if not _is_postgres():
+        for statement in SQLITE_SCHEMA:
+            db.session.execute(text(statement))
+
+
+def _sqlite_index_exists() -> bool:
+    return db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'module_search_fts'"
+    )).first() is not None
+
+
+def search_document(module: Module) -> Dict:
+    """Fields indexed for a module; notion_page record maps contribute titles only"""
+    body = []
+    for section in module.sections:
+        if section.title:
+            body.append(section.title)
+        if section.section_type != 'notion_page':
+            body.append(section.body or '')
+    return {
+        'module_id': module.id,
+        'title': module.title or '',
+        'tags': ' '.join(module.tags or []),
+        'description': module.description or '',
+        'body': '\n'.join(body)[:MAX_BODY_CHARS],
+    }
+
+
+def index_module(module: Module) -> None:
+    """Rebuild the search document for one module (caller commits)"""
+    ensure_search_index()
+    params = search_document(module)
+    if _is_postgres():
+        db.session.execute(text(POSTGRES_UPSERT), params)
+    else:
+        for statement in SQLITE_UPSERT:
+            db.session.execute(text(statement), params)
+
+
+def rebuild_search_index() -> int:
+    """Reindex every module; returns the number indexed"""
+    count = 0
+    for module in Module.query.order_by(Module.id).all():
+        index_module(module)
+        count += 1
+    db.session.commit()
+    return count
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 prefix query, dropping its operators"""
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', q))
+
+
+def search_modules(q: str, filters: Optional[Dict] = None, page: int = 1,
+                   per_page: int = 20) -> Tuple[List[Tuple[Module, float]], int, Dict]:
+    """
+    Ranked search over module documents.
+
+    Returns (page of (module, rank), total matches, facet counts). Facets
+    count the filtered matches by each of FACET_FIELDS.
+    """
+    if _is_postgres():
+        match_sql, query = POSTGRES_MATCH, q
+    else:
+        match_sql, query = SQLITE_MATCH, _fts5_query(q)
+        # Nothing has been indexed into this development database yet
+        if not query or not _sqlite_index_exists():
+            return [], 0, {field: {} for field in FACET_FIELDS}
+
+    params = {'q': query}
+    where = []
+    for field, value in (filters or {}).items():
+        if field in FILTER_FIELDS and value:
+            where.append(f"m.{field} = :{field}")
+            params[field] = value
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    matches = f"WITH matches AS ({match_sql}) "
+
+    # Total and all facets from one grouped pass over the matches
+    facet_rows = db.session.execute(text(
+        matches +
+        f"SELECT {', '.join('m.' + f for f in FACET_FIELDS)}, COUNT(*) AS n "
+        f"FROM matches JOIN modules m ON m.id = matches.module_id {where_sql} "
+        f"GROUP BY {', '.join('m.' + f for f in FACET_FIELDS)}"
+    ), params).all()
+
+    facets = {field: {} for field in FACET_FIELDS}
+    total = 0
+    for row in facet_rows:
+        total += row.n
+        for field in FACET_FIELDS:
+            key = getattr(row, field) or 'none'
+            facets[field][key] = facets[field].get(key, 0) + row.n
+
+    ranked = db.session.execute(text(
+        matches +
+        f"SELECT m.id, matches.rank FROM matches JOIN modules m ON m.id = matches.module_id "
+        f"{where_sql} ORDER BY matches.rank DESC, m.id LIMIT :limit OFFSET :offset"
+    ), dict(params, limit=per_page, offset=(page - 1) * per_page)).all()
+
+    modules = {m.id: m for m in Module.query.filter(Module.id.in_([r.id for r in ranked]))}
+    results = [(modules[r.id], float(r.rank)) for r in ranked if r.id in modules]
+    return results, total, facets
@@ -0,0 +1,192 @@
+"""
+Incrementally maintained module statistics
+Keeps one module_stats row per module up to date on feedback and progress
+writes, so stats endpoints read a single row instead of rescanning.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from shared.database.db_models import Module, ModuleFeedback, ModuleProgress, ModuleStats
+from .database import db
+
+
+def _bump(counts: Optional[Dict], key, delta: int = 1) -> Dict:
+    """Return a copy of a JSON histogram with key adjusted by delta"""
+    updated = dict(counts or {})
+    key = str(key)
+    updated[key] = updated.get(key, 0) + delta
+    if updated[key] <= 0:
+        del updated[key]
+    return updated
+
+
+def _locked_stats(module_id: int) -> Optional[ModuleStats]:
+    """Fetch the stats row for update, holding its row lock until commit"""
+    return ModuleStats.query.filter_by(module_id=module_id).with_for_update().first()
+
+
+def _claim_stats(module_id: int) -> Tuple[ModuleStats, bool]:
+    """
+    Lock the module's stats row, creating it first if missing. Returns
+    (stats, created). Concurrent first writers wait on the INSERT ... ON
+    CONFLICT DO NOTHING instead of failing on the primary key.
+    """
+    stats = _locked_stats(module_id)
+    if stats is not None:
+        return stats, False
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    created = db.session.execute(
+        dialect.insert(ModuleStats.__table__).values(module_id=module_id)
+        .on_conflict_do_nothing(index_elements=['module_id'])
+        .returning(ModuleStats.module_id)
+    ).first() is not None
+    return _locked_stats(module_id), created
+
+
+def rebuild_module_stats(module_id: int) -> ModuleStats:
+    """
+    Recompute a module's stats row from module_feedback and module_progress.
+
+    Used by the repair job and the first write for a module. Caller is
+    responsible for committing.
+    """
+    stats, _ = _claim_stats(module_id)
+    _compute_stats(stats)
+    db.session.flush()
+    return stats
+
+
+def _compute_stats(stats: ModuleStats) -> ModuleStats:
+    """Fill stats from module_feedback and module_progress (no flush)"""
+    module_id = stats.module_id
+
+    # Feedback aggregates (COUNT(col) skips NULLs)
+    feedback = db.session.query(
+        func.count(ModuleFeedback.id),
+        func.coalesce(func.sum(ModuleFeedback.rating), 0),
+        func.count(ModuleFeedback.rating),
+        func.coalesce(func.sum(ModuleFeedback.clarity), 0),
+        func.count(ModuleFeedback.clarity),
+        func.coalesce(func.sum(ModuleFeedback.usefulness), 0),
+        func.count(ModuleFeedback.usefulness),
+    ).filter(ModuleFeedback.module_id == module_id).one()
+
+    (stats.feedback_count, stats.rating_sum, stats.rating_count,
+     stats.clarity_sum, stats.clarity_count,
+     stats.usefulness_sum, stats.usefulness_count) = [int(v) for v in feedback]
+
+    difficulty_rows = db.session.query(
+        ModuleFeedback.difficulty,
+        func.count(ModuleFeedback.id)
+    ).filter(
+        ModuleFeedback.module_id == module_id,
+        ModuleFeedback.difficulty.isnot(None)
+    ).group_by(ModuleFeedback.difficulty).all()
+    stats.difficulty_counts = {difficulty: count for difficulty, count in difficulty_rows}
+
+    # Progress aggregates
+    status_rows = db.session.query(
+        ModuleProgress.status,
+        func.count(ModuleProgress.id),
+        func.coalesce(func.sum(ModuleProgress.total_time_seconds), 0)
+    ).filter(ModuleProgress.module_id == module_id).group_by(ModuleProgress.status).all()
+
+    stats.status_counts = {status: count for status, count, _ in status_rows}
+    stats.student_count = sum(count for _, count, _ in status_rows)
+    stats.total_time_seconds = int(sum(total for _, _, total in status_rows))
+
+    section_completions = {}
+    completed_lists = db.session.query(ModuleProgress.completed_sections)\
+        .filter(ModuleProgress.module_id == module_id).all()
+    for (completed_sections,) in completed_lists:
+        for section_number in set(completed_sections or []):
+            section_completions = _bump(section_completions, section_number)
+    stats.section_completions = section_completions
+    return stats
+
+
+def get_module_stats(module_id: int) -> ModuleStats:
+    """
+    Return the stats row for a module. Modules without one get a computed,
+    unsaved snapshot; the row itself is created by the next write or by
+    scripts/rebuild_module_stats.py.
+    """
+    stats = db.session.get(ModuleStats, module_id)
+    if stats is None:
+        stats = _compute_stats(ModuleStats(module_id=module_id))
+    return stats
+
+
+def record_feedback(feedback: ModuleFeedback) -> ModuleStats:
+    """
+    Fold a newly added feedback row into its module's stats.
+
+    Must run in the same transaction as the feedback insert, after a flush.
+    """
+    stats, created = _claim_stats(feedback.module_id)
+    if created:
+        # First write for this module: the rebuild already counts this row
+        _compute_stats(stats)
+        return stats
+
+    stats.feedback_count += 1
+    if feedback.rating is not None:
+        stats.rating_sum += feedback.rating
+        stats.rating_count += 1
+    if feedback.clarity is not None:
+        stats.clarity_sum += feedback.clarity
+        stats.clarity_count += 1
+    if feedback.usefulness is not None:
+        stats.usefulness_sum += feedback.usefulness
+        stats.usefulness_count += 1
+    if feedback.difficulty:
+        stats.difficulty_counts = _bump(stats.difficulty_counts, feedback.difficulty)
+
+    return stats
+
+
+def record_progress(progress: ModuleProgress,
+                    previous_status: Optional[str],
+                    time_delta: int = 0,
+                    new_sections: Iterable[int] = ()) -> ModuleStats:
+    """
+    Fold a progress transition into its module's stats.
+
+    Args:
+        progress: The progress row after the update (flushed)
+        previous_status: Status before the update, or None if the row is new
+        time_delta: Seconds added to total_time_seconds by this update
+        new_sections: Section numbers newly added to completed_sections
+    """
+    stats, created = _claim_stats(progress.module_id)
+    if created:
+        _compute_stats(stats)
+        return stats
+
+    if previous_status is None:
+        stats.student_count += 1
+        stats.status_counts = _bump(stats.status_counts, progress.status)
+    elif previous_status != progress.status:
+        counts = _bump(stats.status_counts, previous_status, -1)
+        stats.status_counts = _bump(counts, progress.status)
+
+    stats.total_time_seconds += time_delta or 0
+
+    completions = stats.section_completions
+    for section_number in new_sections:
+        completions = _bump(completions, section_number)
+    stats.section_completions = completions
+
+    return stats
+
+
+def rebuild_all_module_stats() -> int:
+    """Repair job: recompute stats for every module. Returns modules processed."""
+    module_ids = [module_id for (module_id,) in db.session.query(Module.id).all()]
+    for module_id in module_ids:
+        rebuild_module_stats(module_id)
+    db.session.commit()
+    return len(module_ids)
@@ -0,0 +1,180 @@
+"""
+Live race hub for Ascent Basecamp race mode
+Active race sessions live in memory, keyed by module. Checkpoint updates
+reposition the racer among concurrent racers and against the module's ghost
+benchmark, and the resulting standing is pushed to every subscriber of that
+module's race (Server-Sent Events in lms_routes). Nothing here touches the
+database; the final result is persisted by complete_race.
+
+State is per process, so race traffic for a module should be routed to one
+worker (sticky sessions) when running several.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .ghost_replay import GhostBenchmark, percent_below
+from .leaderboard import RankedBoard
+
+# Racers with no update for this long are dropped
+RACE_IDLE_SECONDS = int(os.getenv('RACE_IDLE_SECONDS', '1800'))
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_BUFFER = 100
+
+
+def race_sort_key(checkpoint: int, elapsed_seconds: float) -> Tuple:
+    """Racers rank by checkpoints reached DESC, then elapsed time ASC"""
+    return (-int(checkpoint), float(elapsed_seconds))
+
+
+class Race:
+    """Racers and subscribers for one module"""
+
+    def __init__(self, module_id: int):
+        self.module_id = module_id
+        self.board = RankedBoard([], lambda r: race_sort_key(r['checkpoint'], r['elapsed']))
+        self.total_checkpoints: Dict[str, int] = {}
+        self.benchmark: Optional[GhostBenchmark] = None
+        self.subscribers: List[queue.Queue] = []
+
+
+class RaceHub:
+    """Thread-safe registry of live races"""
+
+    def __init__(self, idle_seconds: int = RACE_IDLE_SECONDS):
+        self._idle = idle_seconds
+        self._races: Dict[int, Race] = {}
+        self._last_seen: Dict[Tuple[int, str], float] = {}
+        self._next_sweep = time.monotonic() + idle_seconds
+        self._lock = threading.Lock()
+
+    def _race(self, module_id: int) -> Race:
+        race = self._races.get(module_id)
+        if race is None:
+            race = self._races[module_id] = Race(module_id)
+        return race
+
+    def join(self, module_id: int, student_id: str, total_checkpoints: int = 0,
+             benchmark: Optional[GhostBenchmark] = None) -> Dict:
+        """Register a racer at the start line"""
+        with self._lock:
+            race = self._race(module_id)
+            if benchmark is not None:
+                race.benchmark = benchmark
+            race.total_checkpoints[student_id] = int(total_checkpoints)
+            race.board.upsert({'student_id': student_id, 'checkpoint': 0, 'elapsed': 0.0})
+            self._last_seen[(module_id, student_id)] = time.monotonic()
+            return self._publish(race, student_id, 'join')
+
+    def checkpoint(self, module_id: int, student_id: str, checkpoint: int,
+                   elapsed_seconds: float) -> Optional[Dict]:
+        """Record a checkpoint; returns the racer's standing, or None if not racing"""
+        with self._lock:
+            self._expire()
+            race = self._races.get(module_id)
+            if race is None or race.board.position(student_id) is None:
+                return None
+            race.board.upsert({'student_id': student_id, 'checkpoint': int(checkpoint),
+                               'elapsed': float(elapsed_seconds)})
+            self._last_seen[(module_id, student_id)] = time.monotonic()
+            return self._publish(race, student_id, 'checkpoint')
+
+    def finish(self, module_id: int, student_id: str) -> None:
+        """Remove a racer once their result has been persisted"""
+        with self._lock:
+            race = self._races.get(module_id)
+            if race is None:
+                return
+            self._remove(race, student_id)
+            self._broadcast(race, {'event': 'finish', 'student_id': student_id,
+                                   'racers': len(race.board)})
+            self._drop_if_idle(race)
+
+    def standings(self, module_id: int) -> List[Dict]:
+        """Every active racer on a module with rank"""
+        with self._lock:
+            race = self._races.get(module_id)
+            if race is None:
+                return []
+            return race.board.top(len(race.board))
+
+    def subscribe(self, module_id: int) -> queue.Queue:
+        with self._lock:
+            events = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+            self._race(module_id).subscribers.append(events)
+            return events
+
+    def unsubscribe(self, module_id: int, events: queue.Queue) -> None:
+        with self._lock:
+            race = self._races.get(module_id)
+            if race is not None and events in race.subscribers:
+                race.subscribers.remove(events)
+                self._drop_if_idle(race)
+
+    def _standing(self, race: Race, student_id: str) -> Dict:
+        position = race.board.position(student_id)
+        standing = {
+            'student_id': student_id,
+            'checkpoint': position['checkpoint'],
+            'elapsed_seconds': position['elapsed'],
+            'rank': position['rank'],
+            'racers': len(race.board),
+            'ghost_percentile': None,
+        }
+        total = race.total_checkpoints.get(student_id) or 0
+        if race.benchmark and total and position['checkpoint']:
+            # Project the finish time from the current pace and place it on
+            # the ghost cohort's completion-time curve
+            projected = position['elapsed'] * total / position['checkpoint']
+            standing['ghost_percentile'] = round(
+                100 - percent_below(race.benchmark.time_curve, projected), 1
+            )
+        return standing
+
+    def _publish(self, race: Race, student_id: str, event: str) -> Dict:
+        standing = self._standing(race, student_id)
+        self._broadcast(race, dict(standing, event=event))
+        return standing
+
+    def _broadcast(self, race: Race, payload: Dict) -> None:
+        message = json.dumps(payload)
+        for events in race.subscribers:
+            try:
+                events.put_nowait(message)
+            except queue.Full:
+                # Slow consumer: drop its oldest event rather than block the race
+                try:
+                    events.get_nowait()
+                except queue.Empty:
+                    pass
+                events.put_nowait(message)
+
+    def _remove(self, race: Race, student_id: str) -> None:
+        race.board.remove(student_id)
+        race.total_checkpoints.pop(student_id, None)
+        self._last_seen.pop((race.module_id, student_id), None)
+
+    def _drop_if_idle(self, race: Race) -> None:
+        if not len(race.board) and not race.subscribers:
+            self._races.pop(race.module_id, None)
+
+    def _expire(self) -> None:
+        # Sweep at most once per idle window so ticks stay O(log n)
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._idle
+        cutoff = now - self._idle
+        for (module_id, student_id), seen in list(self._last_seen.items()):
+            if seen < cutoff:
+                race = self._races.get(module_id)
+                if race is not None:
+                    self._remove(race, student_id)
+                    self._drop_if_idle(race)
+                else:
+                    self._last_seen.pop((module_id, student_id), None)
@@ -0,0 +1,120 @@
+"""
+Tests for the incremental module build runner
+"""
+import os
+import sys
+
+# Add parent and scripts directories to path for imports
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from build_modules import BuildGraph, Stage
+
+# Copies each input file to the output directory, upper-cased, and logs the run
+COPY_SCRIPT = """
+import sys
+from pathlib import Path
+name, src, dest = sys.argv[1:]
+Path(dest).mkdir(exist_ok=True)
+for path in sorted(Path(src).glob('*.txt')):
+    (Path(dest) / path.name).write_text(path.read_text().upper())
+with open('runs.log', 'a') as log:
+    log.write(name + '\\n')
+"""
+
+
+def make_graph(root):
+    stages = [
+        Stage('ingest', 'copy.py', ['ingest', 'raw', 'exports'], inputs=['raw'], outputs=['exports']),
+        Stage('enhance', 'copy.py', ['enhance', 'exports', 'enhanced'], inputs=['exports/*.txt'],
+              outputs=['enhanced'], deps=['ingest']),
+        Stage('audit', 'copy.py', ['audit', 'exports', 'audit'], inputs=['exports/*.txt'],
+              outputs=['audit'], deps=['ingest']),
+    ]
+    return BuildGraph(stages, root=root, state_path=root / 'state.json')
+
+
+def runs(root):
+    log = root / 'runs.log'
+    runs = sorted(log.read_text().split()) if log.exists() else []
+    log.unlink(missing_ok=True)
+    return runs
+
+
+def test_build_runs_only_stale_stages(tmp_path):
+    """Fresh stages are skipped, changes propagate by content, outputs are restored"""
+    (tmp_path / 'copy.py').write_text(COPY_SCRIPT)
+    (tmp_path / 'raw').mkdir()
+    (tmp_path / 'raw' / 'a.txt').write_text('alpha')
+
+    results = make_graph(tmp_path).run()
+    assert [r['status'] for r in results] == ['ran', 'ran', 'ran']
+    assert (tmp_path / 'enhanced' / 'a.txt').read_text() == 'ALPHA'
+    assert runs(tmp_path) == ['audit', 'enhance', 'ingest']
+
+    results = make_graph(tmp_path).run()
+    assert [r['status'] for r in results] == ['fresh', 'fresh', 'fresh']
+    assert runs(tmp_path) == []
+
+    # Same content after upper-casing: ingest reruns but downstream stays fresh
+    (tmp_path / 'raw' / 'a.txt').write_text('ALPHA')
+    results = make_graph(tmp_path).run()
+    assert [r['status'] for r in results] == ['ran', 'fresh', 'fresh']
+
+    (tmp_path / 'raw' / 'b.txt').write_text('beta')
+    results = make_graph(tmp_path).run(dry_run=True)
+    assert [r['status'] for r in results] == ['stale', 'stale', 'stale']
+    runs(tmp_path)
+    results = make_graph(tmp_path).run(['enhance'])
+    assert [r['stage'] for r in results] == ['ingest', 'enhance']
+    assert runs(tmp_path) == ['enhance', 'ingest']
+
+    # A deleted output forces its stage even though the inputs are unchanged
+    for path in (tmp_path / 'audit').iterdir():
+        path.unlink()
+    (tmp_path / 'audit').rmdir()
+    results = make_graph(tmp_path).run()
+    assert [r['status'] for r in results] == ['fresh', 'fresh', 'ran']
+
+
+def test_failed_stage_blocks_dependents(tmp_path):
+    """Dependents of a failed stage are not run and it is retried next time"""
+    (tmp_path / 'copy.py').write_text('raise SystemExit(3)')
+    (tmp_path / 'raw').mkdir()
+
+    results = make_graph(tmp_path).run()
+    assert [r['status'] for r in results] == ['failed', 'blocked', 'blocked']
+    results = make_graph(tmp_path).run(dry_run=True)
+    assert results[0]['reason'] == 'never built'
+
+
+def test_stage_reruns_when_upstream_rewrites_its_outputs(tmp_path):
+    """An overlay into an upstream stage's outputs is reapplied after that stage reruns"""
+    (tmp_path / 'copy.py').write_text(COPY_SCRIPT)
+    (tmp_path / 'raw').mkdir()
+    (tmp_path / 'raw' / 'a.txt').write_text('alpha')
+    (tmp_path / 'overlay').mkdir()
+    (tmp_path / 'overlay' / 'a.txt').write_text('patched')
+
+    def graph():
+        return BuildGraph([
+            Stage('ingest', 'copy.py', ['ingest', 'raw', 'exports'], inputs=['raw'], outputs=['exports']),
+            Stage('overlay', 'copy.py', ['overlay', 'overlay', 'exports'], inputs=['overlay'],
+                  outputs=['exports'], deps=['ingest']),
+        ], root=tmp_path, state_path=tmp_path / 'state.json')
+
+    assert [r['status'] for r in graph().run()] == ['ran', 'ran']
+    assert [r['status'] for r in graph().run()] == ['fresh', 'fresh']
+
+    (tmp_path / 'raw' / 'a.txt').write_text('alpha two')
+    results = graph().run()
+    assert [r['status'] for r in results] == ['ran', 'ran']
+    assert results[1]['reason'] == 'ingest rewrote its outputs'
+    assert (tmp_path / 'exports' / 'a.txt').read_text() == 'PATCHED'
+
+    # Also across invocations: ingest alone, then a full build
+    (tmp_path / 'raw' / 'a.txt').write_text('alpha three')
+    graph().run(['ingest'])
+    assert [r['status'] for r in graph().run()] == ['fresh', 'ran']
+    assert (tmp_path / 'exports' / 'a.txt').read_text() == 'PATCHED'
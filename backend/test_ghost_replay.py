@@ -0,0 +1,41 @@
+"""
+Tests for ghost benchmark curve encoding and percentile interpolation
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ghost_replay import PERCENTILES, decode_curves, encode_curves, percent_below
+
+
+def linear_curve(low, high):
+    return [low + (high - low) * p / 100 for p in PERCENTILES]
+
+
+def test_payload_round_trip_is_compact():
+    time_curve = linear_curve(60, 660)
+    score_curve = linear_curve(40, 100)
+    payload = encode_curves(250, time_curve, score_curve)
+    assert len(payload) < 200
+
+    sample_size, times, scores = decode_curves(payload)
+    assert sample_size == 250
+    assert times == time_curve
+    assert [round(s, 3) for s in scores] == [round(s, 3) for s in score_curve]
+
+
+def test_percent_below_interpolates_between_points():
+    curve = linear_curve(0, 1000)
+    assert percent_below(curve, -5) == 0.0
+    assert percent_below(curve, 2000) == 100.0
+    assert percent_below(curve, 500) == 50.0
+    assert abs(percent_below(curve, 125) - 12.5) < 1e-9
+
+
+def test_percent_below_handles_flat_curves():
+    curve = [100.0] * len(PERCENTILES)
+    assert percent_below(curve, 100) == 50.0
+    assert percent_below(curve, 99) == 0.0
+    assert percent_below(curve, 101) == 100.0
@@ -0,0 +1,41 @@
+"""
+Tests for the in-memory leaderboard boards
+"""
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.leaderboard import RankedBoard, module_sort_key
+
+
+def make_board(rows):
+    return RankedBoard(rows, lambda r: module_sort_key(r['best_score'], r['best_time']))
+
+
+def test_rank_matches_sql_rank_semantics():
+    """Ties share a rank and the next rank skips, like RANK()"""
+    board = make_board([
+        {'student_id': 'a', 'best_score': 90.0, 'best_time': 100, 'attempts': 1},
+        {'student_id': 'b', 'best_score': 95.0, 'best_time': 200, 'attempts': 2},
+        {'student_id': 'c', 'best_score': 90.0, 'best_time': 100, 'attempts': 1},
+        {'student_id': 'd', 'best_score': 80.0, 'best_time': 50, 'attempts': 3},
+    ])
+    assert [r['rank'] for r in board.top(10)] == [1, 2, 2, 4]
+    assert board.position('d')['rank'] == 4
+    assert board.position('missing') is None
+    assert len(board.top(2)) == 3  # tie at rank 2 extends the list
+
+
+def test_upsert_repositions_student():
+    """Improving a result moves the student without a rebuild"""
+    board = make_board([
+        {'student_id': 'a', 'best_score': 90.0, 'best_time': 100, 'attempts': 1},
+        {'student_id': 'b', 'best_score': 70.0, 'best_time': 100, 'attempts': 1},
+    ])
+    board.upsert({'student_id': 'b', 'best_score': 99.0, 'best_time': 90, 'attempts': 2})
+    assert board.position('b')['rank'] == 1
+    assert board.position('a')['rank'] == 2
+    assert len(board) == 2
+    assert board.rank_for(module_sort_key(95.0, 10)) == 2
@@ -5,12 +5,16 @@ import pytest
 import json
 import sys
 import os
+from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.app import app
-from shared.database.db_models import Module, ModuleSection, ModuleProgress
+from shared.database.db_models import (
+    Module, ModuleSection, ModuleProgress, ModuleStats, ModuleAssignment, ModuleContentBlob,
+    StudentModel, AssignmentNotification
+)
 from backend.database import db
 
 
@@ -226,6 +230,399 @@ def test_get_module_analytics(client):
     assert data['analytics']['completion_rate'] == 50.0
 
 
+def test_analytics_stats_follow_progress_updates(client):
+    """Test that module_stats is updated incrementally on progress writes"""
+    with app.app_context():
+        module = Module(module_id='test-module-5', title='Stats Module', status='published')
+        db.session.add(module)
+        db.session.commit()
+        module_id = module.id
+    
+    def post_progress(payload):
+        return client.post(
+            f'/api/lms/modules/{module_id}/progress',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+    
+    # Reads return a snapshot without creating the stats row
+    response = client.get(f'/api/lms/modules/{module_id}/analytics')
+    assert json.loads(response.data)['analytics']['total_students'] == 0
+    with app.app_context():
+        assert db.session.get(ModuleStats, module_id) is None
+    
+    post_progress({'student_id': 'student1', 'progress_percent': 10})
+    post_progress({'student_id': 'student2', 'progress_percent': 10})
+    post_progress({
+        'student_id': 'student1',
+        'section_number': 1,
+        'progress_percent': 100,
+        'status': 'completed',
+        'time_spent_seconds': 600
+    })
+    
+    response = client.get(f'/api/lms/modules/{module_id}/analytics')
+    data = json.loads(response.data)
+    assert data['analytics']['total_students'] == 2
+    assert data['analytics']['completed_count'] == 1
+    assert data['analytics']['status_breakdown'] == {'in_progress': 1, 'completed': 1}
+    assert data['analytics']['avg_time_spent_minutes'] == 5.0
+    
+    with app.app_context():
+        stats = db.session.get(ModuleStats, module_id)
+        assert stats.section_completions == {'1': 1}
+
+
+def test_feedback_aggregate_and_pagination(client):
+    """Test feedback aggregates come from module_stats and the list is paginated"""
+    with app.app_context():
+        module = Module(module_id='test-module-6', title='Feedback Module', status='published')
+        db.session.add(module)
+        db.session.commit()
+        module_id = module.id
+    
+    for i, (rating, difficulty) in enumerate([(5, 'just_right'), (3, 'too_hard'), (4, 'just_right')]):
+        response = client.post(
+            f'/api/lms/modules/{module_id}/feedback',
+            data=json.dumps({
+                'student_id': f'student{i}',
+                'rating': rating,
+                'difficulty': difficulty,
+                'clarity': 4
+            }),
+            content_type='application/json'
+        )
+        assert response.status_code == 201
+    
+    response = client.get(f'/api/lms/modules/{module_id}/feedback?per_page=2')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['count'] == 3
+    assert data['aggregate']['avg_rating'] == 4.0
+    assert data['aggregate']['avg_clarity'] == 4.0
+    assert data['aggregate']['avg_usefulness'] is None
+    assert data['aggregate']['difficulty_breakdown'] == {'just_right': 2, 'too_hard': 1}
+    assert len(data['feedback']) == 2
+    assert data['pagination']['pages'] == 2
+    
+    response = client.get(f'/api/lms/modules/{module_id}/feedback?per_page=2&page=2')
+    data = json.loads(response.data)
+    assert len(data['feedback']) == 1
+
+
+def test_unlocked_modules_endpoint(client):
+    """Test GET /api/lms/students/<id>/unlocked_modules"""
+    with app.app_context():
+        intro = Module(module_id='graph-intro', title='Intro', status='published')
+        advanced = Module(
+            module_id='graph-advanced',
+            title='Advanced',
+            status='published',
+            prerequisites=['graph-intro']
+        )
+        db.session.add_all([intro, advanced])
+        db.session.commit()
+        intro_id, advanced_id = intro.id, advanced.id
+    
+    response = client.get('/api/lms/students/student1/unlocked_modules')
+    data = json.loads(response.data)
+    assert response.status_code == 200
+    assert [m['id'] for m in data['modules']] == [intro_id]
+    
+    client.post(
+        f'/api/lms/modules/{intro_id}/progress',
+        data=json.dumps({'student_id': 'student1', 'status': 'completed', 'progress_percent': 100}),
+        content_type='application/json'
+    )
+    response = client.get('/api/lms/students/student1/unlocked_modules')
+    data = json.loads(response.data)
+    assert [m['id'] for m in data['modules']] == [advanced_id]
+    
+    response = client.get(f'/api/lms/modules/{advanced_id}/learning_path?student_id=student1')
+    data = json.loads(response.data)
+    assert [step['id'] for step in data['path']] == [intro_id, advanced_id]
+    assert [step['completed'] for step in data['path']] == [True, False]
+
+
+def test_student_dashboard_assignments(client):
+    """Test GET /api/lms/students/<id>/dashboard with projected fields"""
+    with app.app_context():
+        later = Module(module_id='dash-later', title='Due Later', status='published')
+        sooner = Module(module_id='dash-sooner', title='Due Sooner', status='published')
+        undated = Module(module_id='dash-undated', title='No Due Date', status='published')
+        db.session.add_all([later, sooner, undated])
+        db.session.commit()
+        db.session.add_all([
+            ModuleAssignment(module_id=later.id, student_id='dash_student',
+                             due_date=datetime(2030, 6, 1)),
+            ModuleAssignment(module_id=undated.id, student_id='dash_student'),
+            ModuleAssignment(module_id=sooner.id, student_id='dash_student',
+                             due_date=datetime(2030, 1, 1)),
+        ])
+        db.session.commit()
+        sooner_id = sooner.id
+    
+    response = client.get('/api/lms/students/dash_student/dashboard?fields=assignments')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [a['title'] for a in data['assignments']] == ['Due Sooner', 'Due Later', 'No Due Date']
+    assert 'competencies' not in data and 'rank' not in data
+    assert data['summary']['in_progress'] == 0
+    
+    # Progress writes invalidate the cached dashboard
+    client.post(
+        f'/api/lms/modules/{sooner_id}/progress',
+        data=json.dumps({'student_id': 'dash_student', 'progress_percent': 40}),
+        content_type='application/json'
+    )
+    data = json.loads(client.get('/api/lms/students/dash_student/dashboard?fields=assignments').data)
+    assert data['assignments'][0]['progress']['status'] == 'in_progress'
+    assert data['summary']['in_progress'] == 1
+
+
+def test_race_checkpoint_is_in_memory(client):
+    """Test POST /api/lms/students/<id>/race/checkpoint (no database writes)"""
+    from backend.lms_routes import race_hub
+
+    response = client.post(
+        '/api/lms/students/racer_1/race/checkpoint',
+        data=json.dumps({'module_id': 9001, 'checkpoint': 1, 'elapsed_seconds': 20}),
+        content_type='application/json'
+    )
+    assert response.status_code == 404
+
+    race_hub.join(9001, 'racer_1', total_checkpoints=3)
+    try:
+        response = client.post(
+            '/api/lms/students/racer_1/race/checkpoint',
+            data=json.dumps({'module_id': 9001, 'checkpoint': 1, 'elapsed_seconds': 20}),
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+        standing = json.loads(response.data)['standing']
+        assert standing['rank'] == 1
+        assert standing['checkpoint'] == 1
+    finally:
+        race_hub.finish(9001, 'racer_1')
+
+
+def test_section_sync_writes_only_changed_content(client):
+    """Redeploys store each body once and skip unchanged sections"""
+    from backend.content_store import sync_sections
+
+    long_body = 'Telemetry frame layout. ' * 400
+    sections = [
+        {'section_number': 1, 'section_type': 'text', 'title': 'Intro', 'content': 'Welcome'},
+        {'section_number': 2, 'section_type': 'text', 'title': 'Frames', 'content': long_body},
+        {'section_number': 3, 'section_type': 'text', 'title': 'Recap', 'content': 'Welcome'},
+    ]
+    with app.app_context():
+        module = Module(module_id='content-store', title='Content Store', status='published')
+        db.session.add(module)
+        assert sync_sections(module, sections)['added'] == 3
+        db.session.commit()
+
+        blobs = ModuleContentBlob.query.all()
+        assert len(blobs) == 2  # identical bodies share one blob
+        large = next(b for b in blobs if b.size == len(long_body))
+        assert large.encoding == 'gzip'
+        assert len(large.body) < large.size
+
+        sections[2] = dict(sections[2], content='Recap of frames')
+        counts = sync_sections(module, sections[:3])
+        assert counts == {'added': 0, 'updated': 1, 'unchanged': 2, 'removed': 0}
+        assert sync_sections(module, sections[:2])['removed'] == 1
+        db.session.commit()
+        module_id = module.id
+
+    response = client.get(f'/api/lms/modules/{module_id}?include_sections=true')
+    data = json.loads(response.data)
+    assert [s['content'] for s in data['module']['sections']] == ['Welcome', long_body]
+
+
+def test_module_details_etag(client):
+    """Matching If-None-Match returns 304"""
+    with app.app_context():
+        module = Module(module_id='etag-module', title='ETag Module', status='published',
+                        content_hash='ab' * 32)
+        db.session.add(module)
+        db.session.commit()
+        module_id = module.id
+
+    response = client.get(f'/api/lms/modules/{module_id}')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    response = client.get(f'/api/lms/modules/{module_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+
+def test_module_outline_and_section_range(client):
+    """Details default to an outline; bodies come from the range endpoint"""
+    with app.app_context():
+        module = Module(module_id='long-module', title='Long Module', status='published')
+        db.session.add(module)
+        db.session.commit()
+        db.session.add_all([
+            ModuleSection(module_id=module.id, section_number=n, section_type='text',
+                          title=f'Part {n}', content='x' * (n * 10))
+            for n in range(1, 6)
+        ])
+        db.session.commit()
+        module_id = module.id
+
+    data = json.loads(client.get(f'/api/lms/modules/{module_id}').data)
+    assert 'sections' not in data['module']
+    assert [s['size'] for s in data['module']['outline']] == [10, 20, 30, 40, 50]
+    assert 'content' not in data['module']['outline'][0]
+
+    response = client.get(f'/api/lms/modules/{module_id}/sections?from=2&to=3')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [s['section_number'] for s in data['sections']] == [2, 3]
+    assert data['sections'][1]['content'] == 'x' * 30
+
+    response = client.get(f'/api/lms/modules/{module_id}/sections?from=4&to=1')
+    assert response.status_code == 400
+
+
+def test_module_search_ranks_and_facets(client):
+    """Test GET /api/lms/modules/search over titles, tags and section text"""
+    from backend.module_search import index_module
+
+    with app.app_context():
+        modules = [
+            Module(module_id='search-1', title='Sensor Driver Basics', category='software',
+                   status='published', tags=['drivers']),
+            Module(module_id='search-2', title='Power Budgets', category='hardware',
+                   status='published', description='Sizing batteries for sensors'),
+            Module(module_id='search-3', title='Lab Safety', category='safety', status='published'),
+            Module(module_id='search-4', title='Sensor Calibration Draft', category='hardware',
+                   status='draft'),
+        ]
+        db.session.add_all(modules)
+        db.session.flush()
+        db.session.add(ModuleSection(module_id=modules[2].id, section_number=1, section_type='text',
+                                     title='Handling', content='Never hot-plug a sensor board'))
+        db.session.commit()
+        for module in modules:
+            index_module(module)
+        db.session.commit()
+
+    response = client.get('/api/lms/modules/search?q=sensor')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['pagination']['total'] == 3  # draft excluded by default
+    assert data['modules'][0]['title'] == 'Sensor Driver Basics'  # title match ranks first
+    assert data['facets']['category'] == {'software': 1, 'hardware': 1, 'safety': 1}
+
+    data = json.loads(client.get('/api/lms/modules/search?q=sensor&status=&per_page=1&page=2').data)
+    assert data['pagination']['total'] == 4
+    assert data['pagination']['pages'] == 4
+    assert data['count'] == 1
+
+    assert client.get('/api/lms/modules/search').status_code == 400
+
+
+def test_bulk_assignments_by_cohort(client):
+    """Cohort selectors resolve server-side and duplicates are skipped"""
+    with app.app_context():
+        module = Module(module_id='bulk-assign', title='Bulk Assign', status='published')
+        db.session.add(module)
+        db.session.add_all([
+            StudentModel(id='inc_1', university_id='uni_a', name='A', status='incoming'),
+            StudentModel(id='inc_2', university_id='uni_a', name='B', status='incoming'),
+            StudentModel(id='est_1', university_id='uni_a', name='C', status='established'),
+            StudentModel(id='inc_gone', university_id='uni_a', name='D', status='incoming',
+                         active=False),
+            StudentModel(id='inc_other', university_id='uni_b', name='E', status='incoming'),
+        ])
+        db.session.commit()
+        module_id = module.id
+
+    response = client.post(
+        f'/api/lms/modules/{module_id}/assignments',
+        data=json.dumps({'student_ids': ['inc_1']}),
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+
+    response = client.post(
+        f'/api/lms/modules/{module_id}/assignments',
+        data=json.dumps({
+            'cohort': {'university_id': 'uni_a', 'status': 'incoming'},
+            'student_ids': ['est_1'],
+            'due_date': '2026-01-15T23:59:59'
+        }),
+        content_type='application/json'
+    )
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert sorted(a['student_id'] for a in data['assignments']) == ['est_1', 'inc_2']
+    assert data['assignments'][0]['due_date'] == '2026-01-15T23:59:59'
+
+    with app.app_context():
+        assert ModuleAssignment.query.filter_by(module_id=module_id).count() == 3
+
+    # Unknown explicit ids are reported, with or without a cohort, and nothing is assigned
+    for body in ({'student_ids': ['est_1', 'nobody']},
+                 {'student_ids': ['nobody'], 'cohort': {'university_id': 'uni_b'}}):
+        response = client.post(
+            f'/api/lms/modules/{module_id}/assignments',
+            data=json.dumps(body),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert json.loads(response.data)['unknown_student_ids'] == ['nobody']
+    with app.app_context():
+        assert ModuleAssignment.query.filter_by(module_id=module_id).count() == 3
+
+    response = client.post(
+        f'/api/lms/modules/{module_id}/assignments',
+        data=json.dumps({'cohort': {'major': 'EE'}}),
+        content_type='application/json'
+    )
+    assert response.status_code == 400
+
+
+def test_due_assignment_scan(client):
+    """Scanner reports incomplete assignments in the window and never repeats a reminder"""
+    from datetime import timedelta
+    from backend.due_date_scanner import scan_due_assignments
+
+    now = datetime.utcnow()
+    with app.app_context():
+        module = Module(module_id='due-scan', title='Due Scan', status='published')
+        db.session.add(module)
+        db.session.flush()
+        db.session.add_all([
+            # Inserted out of due-date order so id and (due_date, id) paging differ
+            ModuleAssignment(module_id=module.id, student_id='soon', due_date=now + timedelta(hours=5)),
+            ModuleAssignment(module_id=module.id, student_id='late', due_date=now - timedelta(days=1)),
+            ModuleAssignment(module_id=module.id, student_id='done', due_date=now - timedelta(days=1)),
+            ModuleAssignment(module_id=module.id, student_id='later', due_date=now + timedelta(days=10)),
+            ModuleAssignment(module_id=module.id, student_id='stale', due_date=now - timedelta(days=90)),
+            ModuleAssignment(module_id=module.id, student_id='optional', required=False,
+                             due_date=now + timedelta(hours=5)),
+            ModuleProgress(module_id=module.id, student_id='done', status='completed'),
+        ])
+        db.session.commit()
+
+        assert scan_due_assignments(now=now, batch_size=1) == {'scanned': 2, 'notified': 2}
+        assert scan_due_assignments(now=now) == {'scanned': 2, 'notified': 0}
+        kinds = {n.student_id: n.kind for n in AssignmentNotification.query.all()}
+        assert kinds == {'late': 'overdue', 'soon': 'due_soon'}
+
+    response = client.get('/api/lms/assignments/due')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert sorted(a['student_id'] for a in data['assignments']) == ['late', 'soon']
+
+    data = json.loads(client.get('/api/lms/assignments/due?kind=overdue').data)
+    assert [a['student_id'] for a in data['assignments']] == ['late']
+    assert client.get('/api/lms/assignments/due?kind=someday').status_code == 400
+
+
 # TODO: Add more tests with actual module data once Agent A's pipeline is complete
 
 
@@ -0,0 +1,67 @@
+"""
+Tests for the module prerequisite graph
+"""
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.module_graph import ModuleGraph, PrerequisiteCycleError
+
+
+def module(key, prerequisites=(), title=None):
+    return {'key': key, 'module_id': key, 'title': title or key.upper(),
+            'prerequisites': list(prerequisites)}
+
+
+def test_unlocked_follows_prerequisites():
+    """Modules unlock once all of their prerequisites are completed"""
+    graph = ModuleGraph([
+        module('intro'),
+        module('git', ['intro']),
+        module('fprime', ['intro', 'git']),
+        module('safety'),
+    ])
+    assert sorted(graph.unlocked(0)) == ['intro', 'safety']
+    assert sorted(graph.unlocked(graph.mask_for(['intro']))) == ['git', 'safety']
+    assert sorted(graph.unlocked(graph.mask_for(['intro', 'safety']))) == ['git']
+    assert graph.unlocked(graph.mask_for(['intro', 'git', 'safety'])) == ['fprime']
+
+
+def test_learning_path_is_topological():
+    """Transitive prerequisites come before the modules that need them"""
+    graph = ModuleGraph([
+        module('c', ['b']),
+        module('b', ['a']),
+        module('a'),
+        module('x'),
+    ])
+    assert graph.learning_path('c') == ['a', 'b', 'c']
+    assert graph.learning_path('a') == ['a']
+
+
+def test_prerequisites_resolve_by_title():
+    """Exported modules reference prerequisites by title"""
+    graph = ModuleGraph([
+        module('srr-sdd', ['EAT Software Design Notes']),
+        module('eat-notes', title='EAT Software Design Notes'),
+        module('pmr', ['missing module']),
+    ])
+    assert graph.learning_path('srr-sdd') == ['eat-notes', 'srr-sdd']
+    assert graph.unresolved == [('pmr', 'missing module')]
+
+
+def test_cycle_detected():
+    """A prerequisite cycle raises with the offending path"""
+    with pytest.raises(PrerequisiteCycleError) as excinfo:
+        ModuleGraph([
+            module('a', ['c']),
+            module('b', ['a']),
+            module('c', ['b']),
+            module('d'),
+        ])
+    cycle = excinfo.value.cycle
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {'a', 'b', 'c'}
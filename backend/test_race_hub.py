@@ -0,0 +1,53 @@
+"""
+Tests for the in-memory live race hub
+"""
+import sys
+import os
+import json
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ghost_replay import GhostBenchmark, PERCENTILES
+from backend.race_hub import RaceHub
+
+
+def test_checkpoints_rank_concurrent_racers():
+    hub = RaceHub()
+    hub.join(1, 'a', total_checkpoints=4)
+    hub.join(1, 'b', total_checkpoints=4)
+
+    hub.checkpoint(1, 'a', 1, 30)
+    standing = hub.checkpoint(1, 'b', 2, 70)
+    assert standing['rank'] == 1
+    assert standing['racers'] == 2
+    assert hub.checkpoint(1, 'a', 2, 60)['rank'] == 1
+
+    assert hub.checkpoint(1, 'stranger', 1, 10) is None
+    assert hub.checkpoint(2, 'a', 1, 10) is None
+
+
+def test_ghost_percentile_projects_pace():
+    """Halfway in 150s projects a 300s finish, the ghost median"""
+    curve = [100 + 4 * p for p in PERCENTILES]  # 100s .. 500s, median 300s
+    benchmark = GhostBenchmark(1, 1, 50, curve, [80.0] * len(PERCENTILES))
+    hub = RaceHub()
+    hub.join(1, 'a', total_checkpoints=4, benchmark=benchmark)
+    assert hub.checkpoint(1, 'a', 2, 150)['ghost_percentile'] == 50.0
+
+
+def test_subscribers_receive_updates_until_finish():
+    hub = RaceHub()
+    events = hub.subscribe(1)
+    hub.join(1, 'a', total_checkpoints=2)
+    hub.checkpoint(1, 'a', 1, 12)
+    hub.finish(1, 'a')
+
+    received = [json.loads(events.get_nowait()) for _ in range(3)]
+    assert [e['event'] for e in received] == ['join', 'checkpoint', 'finish']
+    assert received[1]['checkpoint'] == 1
+    assert received[2]['racers'] == 0
+    assert hub.standings(1) == []
+
+    hub.unsubscribe(1, events)
+    assert hub._races == {}
@@ -207,6 +207,42 @@ export const completeRace = async (studentId, raceData) => {
   }
 };
 
+/**
+ * Report race progress (kept in memory server-side, pushed to race streams)
+ * POST /students/{student_id}/race/checkpoint
+ * 
+ * @param {string} studentId - Student identifier
+ * @param {object} checkpointData - {module_id, checkpoint, elapsed_seconds}
+ * @returns {Promise} Response with standing (rank, racers, ghost_percentile)
+ */
+export const reportRaceCheckpoint = async (studentId, checkpointData) => {
+  try {
+    const response = await apiClient.post(
+      `/students/${studentId}/race/checkpoint`,
+      checkpointData
+    );
+    return response.data;
+  } catch (error) {
+    throw new Error(`Failed to report checkpoint: ${error.response?.data?.error || error.message}`);
+  }
+};
+
+/**
+ * Subscribe to live race standings over Server-Sent Events
+ * GET /modules/{module_id}/race/stream
+ * 
+ * @param {number} moduleId - Module ID
+ * @param {function} onEvent - Called with each parsed event (snapshot, join, checkpoint, finish)
+ * @returns {EventSource} Call .close() to unsubscribe
+ */
+export const subscribeToRace = (moduleId, onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/modules/${moduleId}/race/stream`);
+  const handle = (message) => onEvent(JSON.parse(message.data));
+  source.onmessage = handle;
+  source.addEventListener('snapshot', handle);
+  return source;
+};
+
 // ========================================
 // HELPER UTILITIES
 // ========================================
@@ -263,6 +299,8 @@ const lmsAPI = {
   getSubsystemCompetency,
   startRace,
   completeRace,
+  reportRaceCheckpoint,
+  subscribeToRace,
   formatTime,
   calculateProgress,
   getCompetencyColor,
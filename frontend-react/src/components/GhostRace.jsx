@@ -15,8 +15,8 @@ const GhostRace = ({
   // Calculate progress percentages
   const studentProgress = (currentStep / totalSteps) * 100;
   
-  // Estimate ghost progress based on average time
-  const ghostAverageTime = ghostData?.average_time || 300;
+  // Estimate ghost progress based on the median finish time
+  const ghostAverageTime = ghostData?.median_time || 300;
   const ghostProgress = Math.min(100, (elapsedTime / ghostAverageTime) * 100);
 
   // Determine who's ahead
@@ -139,15 +139,15 @@ const GhostRace = ({
         <div className="mt-4 pt-4 border-t border-purple-200 dark:border-purple-700">
           <div className="grid grid-cols-2 gap-3 text-sm">
             <div className="text-center">
-              <div className="text-gray-500 dark:text-gray-400">Avg Time</div>
+              <div className="text-gray-500 dark:text-gray-400">Median Time</div>
               <div className="font-bold text-gray-900 dark:text-white">
-                {lmsAPI.formatTime(ghostData.average_time)}
+                {lmsAPI.formatTime(ghostData.median_time)}
               </div>
             </div>
             <div className="text-center">
-              <div className="text-gray-500 dark:text-gray-400">Avg Score</div>
+              <div className="text-gray-500 dark:text-gray-400">Median Score</div>
               <div className="font-bold text-gray-900 dark:text-white">
-                {Math.round(ghostData.average_score)}%
+                {Math.round(ghostData.median_score)}%
               </div>
             </div>
           </div>
@@ -314,7 +314,7 @@ const useModulePlayer = (studentId, moduleId, moduleData, isRaceMode = false) =>
   const getGhostComparison = useCallback(() => {
     if (!isRaceMode || !ghostData) return null;
     
-    const averageTime = ghostData.average_time || 0;
+    const averageTime = ghostData.median_time || 0;
     const difference = elapsedTime - averageTime;
     
     return {
@@ -0,0 +1,455 @@
+"""
+Load-test the LMS API against a local database.
+
+Seeds a synthetic cohort (students, modules with sections, progress,
+feedback and, on Postgres, learner_performance history), then replays
+learner sessions concurrently through the Flask app and reports p50/p95/p99
+latency and SQL statements per request for every endpoint.
+
+On Postgres the session is the Ascent Basecamp hot path:
+    start -> log_activity burst -> complete -> leaderboard
+On SQLite (no Ascent tables) it is the module path:
+    module details -> progress burst -> progress complete -> feedback -> analytics
+
+Seeded rows use the "bench-" id prefix and are removed afterwards unless
+--keep is given. Without --database-url a throwaway SQLite file is used.
+
+Usage:
+    python scripts/benchmark_lms.py
+    python scripts/benchmark_lms.py --students 5000 --sessions 2000 --concurrency 16
+    python scripts/benchmark_lms.py --database-url postgresql://localhost/frames_bench
+    python scripts/benchmark_lms.py --json results.json --max-p95-ms 50
+
+DATABASE_URL from .env is deliberately ignored so a run can never seed the
+shared database; Postgres URLs must point at a local host unless
+--allow-remote is passed.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+PREFIX = 'bench-'
+SUBSYSTEMS = ['power', 'avionics', 'structures', 'software', 'comms', 'adcs']
+PERCENTILES = (50, 95, 99)
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1', ''}
+
+# Tables whose seeded or benchmark-written rows are found by student_id
+STUDENT_TABLES = [
+    'assignment_notifications', 'module_analytics_events', 'module_feedback',
+    'module_progress', 'module_assignments',
+]
+ASCENT_TABLES = [
+    'leaderboard_entries', 'subsystem_competency', 'learner_attempt_counters',
+    'learner_performance',
+]
+
+_counter = threading.local()
+
+
+def count_query(*_args, **_kwargs):
+    _counter.queries = getattr(_counter, 'queries', 0) + 1
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(math.ceil(p / 100 * len(values)) - 1, 0))]
+
+
+def counting_connect(database_url):
+    """psycopg2 connect() whose cursors count executed statements"""
+    import psycopg2
+    import psycopg2.extensions
+
+    factories = {}
+
+    def counting(factory):
+        if factory not in factories:
+            class CountingCursor(factory):
+                def execute(self, *args, **kwargs):
+                    count_query()
+                    return super().execute(*args, **kwargs)
+
+                def executemany(self, *args, **kwargs):
+                    count_query()
+                    return super().executemany(*args, **kwargs)
+            factories[factory] = CountingCursor
+        return factories[factory]
+
+    class CountingConnection(psycopg2.extensions.connection):
+        def cursor(self, *args, **kwargs):
+            factory = kwargs.pop('cursor_factory', None) or self.cursor_factory or psycopg2.extensions.cursor
+            return super().cursor(*args, cursor_factory=counting(factory), **kwargs)
+
+    return lambda: psycopg2.connect(database_url, connection_factory=CountingConnection)
+
+
+def cleanup(db, text, is_postgres):
+    """Delete every row the benchmark seeded or wrote"""
+    params = {'prefix': PREFIX + '%'}
+    module_ids = "SELECT id FROM modules WHERE module_id LIKE :prefix"
+    tables = (ASCENT_TABLES if is_postgres else []) + STUDENT_TABLES
+    for table in tables:
+        db.session.execute(text(f"DELETE FROM {table} WHERE student_id LIKE :prefix"), params)
+    for table in ['module_stats', 'module_sections']:
+        db.session.execute(text(f"DELETE FROM {table} WHERE module_id IN ({module_ids})"), params)
+    db.session.execute(text("DELETE FROM modules WHERE module_id LIKE :prefix"), params)
+    db.session.execute(text("DELETE FROM students WHERE id LIKE :prefix"), params)
+    db.session.commit()
+
+
+def seed(db, models, args, is_postgres):
+    """Insert the synthetic cohort in bulk; returns (student ids, module ids, row counts)"""
+    from sqlalchemy import insert, text
+    from backend.module_stats import rebuild_all_module_stats
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+
+    student_ids = [f"{PREFIX}s{n:05d}" for n in range(args.students)]
+    db.session.execute(insert(models.StudentModel), [{
+        'id': student_id,
+        'university_id': f"{PREFIX}uni{n % 5}",
+        'name': f"Bench Student {n}",
+        'team_id': f"{PREFIX}team{n % 40}",
+        'terms_remaining': rng.randint(1, 4),
+        'status': rng.choice(['incoming', 'established', 'outgoing']),
+        'active': True,
+    } for n, student_id in enumerate(student_ids)])
+
+    modules = [models.Module(
+        module_id=f"{PREFIX}m{n:03d}",
+        title=f"Bench Module {n}",
+        description=f"Synthetic module {n} for load testing",
+        category=SUBSYSTEMS[n % len(SUBSYSTEMS)],
+        status='published',
+        estimated_minutes=rng.randint(10, 60),
+        tags=['benchmark', SUBSYSTEMS[n % len(SUBSYSTEMS)]],
+    ) for n in range(args.modules)]
+    db.session.add_all(modules)
+    db.session.flush()
+    module_ids = [module.id for module in modules]
+
+    db.session.execute(insert(models.ModuleSection), [{
+        'module_id': module_id,
+        'section_number': number,
+        'section_type': 'text',
+        'title': f"Section {number}",
+        'content': f"Section {number} body. " * rng.randint(20, 200),
+    } for module_id in module_ids for number in range(1, args.sections + 1)])
+
+    progress, feedback, performance = [], [], []
+    for student_id in student_ids:
+        for module_id in rng.sample(module_ids, min(args.progress_per_student, len(module_ids))):
+            completed = rng.random() < 0.6
+            started = now - timedelta(days=rng.randint(1, 120))
+            progress.append({
+                'module_id': module_id,
+                'student_id': student_id,
+                'status': 'completed' if completed else 'in_progress',
+                'progress_percent': 100 if completed else rng.randint(5, 95),
+                'current_section': args.sections if completed else rng.randint(1, args.sections),
+                'started_at': started,
+                'completed_at': started + timedelta(hours=2) if completed else None,
+                'total_time_seconds': rng.randint(300, 5400),
+                'last_accessed_at': started + timedelta(hours=2),
+                'completed_sections': [],
+            })
+            if completed and rng.random() < 0.3:
+                feedback.append({
+                    'module_id': module_id,
+                    'student_id': student_id,
+                    'rating': rng.randint(1, 5),
+                    'difficulty': rng.choice(['too_easy', 'just_right', 'too_hard']),
+                    'clarity': rng.randint(1, 5),
+                    'usefulness': rng.randint(1, 5),
+                    'submitted_at': started + timedelta(hours=3),
+                })
+            for attempt in range(1, (2 if completed else 1) + 1):
+                performance.append({
+                    'student_id': student_id,
+                    'module_id': module_id,
+                    'attempt_number': attempt,
+                    'time_spent_seconds': rng.randint(300, 5400),
+                    'errors_count': rng.randint(0, 12),
+                    'mastery_score': round(rng.uniform(40, 100), 2),
+                    'completed': completed,
+                    'timestamp': started + timedelta(days=attempt),
+                })
+    db.session.execute(insert(models.ModuleProgress), progress)
+    if feedback:
+        db.session.execute(insert(models.ModuleFeedback), feedback)
+
+    if is_postgres:
+        db.session.execute(text(
+            "UPDATE modules SET subsystem = category WHERE module_id LIKE :prefix"
+        ), {'prefix': PREFIX + '%'})
+        db.session.execute(text("""
+            INSERT INTO learner_performance (
+                student_id, module_id, attempt_number, time_spent_seconds,
+                errors_count, mastery_score, completed, timestamp
+            ) VALUES (
+                :student_id, :module_id, :attempt_number, :time_spent_seconds,
+                :errors_count, :mastery_score, :completed, :timestamp
+            )
+        """), performance)
+        db.session.execute(text("""
+            INSERT INTO learner_attempt_counters (student_id, module_id, last_attempt)
+            SELECT student_id, module_id, MAX(attempt_number)
+            FROM learner_performance WHERE student_id LIKE :prefix
+            GROUP BY student_id, module_id
+            ON CONFLICT (student_id, module_id) DO NOTHING
+        """), {'prefix': PREFIX + '%'})
+        db.session.execute(text("""
+            INSERT INTO leaderboard_entries (
+                student_id, module_id, subsystem, best_score, best_time,
+                attempts, score_sum, time_sum
+            )
+            SELECT lp.student_id, lp.module_id, COALESCE(m.subsystem, 'general'),
+                   MAX(lp.mastery_score), MIN(lp.time_spent_seconds),
+                   COUNT(*), SUM(lp.mastery_score), SUM(lp.time_spent_seconds)
+            FROM learner_performance lp
+            JOIN modules m ON m.id = lp.module_id
+            WHERE lp.completed = TRUE AND lp.student_id LIKE :prefix
+            GROUP BY lp.student_id, lp.module_id, m.subsystem
+            ON CONFLICT (student_id, module_id) DO NOTHING
+        """), {'prefix': PREFIX + '%'})
+
+    db.session.commit()
+    rebuild_all_module_stats()
+    return student_ids, module_ids, {
+        'progress': len(progress),
+        'feedback': len(feedback),
+        'learner_performance': len(performance) if is_postgres else 0,
+    }
+
+
+class Recorder:
+    """Per-endpoint latency and query counts, shared across worker threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, client, endpoint, method, url, body=None):
+        _counter.queries = 0
+        started = time.perf_counter()
+        if method == 'GET':
+            response = client.get(url)
+        else:
+            response = client.post(url, data=json.dumps(body or {}), content_type='application/json')
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.samples[endpoint].append((elapsed_ms, _counter.queries))
+            if response.status_code >= 400:
+                self.errors[endpoint] += 1
+        return response.get_json(silent=True) or {}
+
+    def report(self):
+        rows = {}
+        for endpoint, samples in self.samples.items():
+            latencies = sorted(ms for ms, _ in samples)
+            rows[endpoint] = {
+                'requests': len(samples),
+                'errors': self.errors[endpoint],
+                **{f"p{p}_ms": round(percentile(latencies, p), 2) for p in PERCENTILES},
+                'queries_per_request': round(sum(q for _, q in samples) / len(samples), 2),
+            }
+        return rows
+
+
+def postgres_session(client, recorder, rng, student_id, module_id):
+    """start -> log_activity burst -> complete -> leaderboard"""
+    base = f"/api/lms/students/{student_id}/modules/{module_id}"
+    started = recorder.call(client, 'POST start', 'POST', f"{base}/start")
+    attempt = started.get('attempt_number')
+    elapsed = errors = 0
+    for _ in range(rng.randint(3, 8)):
+        elapsed += rng.randint(30, 300)
+        errors += rng.random() < 0.2
+        recorder.call(client, 'POST log_activity', 'POST', f"{base}/log_activity", {
+            'time_spent_seconds': elapsed, 'errors_count': errors, 'attempt_number': attempt
+        })
+    recorder.call(client, 'POST complete', 'POST', f"{base}/complete", {
+        'time_spent_seconds': elapsed, 'errors_count': errors,
+        'mastery_score': round(rng.uniform(50, 100), 2), 'attempt_number': attempt
+    })
+    recorder.call(client, 'GET leaderboard', 'GET',
+                  f"/api/lms/students/{student_id}/leaderboard?module_id={module_id}")
+
+
+def sqlite_session(client, recorder, rng, student_id, module_id, sections):
+    """module details -> progress burst -> progress complete -> feedback -> analytics"""
+    recorder.call(client, 'GET module', 'GET', f"/api/lms/modules/{module_id}")
+    url = f"/api/lms/modules/{module_id}/progress"
+    for number in range(1, sections + 1):
+        recorder.call(client, 'POST progress', 'POST', url, {
+            'student_id': student_id, 'section_number': number,
+            'progress_percent': int(100 * number / (sections + 1)), 'status': 'in_progress',
+            'time_spent_seconds': rng.randint(30, 300)
+        })
+    recorder.call(client, 'POST progress (complete)', 'POST', url, {
+        'student_id': student_id, 'section_number': sections,
+        'progress_percent': 100, 'status': 'completed', 'time_spent_seconds': rng.randint(30, 300)
+    })
+    recorder.call(client, 'POST feedback', 'POST', f"/api/lms/modules/{module_id}/feedback", {
+        'student_id': student_id, 'rating': rng.randint(1, 5), 'difficulty': 'just_right',
+        'clarity': rng.randint(1, 5), 'usefulness': rng.randint(1, 5)
+    })
+    recorder.call(client, 'GET analytics', 'GET', f"/api/lms/modules/{module_id}/analytics")
+
+
+def print_report(rows, elapsed, sessions):
+    print()
+    header = f"{'endpoint':<26}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+    print(header)
+    print('-' * len(header))
+    total = 0
+    for endpoint, row in rows.items():
+        total += row['requests']
+        print(f"{endpoint:<26}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']:>9.2f}"
+              f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}{row['queries_per_request']:>9.2f}")
+    print('-' * len(header))
+    print(f"{sessions} sessions, {total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the LMS API against a local database')
+    parser.add_argument('--database-url', help='Database to seed and test (default: throwaway SQLite file)')
+    parser.add_argument('--allow-remote', action='store_true', help='Permit a non-local Postgres host')
+    parser.add_argument('--students', type=int, default=2000, help='Synthetic students (default: 2000)')
+    parser.add_argument('--modules', type=int, default=40, help='Synthetic modules (default: 40)')
+    parser.add_argument('--sections', type=int, default=6, help='Sections per module (default: 6)')
+    parser.add_argument('--progress-per-student', type=int, default=5,
+                        help='Modules each student has progress on (default: 5)')
+    parser.add_argument('--sessions', type=int, default=500, help='Learner sessions to replay (default: 500)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent sessions (default: 8)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--keep', action='store_true', help='Keep seeded rows after the run')
+    parser.add_argument('--json', help='Write per-endpoint results to this file')
+    parser.add_argument('--max-p95-ms', type=float,
+                        help='Exit non-zero if any endpoint p95 exceeds this many ms')
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix='lms-bench-')
+        database_url = f"sqlite:///{os.path.join(tmpdir, 'lms_benchmark.db')}"
+
+    is_postgres = database_url.startswith('postgres')
+    if is_postgres and urlparse(database_url).hostname not in LOCAL_HOSTS and not args.allow_remote:
+        print(f"✗ Refusing to seed a non-local database ({urlparse(database_url).hostname}); "
+              f"pass --allow-remote to override")
+        sys.exit(1)
+
+    # The app and LMS routes read DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = database_url
+    logging.getLogger('backend').setLevel(logging.WARNING)
+
+    from sqlalchemy import event, text
+    from backend.database import db
+    from backend.app import app
+    from backend import lms_routes
+    from shared.database import db_models as models
+
+    if is_postgres:
+        connect = counting_connect(database_url)
+        lms_routes.get_postgres_conn = connect
+        lms_routes.leaderboard_index._connect = connect
+        lms_routes.ghost_benchmarks._connect = connect
+
+    # Set once the schema exists, so a failed setup is not hidden behind cleanup errors
+    schema_ready = False
+    try:
+        with app.app_context():
+            db.create_all()
+            if is_postgres:
+                from scripts.create_ascent_basecamp_schema import create_tables
+                create_tables()
+            cleanup(db, text, is_postgres)
+            schema_ready = True
+
+            started = time.perf_counter()
+            student_ids, module_ids, counts = seed(db, models, args, is_postgres)
+            print(f"✓ Seeded {len(student_ids)} students, {len(module_ids)} modules, "
+                  f"{', '.join(f'{n} {table}' for table, n in counts.items())} rows "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+            event.listen(db.engine, 'before_cursor_execute', count_query)
+
+        recorder = Recorder()
+        rng = random.Random(args.seed)
+        plan = [(random.Random(args.seed + n), rng.choice(student_ids), rng.choice(module_ids))
+                for n in range(args.sessions)]
+
+        def run(job):
+            session_rng, student_id, module_id = job
+            with app.test_client() as client:
+                if is_postgres:
+                    postgres_session(client, recorder, session_rng, student_id, module_id)
+                else:
+                    sqlite_session(client, recorder, session_rng, student_id, module_id, args.sections)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(run, plan))
+        elapsed = time.perf_counter() - started
+
+        rows = recorder.report()
+        print_report(rows, elapsed, args.sessions)
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({
+                    'database': 'postgresql' if is_postgres else 'sqlite',
+                    'students': args.students, 'modules': args.modules,
+                    'sessions': args.sessions, 'concurrency': args.concurrency,
+                    'elapsed_seconds': round(elapsed, 3), 'endpoints': rows,
+                }, f, indent=2)
+            print(f"✓ Results written to {args.json}")
+
+        slow = [e for e, row in rows.items() if args.max_p95_ms and row['p95_ms'] > args.max_p95_ms]
+        failed = [e for e, row in rows.items() if row['errors']]
+    finally:
+        if schema_ready and not args.keep and not tmpdir:
+            with app.app_context():
+                cleanup(db, text, is_postgres)
+        if tmpdir:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    if failed:
+        print(f"✗ Requests failed on: {', '.join(failed)}")
+    if slow:
+        print(f"✗ p95 above {args.max_p95_ms}ms on: {', '.join(slow)}")
+    if failed or slow:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Incremental module build: ingest -> PDF rebuild -> enhance/audit -> deploy.
+
+Each stage wraps one of the existing module scripts and declares the files it
+reads. A stage runs only when the content hash of those inputs (including
+the script itself) differs from the last successful run recorded in
+BUILD_STATE, or when one of its outputs is missing. Because downstream
+stages fingerprint upstream outputs by content, a rerun that produces
+identical files stops the rebuild there. A stage that writes into an
+upstream stage's outputs (the PDF rebuild over ingested exports) also reruns
+whenever that upstream stage has run after it, since the upstream rerun
+replaced its files.
+
+Stages whose dependencies have finished run concurrently; the module-level
+parallelism lives inside the stage scripts themselves. File hashes are cached
+by path, mtime and size, so unchanged inputs (such as the export archive) are
+not re-read.
+
+Usage:
+    python scripts/build_modules.py                 # rebuild whatever is stale
+    python scripts/build_modules.py enhance audit   # only these and their dependencies
+    python scripts/build_modules.py --dry-run       # show what would run and why
+    python scripts/build_modules.py --force --jobs 2
+
+Deploy stages need DATABASE_URL; without it they are skipped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BUILD_STATE = PROJECT_ROOT / "data" / "build_state.json"
+HASH_BUFFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    deps: List[str] = field(default_factory=list)
+    requires_files: List[str] = field(default_factory=list)
+    requires_env: List[str] = field(default_factory=list)
+
+    def command(self) -> List[str]:
+        return [sys.executable, self.script, *self.args]
+
+
+# Inputs are files, directories (every file below) or glob patterns, relative to the project root
+STAGES = [
+    Stage(
+        name="ingest",
+        script="scripts/ingest_cadence_export.py",
+        args=["--overwrite"],
+        inputs=["temp_cadence_extract/ExportBlock-*.zip", "data/projects/CADENCE/notion_modules_categorized.csv"],
+        outputs=["modules/exports"],
+        requires_files=["temp_cadence_extract/ExportBlock-*.zip"],
+    ),
+    Stage(
+        name="pdf",
+        script="scripts/rebuild_pdf_modules.py",
+        inputs=["data/projects/CADENCE/notion_modules_categorized.csv", "data/projects/CADENCE/pdfs",
+                "temp_cadence_extract/content/*.pdf"],
+        outputs=["modules/exports"],
+        # Rebuilt PDF modules replace ingested ones with the same slug
+        deps=["ingest"],
+        requires_files=["data/projects/CADENCE/notion_modules_categorized.csv"],
+    ),
+    Stage(
+        name="enhance",
+        script="scripts/enhance_modules.py",
+        inputs=["modules/exports/*.json"],
+        outputs=["modules/enhanced", "data/enhance_manifest.json"],
+        deps=["pdf"],
+    ),
+    Stage(
+        name="audit",
+        script="scripts/audit_module_library.py",
+        inputs=["modules/exports/*.json"],
+        outputs=["module_library_audit.json"],
+        deps=["pdf"],
+    ),
+    Stage(
+        name="deploy-exports",
+        script="scripts/gamma_tasks.py",
+        args=["deploy-modules"],
+        inputs=["modules/exports/*.json"],
+        deps=["pdf"],
+        requires_env=["DATABASE_URL"],
+    ),
+    Stage(
+        name="deploy",
+        script="scripts/deploy_modules_to_db.py",
+        inputs=["data/modules/*.json", "schemas/module_schema.json"],
+        requires_env=["DATABASE_URL"],
+    ),
+]
+
+
+class BuildState:
+    """Last successful fingerprint per stage plus a stat-keyed file hash cache"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            data = {}
+        self.stages: Dict[str, Dict] = data.get("stages", {})
+        self.files: Dict[str, List] = data.get("files", {})
+
+    def file_hash(self, path: Path, key: str) -> str:
+        stat = path.stat()
+        cached = self.files.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(HASH_BUFFER_SIZE), b""):
+                digest.update(block)
+        self.files[key] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        return self.files[key][2]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages, "files": self.files}, indent=2, sort_keys=True),
+                       encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def expand(root: Path, pattern: str) -> List[Path]:
+    """Files matched by one input entry, sorted"""
+    if any(ch in pattern for ch in "*?["):
+        return sorted(path for path in root.glob(pattern) if path.is_file())
+    path = root / pattern
+    if path.is_dir():
+        return sorted(child for child in path.rglob("*") if child.is_file())
+    return [path] if path.is_file() else []
+
+
+class BuildGraph:
+    def __init__(self, stages: Iterable[Stage], root: Path = PROJECT_ROOT, state_path: Path = BUILD_STATE):
+        self.stages = {stage.name: stage for stage in stages}
+        self.root = root
+        self.state = BuildState(state_path)
+        for stage in self.stages.values():
+            unknown = set(stage.deps) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(sorted(unknown))}")
+
+    def plan(self, targets: Optional[List[str]] = None) -> List[str]:
+        """Targets and everything upstream of them, in dependency order"""
+        order: List[str] = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in targets or list(self.stages):
+            visit(name)
+        return order
+
+    def fingerprint(self, stage: Stage) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps([stage.script, stage.args, stage.inputs]).encode("utf-8"))
+        for path in [self.root / stage.script] + [p for pattern in stage.inputs for p in expand(self.root, pattern)]:
+            key = path.relative_to(self.root).as_posix()
+            digest.update(f"{key}\0{self.state.file_hash(path, key)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def blocker(self, stage: Stage) -> Optional[str]:
+        missing_env = [name for name in stage.requires_env if not os.getenv(name)]
+        if missing_env:
+            return f"{', '.join(missing_env)} not set"
+        missing = [pattern for pattern in stage.requires_files if not expand(self.root, pattern)]
+        if missing:
+            return f"missing {', '.join(missing)}"
+        return None
+
+    def staleness(self, stage: Stage, fingerprint: str) -> Optional[str]:
+        """Why the stage must run, or None when it is up to date"""
+        previous = self.state.stages.get(stage.name)
+        if not previous:
+            return "never built"
+        if previous.get("fingerprint") != fingerprint:
+            return "inputs changed"
+        rewritten = [
+            dep for dep in stage.deps
+            if set(self.stages[dep].outputs) & set(stage.outputs)
+            and self.state.stages.get(dep, {}).get("finished_at", "") > previous.get("finished_at", "")
+        ]
+        if rewritten:
+            return f"{', '.join(rewritten)} rewrote its outputs"
+        missing = [out for out in stage.outputs if not (self.root / out).exists()]
+        if missing:
+            return f"missing {', '.join(missing)}"
+        return None
+
+    def execute(self, stage: Stage) -> Tuple[int, str, float]:
+        started = time.perf_counter()
+        proc = subprocess.run(stage.command(), cwd=self.root, capture_output=True, text=True)
+        return proc.returncode, proc.stdout + proc.stderr, time.perf_counter() - started
+
+    def run(self, targets: Optional[List[str]] = None, force: bool = False, jobs: int = 2,
+            dry_run: bool = False, verbose: bool = False) -> List[Dict]:
+        """
+        Run stale stages in dependency order, independent stages concurrently.
+
+        Returns one result per planned stage with status fresh, ran, failed,
+        skipped, blocked or stale (dry run), its reason and timings.
+        """
+        order = self.plan(targets)
+        results: Dict[str, Dict] = {}
+        pending = list(order)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    dep_results = [results.get(dep) for dep in stage.deps if dep in order]
+                    if any(result is None for result in dep_results):
+                        continue
+                    pending.remove(name)
+
+                    deps = [dep for dep in stage.deps if dep in order]
+                    failed = [dep for dep, result in zip(deps, dep_results) if result["status"] in ("failed", "blocked")]
+                    if failed:
+                        results[name] = {"stage": name, "status": "blocked", "reason": f"{', '.join(failed)} failed"}
+                        continue
+                    reason = self.blocker(stage)
+                    if reason:
+                        results[name] = {"stage": name, "status": "skipped", "reason": reason}
+                        continue
+                    stale = [dep for dep, result in zip(deps, dep_results) if result["status"] == "stale"]
+                    if stale:
+                        # Inputs are unknown until the upstream stage has run
+                        results[name] = {"stage": name, "status": "stale", "reason": f"after {', '.join(stale)}"}
+                        continue
+
+                    started = time.perf_counter()
+                    fingerprint = self.fingerprint(stage)
+                    hash_seconds = time.perf_counter() - started
+                    reason = "forced" if force else self.staleness(stage, fingerprint)
+                    result = {"stage": name, "reason": reason, "hash_seconds": hash_seconds,
+                              "fingerprint": fingerprint}
+                    if reason is None:
+                        results[name] = dict(result, status="fresh", reason="up to date")
+                    elif dry_run:
+                        results[name] = dict(result, status="stale")
+                    else:
+                        print(f"▶ {name}: {reason}")
+                        running[pool.submit(self.execute, stage)] = result
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = running.pop(future)
+                    returncode, output, seconds = future.result()
+                    result.update(seconds=seconds, status="ran" if returncode == 0 else "failed")
+                    results[result["stage"]] = result
+                    if returncode == 0:
+                        self.state.stages[result["stage"]] = {
+                            "fingerprint": result["fingerprint"],
+                            "finished_at": datetime.utcnow().isoformat(),
+                            "seconds": round(seconds, 3),
+                        }
+                        self.state.save()
+                    if verbose or returncode != 0:
+                        print(output.rstrip())
+                    print(f"{'✓' if returncode == 0 else '✗'} {result['stage']} ({seconds:.1f}s)")
+
+        self.state.save()
+        return [results[name] for name in order]
+
+
+def print_report(results: List[Dict]):
+    print()
+    print(f"{'Stage':<16} {'Status':<8} {'Hash':>7} {'Run':>8}  Reason")
+    print("-" * 60)
+    for result in results:
+        hash_seconds = f"{result['hash_seconds']:.2f}s" if "hash_seconds" in result else "-"
+        seconds = f"{result['seconds']:.2f}s" if "seconds" in result else "-"
+        print(f"{result['stage']:<16} {result['status']:<8} {hash_seconds:>7} {seconds:>8}  {result['reason']}")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Rebuild module artifacts whose inputs changed")
+    parser.add_argument("targets", nargs="*", help=f"Stages to build (default: all of {', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--force", action="store_true", help="Run every planned stage regardless of fingerprints")
+    parser.add_argument("--dry-run", action="store_true", help="Report stale stages without running them")
+    parser.add_argument("--jobs", type=int, default=2, help="Stages to run concurrently (default: 2)")
+    parser.add_argument("--verbose", action="store_true", help="Print stage output even on success")
+    args = parser.parse_args()
+
+    graph = BuildGraph(STAGES)
+    try:
+        results = graph.run(args.targets, force=args.force, jobs=args.jobs,
+                            dry_run=args.dry_run, verbose=args.verbose)
+    except ValueError as exc:
+        print(f"✗ {exc}")
+        sys.exit(2)
+
+    print_report(results)
+    if any(result["status"] in ("failed", "blocked") for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
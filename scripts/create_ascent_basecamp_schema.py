@@ -109,7 +109,65 @@ def create_tables():
         );
     """)
     print("  ✓ cadence_documents")
-    
+
+    # Unique keys that populate_cadence_tables.py inserts against. Duplicate
+    # people left by earlier runs are merged into the lowest person_id first
+    cur.execute("""
+        WITH keep AS (
+            SELECT name, MIN(person_id) AS person_id
+            FROM cadence_people GROUP BY name HAVING COUNT(*) > 1
+        ),
+        dupes AS (
+            SELECT p.person_id, keep.person_id AS keep_id
+            FROM cadence_people p JOIN keep ON keep.name = p.name
+            WHERE p.person_id <> keep.person_id
+        ),
+        tasks AS (
+            UPDATE cadence_tasks t SET assignee_id = dupes.keep_id
+            FROM dupes WHERE t.assignee_id = dupes.person_id
+        )
+        UPDATE cadence_projects pr SET owner_id = dupes.keep_id
+        FROM dupes WHERE pr.owner_id = dupes.person_id;
+    """)
+    cur.execute("""
+        DELETE FROM cadence_people a
+        USING cadence_people b
+        WHERE a.name = b.name AND a.person_id > b.person_id;
+    """)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_cadence_people_name ON cadence_people(name);")
+    # Tasks and meetings of duplicate projects move to the lowest project_id
+    # before the loop below deletes the duplicates they reference
+    cur.execute("""
+        WITH keep AS (
+            SELECT notion_page_id, MIN(project_id) AS project_id
+            FROM cadence_projects WHERE notion_page_id IS NOT NULL
+            GROUP BY notion_page_id HAVING COUNT(*) > 1
+        ),
+        dupes AS (
+            SELECT p.project_id, keep.project_id AS keep_id
+            FROM cadence_projects p JOIN keep ON keep.notion_page_id = p.notion_page_id
+            WHERE p.project_id <> keep.project_id
+        ),
+        tasks AS (
+            UPDATE cadence_tasks t SET project_id = dupes.keep_id
+            FROM dupes WHERE t.project_id = dupes.project_id
+        )
+        UPDATE cadence_meetings m SET project_id = dupes.keep_id
+        FROM dupes WHERE m.project_id = dupes.project_id;
+    """)
+    for table, key in [('cadence_projects', 'project_id'), ('cadence_tasks', 'task_id'),
+                       ('cadence_meetings', 'meeting_id'), ('cadence_documents', 'doc_id')]:
+        cur.execute(f"""
+            DELETE FROM {table} a
+            USING {table} b
+            WHERE a.notion_page_id = b.notion_page_id AND a.{key} > b.{key};
+        """)
+        cur.execute(f"""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_{table}_notion
+            ON {table}(notion_page_id) WHERE notion_page_id IS NOT NULL;
+        """)
+    print("  ✓ CADENCE unique keys")
+
     print()
     
     # =========================================================================
@@ -118,6 +176,20 @@ def create_tables():
     
     print("Creating Ascent Basecamp learning system tables...")
     
+    # MODULES.SUBSYSTEM - Race, competency and recommendation queries group modules by subsystem
+    cur.execute("ALTER TABLE modules ADD COLUMN IF NOT EXISTS subsystem VARCHAR(255);")
+    print("  ✓ modules.subsystem")
+    
+    # MODULE SEARCH - Weighted full-text documents (backend/module_search.py)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS module_search (
+            module_id INTEGER PRIMARY KEY REFERENCES modules(id) ON DELETE CASCADE,
+            search_vector TSVECTOR NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    print("  ✓ module_search")
+    
     # GHOST COHORTS - Performance benchmarking
     cur.execute("""
         CREATE TABLE IF NOT EXISTS ghost_cohorts (
@@ -149,6 +221,51 @@ def create_tables():
     """)
     print("  ✓ learner_performance")
     
+    # LEARNER ATTEMPT COUNTERS - Atomic attempt numbering per (student, module)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS learner_attempt_counters (
+            student_id VARCHAR(255) REFERENCES students(id),
+            module_id INTEGER REFERENCES modules(id),
+            last_attempt INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, module_id)
+        );
+    """)
+    # The old read-then-insert path could write the same attempt_number twice.
+    # Renumber (student, module) pairs holding duplicates in log order so the
+    # uq_learner_perf_attempt index below can be created
+    cur.execute("""
+        WITH dup_pairs AS (
+            SELECT student_id, module_id
+            FROM learner_performance
+            WHERE attempt_number IS NOT NULL
+            GROUP BY student_id, module_id
+            HAVING COUNT(*) > COUNT(DISTINCT attempt_number)
+        ),
+        renumbered AS (
+            SELECT lp.log_id,
+                   row_number() OVER (PARTITION BY lp.student_id, lp.module_id ORDER BY lp.log_id) AS attempt_number
+            FROM learner_performance lp
+            JOIN dup_pairs d ON d.student_id = lp.student_id AND d.module_id = lp.module_id
+            WHERE lp.attempt_number IS NOT NULL
+        )
+        UPDATE learner_performance lp
+        SET attempt_number = renumbered.attempt_number
+        FROM renumbered
+        WHERE lp.log_id = renumbered.log_id
+          AND lp.attempt_number IS DISTINCT FROM renumbered.attempt_number;
+    """)
+    # Seed counters from the (renumbered) attempts so numbering continues
+    cur.execute("""
+        INSERT INTO learner_attempt_counters (student_id, module_id, last_attempt)
+        SELECT student_id, module_id, MAX(attempt_number)
+        FROM learner_performance
+        WHERE student_id IS NOT NULL AND module_id IS NOT NULL
+        GROUP BY student_id, module_id
+        ON CONFLICT (student_id, module_id) DO UPDATE SET
+            last_attempt = GREATEST(learner_attempt_counters.last_attempt, EXCLUDED.last_attempt);
+    """)
+    print("  ✓ learner_attempt_counters")
+    
     # MODULE DIFFICULTY CALIBRATIONS - Adaptive difficulty
     cur.execute("""
         CREATE TABLE IF NOT EXISTS module_difficulty_calibrations (
@@ -235,6 +352,19 @@ def create_tables():
     """)
     print("  ✓ race_metadata")
     
+    # GHOST BENCHMARKS - Precomputed race percentile curves (backend/ghost_replay.py)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS ghost_benchmarks (
+            module_id INTEGER PRIMARY KEY REFERENCES modules(id),
+            version INTEGER NOT NULL DEFAULT 1,
+            format_version SMALLINT NOT NULL,
+            sample_size INTEGER NOT NULL,
+            payload BYTEA NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+    print("  ✓ ghost_benchmarks")
+    
     # SUBSYSTEM COMPETENCY TRACKING
     cur.execute("""
         CREATE TABLE IF NOT EXISTS subsystem_competency (
@@ -248,8 +378,56 @@ def create_tables():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
     """)
+    # Collapse duplicate (student, subsystem) rows left by the old
+    # select-then-insert path, keeping the most advanced one, so the
+    # unique key that completions upsert against can be created
+    cur.execute("""
+        DELETE FROM subsystem_competency a
+        USING subsystem_competency b
+        WHERE a.student_id = b.student_id
+          AND a.subsystem = b.subsystem
+          AND (COALESCE(a.modules_completed, 0), a.competency_id)
+            < (COALESCE(b.modules_completed, 0), b.competency_id);
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_subsystem_comp_student_subsystem
+        ON subsystem_competency(student_id, subsystem);
+    """)
     print("  ✓ subsystem_competency")
     
+    # LEADERBOARD ENTRIES - Materialized best results per (student, module)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_entries (
+            student_id VARCHAR(255) REFERENCES students(id),
+            module_id INTEGER REFERENCES modules(id),
+            subsystem VARCHAR(255),
+            best_score DECIMAL(5,2),
+            best_time INTEGER,
+            attempts INTEGER DEFAULT 0,
+            score_sum DECIMAL(12,2) DEFAULT 0,
+            time_sum BIGINT DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, module_id)
+        );
+    """)
+    # Backfill from historical completions (no-op once populated)
+    cur.execute("""
+        INSERT INTO leaderboard_entries (
+            student_id, module_id, subsystem, best_score, best_time,
+            attempts, score_sum, time_sum
+        )
+        SELECT
+            lp.student_id, lp.module_id, COALESCE(m.subsystem, 'general'),
+            MAX(lp.mastery_score), MIN(lp.time_spent_seconds),
+            COUNT(*), SUM(lp.mastery_score), SUM(lp.time_spent_seconds)
+        FROM learner_performance lp
+        JOIN modules m ON m.id = lp.module_id
+        WHERE lp.completed = TRUE
+        GROUP BY lp.student_id, lp.module_id, m.subsystem
+        ON CONFLICT (student_id, module_id) DO NOTHING;
+    """)
+    print("  ✓ leaderboard_entries")
+    
     # NOTION SYNC METADATA - Track sync operations
     cur.execute("""
         CREATE TABLE IF NOT EXISTS notion_sync_metadata (
@@ -282,10 +460,17 @@ def create_tables():
         "CREATE INDEX IF NOT EXISTS idx_cadence_documents_category ON cadence_documents(category);",
         "CREATE INDEX IF NOT EXISTS idx_learner_perf_student ON learner_performance(student_id);",
         "CREATE INDEX IF NOT EXISTS idx_learner_perf_module ON learner_performance(module_id);",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_learner_perf_attempt ON learner_performance(student_id, module_id, attempt_number) INCLUDE (log_id, completed);",
         "CREATE INDEX IF NOT EXISTS idx_agent_log_timestamp ON ascent_basecamp_agent_log(timestamp);",
         "CREATE INDEX IF NOT EXISTS idx_agent_log_agent ON ascent_basecamp_agent_log(agent_name);",
         "CREATE INDEX IF NOT EXISTS idx_subsystem_comp_student ON subsystem_competency(student_id);",
         "CREATE INDEX IF NOT EXISTS idx_subsystem_comp_subsystem ON subsystem_competency(subsystem);",
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_module_rank ON leaderboard_entries(module_id, best_score DESC, best_time ASC);",
+        "CREATE INDEX IF NOT EXISTS idx_leaderboard_subsystem ON leaderboard_entries(subsystem);",
+        "CREATE INDEX IF NOT EXISTS idx_modules_subsystem_status_minutes ON modules(subsystem, status, estimated_minutes);",
+        "CREATE INDEX IF NOT EXISTS idx_learner_perf_student_module ON learner_performance(student_id, module_id) WHERE completed = TRUE;",
+        "CREATE INDEX IF NOT EXISTS idx_ghost_cohorts_subsystem ON ghost_cohorts(subsystem);",
+        "CREATE INDEX IF NOT EXISTS idx_module_search_vector ON module_search USING GIN (search_vector);",
     ]
     
     for idx_sql in indexes:
@@ -4,10 +4,17 @@ Deploy LMS modules from JSON files to PostgreSQL database.
 This script reads module JSON files from data/modules/, validates them,
 and inserts/updates them in the PostgreSQL database.
 
+Deploys are incremental: data/deploy_manifest.json records each file's
+sha256 with the module content hash and revision it produced, per database.
+Files whose hash is unchanged (and whose module still carries that content
+hash) are skipped before parsing; the rest are validated in parallel and
+written in a single transaction.
+
 Usage:
     python scripts/deploy_modules_to_db.py
     python scripts/deploy_modules_to_db.py --module-file data/modules/intro-to-research.json
     python scripts/deploy_modules_to_db.py --dry-run  # Test without writing to DB
+    python scripts/deploy_modules_to_db.py --full     # Ignore the deploy manifest
 
 Environment variables required:
     DATABASE_URL - PostgreSQL connection string (Neon)
@@ -16,6 +23,7 @@ Environment variables required:
 import os
 import sys
 import json
+import hashlib
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -39,13 +47,20 @@ load_dotenv()
 
 # Import after adding to path
 from backend.database import db
-from backend.app import app
-from shared.database.db_models import Module, ModuleSection
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import selectinload
+from shared.database.db_models import Module
+from backend.module_graph import ModuleGraph, PrerequisiteCycleError
+from backend.content_store import hash_content, module_content_hash, section_body, sync_sections
+from backend.module_search import index_module
+# Validation workers import only this module, never backend.app
+from module_validation import validate_module_files
 
 # Configuration
 INPUT_DIR = PROJECT_ROOT / 'data' / 'modules'
 SCHEMA_FILE = PROJECT_ROOT / 'schemas' / 'module_schema.json'
-
+# Outside INPUT_DIR, which is globbed for *.json modules
+MANIFEST_FILE = PROJECT_ROOT / 'data' / 'deploy_manifest.json'
 
 def validate_config():
     """Validate required configuration"""
@@ -72,144 +87,145 @@ def load_json_schema() -> Dict:
         return json.load(f)
 
 
-def validate_module_data(module_data: Dict, schema: Dict) -> bool:
-    """Validate module data against JSON schema"""
-    try:
-        jsonschema.validate(instance=module_data, schema=schema)
-        return True
-    except jsonschema.exceptions.ValidationError as e:
-        print(f"  ✗ Validation error: {e.message}")
-        return False
+def file_hash(file_path: Path) -> str:
+    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+
+def manifest_key() -> str:
+    """Manifest section for the target database (host/name, no credentials)"""
+    url = make_url(os.getenv('DATABASE_URL'))
+    return f"{url.host or ''}/{url.database or ''}"
 
 
-def load_module_json(file_path: Path) -> Optional[Dict]:
-    """Load and validate a module JSON file"""
+def load_manifest() -> Dict:
+    if not MANIFEST_FILE.exists():
+        return {}
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
             return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"  ✗ Invalid JSON: {e}")
-        return None
-    except Exception as e:
-        print(f"  ✗ Error reading file: {e}")
-        return None
+    except (json.JSONDecodeError, OSError):
+        return {}
 
 
-def deploy_module_to_db(module_data: Dict, dry_run: bool = False) -> bool:
-    """
-    Deploy a module to the database.
+def save_manifest(manifest: Dict):
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
 
-    Args:
-        module_data: Validated module data dict
-        dry_run: If True, don't commit to database
 
-    Returns:
-        True if successful, False otherwise
+def check_prerequisite_graph(modules_data: List[Dict]) -> bool:
+    """
+    Check that prerequisites across the deployed catalog plus these modules
+    form a DAG. Must run inside an app context.
     """
+    catalog = {
+        row.module_id: {'key': row.module_id, 'module_id': row.module_id,
+                        'title': row.title, 'prerequisites': row.prerequisites}
+        for row in db.session.query(Module.module_id, Module.title, Module.prerequisites)
+    }
+    for module_data in modules_data:
+        catalog[module_data['module_id']] = {
+            'key': module_data['module_id'],
+            'module_id': module_data['module_id'],
+            'title': module_data['title'],
+            'prerequisites': module_data.get('prerequisites', []),
+        }
+
     try:
-        module_id = module_data['module_id']
-
-        # Check if module already exists
-        existing = Module.query.filter_by(module_id=module_id).first()
-
-        if existing:
-            print(f"  → Module exists (ID: {existing.id}), updating...")
-            module = existing
-
-            # Update fields
-            module.title = module_data['title']
-            module.description = module_data.get('description')
-            module.category = module_data.get('category')
-            module.estimated_minutes = module_data.get('estimated_minutes')
-            module.target_audience = module_data.get('target_audience')
-            module.status = module_data.get('status', 'draft')
-            module.notion_page_id = module_data.get('notion_page_id')
-            module.content_source = module_data.get('content_source', 'notion')
-            module.tags = module_data.get('tags', [])
-            module.prerequisites = module_data.get('prerequisites', [])
-            module.related_modules = module_data.get('related_modules', [])
-            module.university_id = module_data.get('university_id')
-            module.created_by_id = module_data.get('created_by_id')
-            module.updated_at = datetime.utcnow()
-
-            # Delete existing sections
-            ModuleSection.query.filter_by(module_id=module.id).delete()
+        graph = ModuleGraph(catalog.values())
+    except PrerequisiteCycleError as e:
+        print(f"  ✗ {e}")
+        return False
 
-        else:
-            print(f"  → Creating new module...")
-            module = Module(
-                module_id=module_id,
-                title=module_data['title'],
-                description=module_data.get('description'),
-                category=module_data.get('category'),
-                estimated_minutes=module_data.get('estimated_minutes'),
-                target_audience=module_data.get('target_audience'),
-                status=module_data.get('status', 'draft'),
-                notion_page_id=module_data.get('notion_page_id'),
-                content_source=module_data.get('content_source', 'notion'),
-                tags=module_data.get('tags', []),
-                prerequisites=module_data.get('prerequisites', []),
-                related_modules=module_data.get('related_modules', []),
-                university_id=module_data.get('university_id'),
-                created_by_id=module_data.get('created_by_id'),
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            db.session.add(module)
-
-        # Flush to get the module.id for sections
-        if not dry_run:
-            db.session.flush()
-
-        # Add sections
-        sections_data = module_data.get('sections', [])
-        print(f"  → Adding {len(sections_data)} sections...")
-
-        for section_data in sections_data:
-            section = ModuleSection(
-                module_id=module.id,
-                section_number=section_data['section_number'],
-                section_type=section_data['section_type'],
-                title=section_data.get('title', ''),
-                content=section_data['content'],
-                media_url=section_data.get('media_url'),
-                duration_seconds=section_data.get('duration_seconds'),
-                created_at=datetime.utcnow()
-            )
-
-            # Store record_map if present (for react-notion-x)
-            if 'record_map' in section_data:
-                # Note: You may need to add a record_map JSON column to ModuleSection
-                # For now, we'll store it in the content field if section_type is notion_page
-                if section_data['section_type'] == 'notion_page':
-                    section.content = json.dumps(section_data['record_map'])
-
-            db.session.add(section)
+    for module_key, ref in graph.unresolved:
+        print(f"  ⚠️  {module_key}: prerequisite '{ref}' does not match any module")
+    return True
 
-        if dry_run:
-            print(f"  ✓ Dry run: Would deploy module '{module_data['title']}'")
-            db.session.rollback()
-        else:
-            db.session.commit()
-            print(f"  ✓ Deployed: {module_data['title']} (ID: {module.id})")
 
-        return True
+def deploy_module_to_db(module_data: Dict, existing: Optional[Module] = None) -> Module:
+    """
+    Stage a module's changes in the current transaction (caller commits).
 
-    except Exception as e:
-        db.session.rollback()
-        print(f"  ✗ Error deploying module: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return False
+    Args:
+        module_data: Validated module data dict
+        existing: The deployed Module with this module_id, if any
 
+    Returns:
+        The created or updated Module
+    """
+    module_id = module_data['module_id']
+    sections_data = sorted(module_data.get('sections', []), key=lambda s: s['section_number'])
+    content_hash = module_content_hash(
+        module_data, (hash_content(section_body(s)) for s in sections_data)
+    )
 
-def deploy_modules(module_file: Optional[str] = None, dry_run: bool = False):
+    if existing and existing.content_hash == content_hash:
+        print(f"  ✓ Unchanged (ID: {existing.id}), skipping")
+        return existing
+
+    if existing:
+        print(f"  → Module exists (ID: {existing.id}), updating...")
+        module = existing
+
+        # Update fields
+        module.title = module_data['title']
+        module.description = module_data.get('description')
+        module.category = module_data.get('category')
+        module.estimated_minutes = module_data.get('estimated_minutes')
+        module.target_audience = module_data.get('target_audience')
+        module.status = module_data.get('status', 'draft')
+        module.tags = module_data.get('tags', [])
+        module.prerequisites = module_data.get('prerequisites', [])
+        module.related_modules = module_data.get('related_modules', [])
+        module.university_id = module_data.get('university_id')
+        module.created_by_id = module_data.get('created_by_id')
+        module.revision = (module.revision or 0) + 1
+        module.updated_at = datetime.utcnow()
+
+    else:
+        print(f"  → Creating new module...")
+        module = Module(
+            module_id=module_id,
+            title=module_data['title'],
+            description=module_data.get('description'),
+            category=module_data.get('category'),
+            estimated_minutes=module_data.get('estimated_minutes'),
+            target_audience=module_data.get('target_audience'),
+            status=module_data.get('status', 'draft'),
+            tags=module_data.get('tags', []),
+            prerequisites=module_data.get('prerequisites', []),
+            related_modules=module_data.get('related_modules', []),
+            university_id=module_data.get('university_id'),
+            created_by_id=module_data.get('created_by_id'),
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+        db.session.add(module)
+
+    module.content_hash = content_hash
+
+    # Write only sections whose content hash or metadata changed;
+    # bodies are stored once per hash (notion_page record maps included)
+    counts = sync_sections(module, sections_data)
+    print(f"  → Sections: {counts['added']} added, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+
+    # Refresh the search document in the same transaction
+    db.session.flush()
+    index_module(module)
+    return module
+
+
+def deploy_modules(module_file: Optional[str] = None, dry_run: bool = False,
+                   full: bool = False, workers: Optional[int] = None):
     """
-    Deploy modules from JSON files to database.
+    Deploy changed modules from JSON files to database.
 
     Args:
         module_file: Optional path to specific JSON file
         dry_run: If True, validate but don't commit to database
+        full: If True, ignore the deploy manifest and consider every file
+        workers: Validation processes (default: CPU count)
     """
     # Validate configuration
     if not validate_config():
@@ -226,7 +242,7 @@ def deploy_modules(module_file: Optional[str] = None, dry_run: bool = False):
             print(f"Error: File not found: {module_file}")
             sys.exit(1)
     else:
-        json_files = list(INPUT_DIR.glob('*.json'))
+        json_files = sorted(INPUT_DIR.glob('*.json'))
 
     if not json_files:
         print(f"No JSON files found in {INPUT_DIR}")
@@ -237,35 +253,92 @@ def deploy_modules(module_file: Optional[str] = None, dry_run: bool = False):
     if dry_run:
         print("⚠️  DRY RUN MODE - No changes will be written to database\n")
 
-    # Process each file
+    manifest = load_manifest()
+    deployed_files = manifest.setdefault(manifest_key(), {})
+    hashes = {path: file_hash(path) for path in json_files}
+
     deployed_count = 0
+    unchanged_count = 0
     failed_count = 0
 
+    # Imported here so spawned validation workers, which re-import this
+    # script as __mp_main__, never run backend.app's db.create_all()
+    from backend.app import app
+
     with app.app_context():
-        for i, file_path in enumerate(json_files, 1):
-            print(f"\n[{i}/{len(json_files)}] Processing: {file_path.name}")
+        # One query for the deployed state of the whole library; a manifest
+        # entry only counts if the module still carries its content hash
+        deployed = {
+            row.module_id: row.content_hash
+            for row in db.session.query(Module.module_id, Module.content_hash)
+        }
+
+        changed_files = []
+        for path in json_files:
+            entry = deployed_files.get(path.name)
+            if not full and entry and entry['file_hash'] == hashes[path] and \
+                    deployed.get(entry['module_id']) == entry['content_hash']:
+                unchanged_count += 1
+            else:
+                changed_files.append(path)
 
-            # Load JSON
-            module_data = load_module_json(file_path)
-            if not module_data:
-                failed_count += 1
-                continue
+        print(f"{unchanged_count} unchanged since last deploy, {len(changed_files)} to validate")
 
-            # Validate against schema
-            if not validate_module_data(module_data, schema):
+        # Validate changed files (in parallel) before touching the database
+        valid_modules = []
+        for file_path, module_data, error in validate_module_files(changed_files, schema, workers):
+            if error:
+                print(f"  ✗ {file_path.name}: {error}")
                 failed_count += 1
-                continue
-
-            # Deploy to database
-            if deploy_module_to_db(module_data, dry_run=dry_run):
-                deployed_count += 1
             else:
+                valid_modules.append((file_path, module_data))
+
+        if valid_modules:
+            print("\nChecking prerequisite graph...")
+            if not check_prerequisite_graph([data for _, data in valid_modules]):
+                print("Aborting: fix the prerequisite cycle before deploying")
+                sys.exit(1)
+
+        existing = {
+            module.module_id: module
+            for module in Module.query.options(selectinload(Module.sections))
+            .filter(Module.module_id.in_([data['module_id'] for _, data in valid_modules]))
+        }
+
+        # Every changed module in one transaction; a failing module is rolled
+        # back to its savepoint without discarding the others
+        deployed_now = []
+        for i, (file_path, module_data) in enumerate(valid_modules, 1):
+            print(f"\n[{i}/{len(valid_modules)}] Deploying: {file_path.name}")
+            try:
+                with db.session.begin_nested():
+                    module = deploy_module_to_db(module_data, existing.get(module_data['module_id']))
+                deployed_now.append((file_path, module))
+                deployed_count += 1
+            except Exception as e:
+                print(f"  ✗ Error deploying module: {str(e)}")
                 failed_count += 1
 
+        if dry_run:
+            db.session.rollback()
+            print(f"\n✓ Dry run: would deploy {deployed_count} modules")
+        else:
+            db.session.commit()
+            for file_path, module in deployed_now:
+                deployed_files[file_path.name] = {
+                    'file_hash': hashes[file_path],
+                    'module_id': module.module_id,
+                    'content_hash': module.content_hash,
+                    'revision': module.revision,
+                    'deployed_at': datetime.utcnow().isoformat(),
+                }
+            save_manifest(manifest)
+
     # Summary
     print(f"\n{'='*60}")
     print(f"Deployment {'simulation' if dry_run else 'complete'}!")
     print(f"  Deployed: {deployed_count}")
+    print(f"  Unchanged: {unchanged_count}")
     print(f"  Failed: {failed_count}")
     print(f"  Total: {len(json_files)}")
     print(f"{'='*60}")
@@ -287,6 +360,16 @@ def main():
         action='store_true',
         help='Validate files without writing to database'
     )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Ignore the deploy manifest and check every file'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Validation processes (default: CPU count)'
+    )
 
     args = parser.parse_args()
 
@@ -296,7 +379,9 @@ def main():
 
     deploy_modules(
         module_file=args.module_file,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        full=args.full,
+        workers=args.workers
     )
 
 
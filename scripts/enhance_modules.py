@@ -1,41 +1,68 @@
 #!/usr/bin/env python3
-"""Generate enhanced OAtutor-style modules from exports."""
+"""Generate enhanced OAtutor-style modules from exports.
+
+Exports are streamed one file at a time. A module is re-enhanced only when
+its source hash or ENHANCER_VERSION differs from ENHANCE_MANIFEST, and
+changed modules are enhanced in worker processes. The manifest records each
+output's hash for the deploy step.
+
+Usage:
+    python scripts/enhance_modules.py [--force] [--workers N]
+"""
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
 import re
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from textwrap import shorten
+from typing import Dict, Iterator, Tuple
 
 EXPORT_DIR = Path("modules/exports")
 OUTPUT_DIR = Path("modules/enhanced")
+ENHANCE_MANIFEST = Path("data/enhance_manifest.json")
 MAX_READING_CHARS = 1200
 
+# Bump when the generated output changes so every module is re-enhanced
+ENHANCER_VERSION = 1
+
+# Below this many changed modules, enhancing inline beats starting a pool
+PARALLEL_ENHANCE_MIN = 8
+
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
 
 def slugify(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+    return SLUG_PATTERN.sub("-", value.lower()).strip("-")
 
 
 def ensure_output_dir():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def load_modules():
-    modules = []
+def iter_sources() -> Iterator[Tuple[Path, str]]:
+    """Yield (path, sha256) for each export, reading one file at a time"""
     for path in sorted(EXPORT_DIR.glob("*.json")):
-        with path.open(encoding="utf-8") as handle:
-            data = json.load(handle)
-            data["__file"] = path
-            modules.append(data)
-    return modules
+        yield path, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_module(path: Path) -> Dict:
+    with path.open(encoding="utf-8") as handle:
+        data = json.load(handle)
+    data["__file"] = path
+    return data
 
 
 def extract_sentences(text: str) -> list[str]:
     if not text:
         return []
-    sentences = re.split(r"(?<=[.!?])\s+", text.strip())
+    sentences = SENTENCE_BREAK.split(text.strip())
     return [s.strip() for s in sentences if s.strip()]
 
 
@@ -199,13 +226,75 @@ def save_module(module):
     return path
 
 
+def enhance_file(path: Path) -> Dict:
+    """Worker entry point: enhance one export and return its manifest entry"""
+    module = load_module(path)
+    out_path = save_module(enhance_module(module))
+    return {
+        "title": module.get("title"),
+        "output": str(out_path),
+        "output_hash": hashlib.sha256(out_path.read_bytes()).hexdigest(),
+    }
+
+
+def load_enhance_manifest() -> Dict[str, Dict]:
+    """Entries by source file name; empty if missing or from another ENHANCER_VERSION"""
+    try:
+        manifest = json.loads(ENHANCE_MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != ENHANCER_VERSION:
+        return {}
+    return manifest.get("modules", {})
+
+
+def save_enhance_manifest(entries: Dict[str, Dict]):
+    ENHANCE_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ENHANCE_MANIFEST.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({"version": ENHANCER_VERSION, "modules": entries}, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    os.replace(tmp, ENHANCE_MANIFEST)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate enhanced modules from exports")
+    parser.add_argument("--force", action="store_true", help="Re-enhance every module, ignoring the manifest")
+    parser.add_argument("--workers", type=int, help="Enhancement processes (default: CPU count)")
+    args = parser.parse_args()
+
     ensure_output_dir()
-    modules = load_modules()
-    for module in modules:
-        enhanced = enhance_module(module)
-        out_path = save_module(enhanced)
-        print(f"Enhanced {module.get('title')} -> {out_path}")
+    previous = {} if args.force else load_enhance_manifest()
+    entries = {}
+    changed = []
+    for path, source_hash in iter_sources():
+        entry = previous.get(path.name)
+        if entry and entry["source_hash"] == source_hash and Path(entry["output"]).exists():
+            entries[path.name] = entry
+        else:
+            changed.append((path, source_hash))
+
+    paths = [path for path, _ in changed]
+    pool = None
+    if len(paths) < PARALLEL_ENHANCE_MIN or args.workers == 1:
+        results = map(enhance_file, paths)
+    else:
+        pool = ProcessPoolExecutor(max_workers=args.workers)
+        results = pool.map(enhance_file, paths, chunksize=4)
+
+    try:
+        for (path, source_hash), result in zip(changed, results):
+            title = result.pop("title")
+            entries[path.name] = {"source_hash": source_hash, **result}
+            print(f"Enhanced {title} -> {result['output']}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        # Record what finished even if a later module failed
+        save_enhance_manifest(entries)
+
+    print(f"Enhanced {len(changed)} modules, {len(entries) - len(changed)} unchanged.")
 
 
 if __name__ == "__main__":
@@ -7,64 +7,144 @@ This script processes the 1.1GB CADENCE export zip file and:
 3. Identifies useful PDFs for module references
 4. Organizes for import into FRAMES
 
+Nothing is unpacked to a temp directory. The outer and inner (zip-in-zip)
+central directories are read in place, entries are classified from their
+names and sizes alone, and only the selected files are streamed from the
+archive to their destinations, so disk use is roughly the size of the
+useful content.
+
 Usage:
     python scripts/extract_cadence_project.py
+    python scripts/extract_cadence_project.py --zip path/to/export.zip --copy-pdfs
 """
 
+import argparse
 import os
 import sys
 import zipfile
 import shutil
+import time
+from collections import namedtuple
 from pathlib import Path
-import csv
 import json
 
 # Configuration
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 ZIP_FILE = PROJECT_ROOT / "539febca-778f-4de9-97d3-1ece55645f17_ExportBlock-e881308d-93d4-492e-bdac-6d92e7bb342e.zip"
 OUTPUT_DIR = PROJECT_ROOT / "data" / "projects" / "CADENCE"
-TEMP_DIR = PROJECT_ROOT / "temp_cadence_extract"
 
 # Create output directories
 MARKDOWN_DIR = OUTPUT_DIR / "markdown"
 CSV_DIR = OUTPUT_DIR / "databases"
+PDF_DIR = OUTPUT_DIR / "pdfs"
 PDF_LIST_FILE = OUTPUT_DIR / "useful_pdfs.json"
 REPORT_FILE = OUTPUT_DIR / "extraction_report.md"
 
+# Copy buffer for streaming entries out of the archive
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Useful markdown files (training/onboarding)
+MARKDOWN_KEYWORDS = [
+    'guide', 'tutorial', 'recruits', 'onboarding', 'software',
+    'github', 'setup', 'how', 'getting', 'started'
+]
+
+# Useful CSVs (team/collaboration data)
+CSV_KEYWORDS = [
+    'meeting', 'notes', 'tasks', 'tracker', 'daily', 'logs',
+    'calendar', 'progress', 'team'
+]
+
+# Useful PDFs (training materials), minus project-specific documents
+PDF_KEYWORDS = [
+    'guide', 'tutorial', 'unp', 'nasa', 'training', 'course',
+    'presentation', 'systems', 'power', 'communication', 'outlook'
+]
+PDF_SKIP_KEYWORDS = ['pdr', 'budget', 'ieee', 'mission_design_document']
+
+# One file inside the (possibly nested) export, described by metadata only
+ArchiveEntry = namedtuple('ArchiveEntry', ['name', 'stem', 'path', 'size'])
+
+
+def categorize(name):
+    """Category of an archive member from its file extension"""
+    ext = Path(name).suffix.lower()
+    if ext == '.md':
+        return 'markdown'
+    if ext == '.csv':
+        return 'csv'
+    if ext == '.pdf':
+        return 'pdf'
+    if ext in ['.png', '.jpg', '.jpeg']:
+        return 'images'
+    return 'other'
+
+
+def is_useful(category, stem):
+    """Whether an entry is worth extracting, judged from its name"""
+    name_lower = stem.lower()
+    if category == 'markdown':
+        return any(keyword in name_lower for keyword in MARKDOWN_KEYWORDS)
+    if category == 'csv':
+        # Skip "_all.csv" duplicates
+        return any(keyword in name_lower for keyword in CSV_KEYWORDS) and not stem.endswith('_all')
+    if category == 'pdf':
+        return (any(keyword in name_lower for keyword in PDF_KEYWORDS)
+                and not any(skip in name_lower for skip in PDF_SKIP_KEYWORDS))
+    return False
+
+
+def stream_entry(archive, info, dest):
+    """Copy one archive member to dest without touching any other entry"""
+    with archive.open(info) as src, open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+    mtime = time.mktime(info.date_time + (0, 0, -1))
+    os.utime(dest, (mtime, mtime))
+
+
+def scan_archive(archive, prefix, stats, useful, destinations):
+    """
+    Walk one archive's central directory, recursing into nested zips.
+
+    Members are visited in header-offset order, so a nested zip read through
+    a compressed stream is only ever seeked forward after its directory has
+    been loaded. Selected members are streamed to destinations[category]
+    while their archive is open.
+    """
+    for info in sorted(archive.infolist(), key=lambda i: i.header_offset):
+        if info.is_dir():
+            continue
+
+        path = prefix + info.filename
+        if info.filename.lower().endswith('.zip'):
+            print(f"  Reading nested archive: {path} ({info.file_size / (1024**2):.0f} MB)")
+            with archive.open(info) as stream, zipfile.ZipFile(stream) as inner:
+                scan_archive(inner, path + '/', stats, useful, destinations)
+            continue
+
+        name = Path(info.filename).name
+        entry = ArchiveEntry(name, Path(name).stem, path, info.file_size)
+        category = categorize(name)
+        stats[category].append(entry)
+
+        if is_useful(category, entry.stem):
+            useful[category].append(entry)
+            dest_dir = destinations.get(category)
+            if dest_dir is not None:
+                stream_entry(archive, info, dest_dir / name)
+
+
+def extract_useful_files(zip_path, copy_pdfs=False):
+    """Classify every entry of the export and stream the useful ones out"""
+    print("Scanning archive...")
+    print(f"Source: {zip_path}")
 
-def extract_zip():
-    """Extract the nested zip files"""
-    print("Extracting zip file...")
-    print(f"Source: {ZIP_FILE}")
-    print(f"Target: {TEMP_DIR}")
-
-    # Clean temp directory
-    if TEMP_DIR.exists():
-        shutil.rmtree(TEMP_DIR)
-    TEMP_DIR.mkdir(parents=True, exist_ok=True)
-
-    # Extract outer zip
-    with zipfile.ZipFile(ZIP_FILE, 'r') as zip_ref:
-        zip_ref.extractall(TEMP_DIR)
-
-    # Find and extract inner zip
-    inner_zips = list(TEMP_DIR.glob("*.zip"))
-    if inner_zips:
-        print(f"Found inner zip: {inner_zips[0].name}")
-        with zipfile.ZipFile(inner_zips[0], 'r') as zip_ref:
-            zip_ref.extractall(TEMP_DIR / "content")
-        print(f"Extracted to: {TEMP_DIR / 'content'}")
-    else:
-        print("No inner zip found, using outer extraction")
-
-
-def categorize_files():
-    """Categorize extracted files"""
-    print("\nCategorizing files...")
-
-    content_dir = TEMP_DIR / "content"
-    if not content_dir.exists():
-        content_dir = TEMP_DIR
+    MARKDOWN_DIR.mkdir(parents=True, exist_ok=True)
+    CSV_DIR.mkdir(parents=True, exist_ok=True)
+    destinations = {'markdown': MARKDOWN_DIR, 'csv': CSV_DIR}
+    if copy_pdfs:
+        PDF_DIR.mkdir(parents=True, exist_ok=True)
+        destinations['pdf'] = PDF_DIR
 
     stats = {
         'markdown': [],
@@ -73,115 +153,39 @@ def categorize_files():
         'images': [],
         'other': []
     }
+    useful_files = {
+        'markdown': [],
+        'csv': [],
+        'pdf': []
+    }
 
-    for file_path in content_dir.rglob('*'):
-        if file_path.is_file():
-            ext = file_path.suffix.lower()
-            if ext == '.md':
-                stats['markdown'].append(file_path)
-            elif ext == '.csv':
-                stats['csv'].append(file_path)
-            elif ext == '.pdf':
-                stats['pdf'].append(file_path)
-            elif ext in ['.png', '.jpg', '.jpeg']:
-                stats['images'].append(file_path)
-            else:
-                stats['other'].append(file_path)
-
-    print(f"  Markdown files: {len(stats['markdown'])}")
+    with zipfile.ZipFile(zip_path, 'r') as archive:
+        scan_archive(archive, '', stats, useful_files, destinations)
+
+    print(f"\n  Markdown files: {len(stats['markdown'])}")
     print(f"  CSV files: {len(stats['csv'])}")
     print(f"  PDF files: {len(stats['pdf'])}")
     print(f"  Images: {len(stats['images'])}")
     print(f"  Other: {len(stats['other'])}")
 
-    return stats
-
-
-def identify_useful_content(stats):
-    """Identify files useful for modules and research"""
-    print("\nIdentifying useful content...")
-
-    # Useful markdown files (training/onboarding)
-    useful_keywords = [
-        'guide', 'tutorial', 'recruits', 'onboarding', 'software',
-        'github', 'setup', 'how', 'getting', 'started'
-    ]
-
-    useful_md = []
-    for md_file in stats['markdown']:
-        name_lower = md_file.stem.lower()
-        if any(keyword in name_lower for keyword in useful_keywords):
-            useful_md.append(md_file)
-
-    print(f"  Found {len(useful_md)} useful markdown files")
-
-    # Useful CSVs (team/collaboration data)
-    csv_keywords = [
-        'meeting', 'notes', 'tasks', 'tracker', 'daily', 'logs',
-        'calendar', 'progress', 'team'
-    ]
-
-    useful_csv = []
-    for csv_file in stats['csv']:
-        name_lower = csv_file.stem.lower()
-        if any(keyword in name_lower for keyword in csv_keywords):
-            # Skip "_all.csv" duplicates
-            if not csv_file.stem.endswith('_all'):
-                useful_csv.append(csv_file)
-
-    print(f"  Found {len(useful_csv)} useful CSV files")
-
-    # Useful PDFs (training materials)
-    pdf_keywords = [
-        'guide', 'tutorial', 'unp', 'nasa', 'training', 'course',
-        'presentation', 'systems', 'power', 'communication', 'outlook'
-    ]
-
-    useful_pdf = []
-    for pdf_file in stats['pdf']:
-        name_lower = pdf_file.stem.lower()
-        if any(keyword in name_lower for keyword in pdf_keywords):
-            # Skip project-specific documents
-            if not any(skip in name_lower for skip in ['pdr', 'budget', 'ieee', 'mission_design_document']):
-                useful_pdf.append(pdf_file)
-
-    print(f"  Found {len(useful_pdf)} useful PDF files")
-
-    return {
-        'markdown': useful_md,
-        'csv': useful_csv,
-        'pdf': useful_pdf
-    }
-
-
-def copy_useful_files(useful_files):
-    """Copy useful files to organized output directory"""
-    print("\nCopying useful files...")
-
-    # Create output directories
-    MARKDOWN_DIR.mkdir(parents=True, exist_ok=True)
-    CSV_DIR.mkdir(parents=True, exist_ok=True)
+    print(f"\n  Extracted {len(useful_files['markdown'])} useful markdown files")
+    print(f"  Extracted {len(useful_files['csv'])} useful CSV files")
+    if copy_pdfs:
+        print(f"  Extracted {len(useful_files['pdf'])} useful PDF files")
+    else:
+        print(f"  Found {len(useful_files['pdf'])} useful PDF files")
 
-    # Copy markdown files
-    print(f"  Copying {len(useful_files['markdown'])} markdown files...")
-    for md_file in useful_files['markdown']:
-        dest = MARKDOWN_DIR / md_file.name
-        shutil.copy2(md_file, dest)
+    return stats, useful_files
 
-    # Copy CSV files
-    print(f"  Copying {len(useful_files['csv'])} CSV files...")
-    for csv_file in useful_files['csv']:
-        dest = CSV_DIR / csv_file.name
-        shutil.copy2(csv_file, dest)
 
-    # Create PDF reference list (don't copy large files)
-    print(f"  Creating PDF reference list...")
+def write_pdf_list(useful_files):
+    """Save the PDF reference list (paths inside the archive)"""
     pdf_info = []
     for pdf_file in useful_files['pdf']:
         pdf_info.append({
             'name': pdf_file.name,
-            'size_mb': round(pdf_file.stat().st_size / (1024 * 1024), 2),
-            'path_in_archive': str(pdf_file.relative_to(TEMP_DIR))
+            'size_mb': round(pdf_file.size / (1024 * 1024), 2),
+            'path_in_archive': pdf_file.path
         })
 
     with open(PDF_LIST_FILE, 'w') as f:
@@ -194,8 +198,8 @@ def generate_report(stats, useful_files):
     """Generate extraction report"""
     print("\nGenerating extraction report...")
 
-    total_size = sum(f.stat().st_size for f in stats['markdown'] + stats['csv'] + stats['pdf'] + stats['images'])
-    useful_size = sum(f.stat().st_size for f in useful_files['markdown'] + useful_files['csv'])
+    total_size = sum(f.size for f in stats['markdown'] + stats['csv'] + stats['pdf'] + stats['images'])
+    useful_size = sum(f.size for f in useful_files['markdown'] + useful_files['csv'])
 
     report = f"""# CADENCE Project Extraction Report
 
@@ -203,7 +207,7 @@ def generate_report(stats, useful_files):
 
 **Extraction Date:** {os.popen('date').read().strip()}
 **Original Archive:** 1.1 GB
-**Total Files Extracted:** {sum(len(v) for v in stats.values())}
+**Total Files in Archive:** {sum(len(v) for v in stats.values())}
 
 ### File Breakdown
 - Markdown files: {len(stats['markdown'])}
@@ -239,7 +243,7 @@ def generate_report(stats, useful_files):
     report += "\n---\n\n## Useful PDF Files (Reference Materials)\n\nThese PDFs should be uploaded to external storage (S3/Google Drive):\n\n"
 
     for pdf_file in useful_files['pdf']:
-        size_mb = pdf_file.stat().st_size / (1024 * 1024)
+        size_mb = pdf_file.size / (1024 * 1024)
         report += f"- `{pdf_file.name}` ({size_mb:.1f} MB)\n"
 
     report += f"\nSee `{PDF_LIST_FILE}` for full PDF details and archive paths.\n"
@@ -273,11 +277,6 @@ def generate_report(stats, useful_files):
    - Or: Create GitHub release
    - Or: Upload to S3 Glacier Deep Archive
    - **Then delete local 1.1GB file**
-
-5. **Clean up temp directory:**
-   ```bash
-   rm -rf temp_cadence_extract/
-   ```
 """
 
     with open(REPORT_FILE, 'w', encoding='utf-8') as f:
@@ -287,36 +286,40 @@ def generate_report(stats, useful_files):
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Extract useful CADENCE content from the Notion export')
+    parser.add_argument('--zip', type=Path, default=ZIP_FILE, help='Path to the export zip')
+    parser.add_argument('--copy-pdfs', action='store_true',
+                        help=f'Also stream useful PDFs to {PDF_DIR} (default: list them only)')
+    args = parser.parse_args()
+
     print("="*60)
     print("CADENCE Project Data Extraction")
     print("="*60)
 
     # Check if zip file exists
-    if not ZIP_FILE.exists():
-        print(f"Error: Zip file not found at {ZIP_FILE}")
+    if not args.zip.exists():
+        print(f"Error: Zip file not found at {args.zip}")
         sys.exit(1)
 
-    # Step 1: Extract
-    extract_zip()
-
-    # Step 2: Categorize
-    stats = categorize_files()
+    started = time.perf_counter()
 
-    # Step 3: Identify useful content
-    useful_files = identify_useful_content(stats)
+    # Step 1: Classify entries and stream useful files out
+    stats, useful_files = extract_useful_files(args.zip, copy_pdfs=args.copy_pdfs)
 
-    # Step 4: Copy useful files
-    copy_useful_files(useful_files)
+    # Step 2: PDF reference list
+    write_pdf_list(useful_files)
 
-    # Step 5: Generate report
+    # Step 3: Generate report
     generate_report(stats, useful_files)
 
     print("\n" + "="*60)
-    print("Extraction Complete!")
+    print(f"Extraction Complete! ({time.perf_counter() - started:.1f}s)")
     print("="*60)
     print(f"\nUseful content saved to: {OUTPUT_DIR}")
     print(f"  - Markdown: {MARKDOWN_DIR}")
     print(f"  - CSV: {CSV_DIR}")
+    if args.copy_pdfs:
+        print(f"  - PDFs: {PDF_DIR}")
     print(f"  - PDF list: {PDF_LIST_FILE}")
     print(f"\nReport: {REPORT_FILE}")
     print("\nNext steps:")
@@ -325,7 +328,6 @@ def main():
     print("  3. Create modules from markdown files")
     print("  4. Extract team data from CSVs")
     print("  5. Archive original 1.1GB zip file")
-    print("  6. Clean up temp directory")
 
 
 if __name__ == '__main__':
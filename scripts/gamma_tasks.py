@@ -23,10 +23,11 @@ from typing import Dict, List, Optional
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import requests
 from dotenv import load_dotenv
 import re
 
+from notion_sync import NOTION_API_URL, NotionClient, NotionPageCache
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -44,10 +45,13 @@ NEW_HIRE_PAGE_ID = os.getenv("NOTION_NEW_HIRE_PAGE_ID")
 
 EXPORT_DIR = Path("modules/exports")
 DEPLOY_LOG = Path("agent_coordination/deployment_log.json")
-
-NOTION_VERSION = "2022-06-28"
+# Block payloads per page, reused while the page's last_edited_time is unchanged
+NOTION_CACHE_DIR = Path(os.getenv("NOTION_CACHE_DIR", "data/notion_cache"))
+NOTION_BASE_URL = os.getenv("NOTION_API_URL", NOTION_API_URL)
+NOTION_WORKERS = int(os.getenv("NOTION_WORKERS", "3"))
 
 DB_PROPERTIES_CACHE = None
+NOTION_CLIENT = None
 
 
 def require_env(value: Optional[str], name: str):
@@ -56,20 +60,16 @@ def require_env(value: Optional[str], name: str):
     return value
 
 
-def notion_headers():
-    token = require_env(NOTION_TOKEN, "NOTION_API_KEY/NOTION_TOKEN")
-    return {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "Notion-Version": NOTION_VERSION,
-    }
+def notion_client() -> NotionClient:
+    global NOTION_CLIENT
+    if NOTION_CLIENT is None:
+        token = require_env(NOTION_TOKEN, "NOTION_API_KEY/NOTION_TOKEN")
+        NOTION_CLIENT = NotionClient(token, base_url=NOTION_BASE_URL, max_workers=NOTION_WORKERS)
+    return NOTION_CLIENT
 
 
 def notion_request(method: str, path: str, **kwargs):
-    response = requests.request(method, f"https://api.notion.com/v1/{path}", headers=notion_headers(), **kwargs)
-    if not response.ok:
-        raise RuntimeError(f"Notion API error ({response.status_code}): {response.text}")
-    return response.json()
+    return notion_client().request(method, path, **kwargs)
 
 
 def get_db_properties():
@@ -404,29 +404,11 @@ def fetch_published_notions(status_property: str = "Status"):
             "select": {"equals": "Published"},
         }
     }
-    results = []
-    while True:
-        data = notion_request("post", f"databases/{database_id}/query", json=payload)
-        results.extend(data.get("results", []))
-        if not data.get("has_more"):
-            break
-        payload["start_cursor"] = data["next_cursor"]
-    return results
+    return notion_client().query_database(database_id, payload)
 
 
 def collect_blocks(page_id: str) -> List[Dict]:
-    blocks = []
-    cursor = None
-    while True:
-        params = {"page_size": 100}
-        if cursor:
-            params["start_cursor"] = cursor
-        data = notion_request("get", f"blocks/{page_id}/children", params=params)
-        blocks.extend(data.get("results", []))
-        if not data.get("has_more"):
-            break
-        cursor = data["next_cursor"]
-    return blocks
+    return notion_client().block_children(page_id)
 
 
 def notion_rich_text_to_plain(block):
@@ -462,62 +444,101 @@ def convert_blocks_to_sections(blocks: List[Dict]) -> List[Dict]:
     return sections
 
 
-def export_modules_from_notion():
+def page_title(page: Dict) -> str:
+    props = page.get("properties", {})
+    title_prop = props.get("Name") or props.get("Title") or {}
+    return notion_rich_text_to_plain(title_prop.get("title", [])) if isinstance(title_prop, dict) else "Untitled"
+
+
+def module_record_for_page(page: Dict, blocks: List[Dict]) -> Dict:
+    props = page.get("properties", {})
+    title = page_title(page)
+    status_prop = props.get("Status", {})
+    return {
+        "module_id": page.get("id"),
+        "title": title,
+        "slug": slugify(title),
+        "description": notion_rich_text_to_plain(props.get("Description", {}).get("rich_text", [])),
+        "category": props.get("Category", {}).get("select", {}).get("name"),
+        "difficulty": props.get("Difficulty", {}).get("select", {}).get("name"),
+        "estimated_minutes": props.get("Estimated Minutes", {}).get("number"),
+        "target_audience": props.get("Target Audience", {}).get("select", {}).get("name"),
+        "status": status_prop.get("select", {}).get("name") if isinstance(status_prop, dict) else None,
+        "tags": [tag["name"] for tag in props.get("Tags", {}).get("multi_select", [])],
+        "sections": convert_blocks_to_sections(blocks),
+        "notion_page_id": page["id"],
+        "fetched_at": datetime.utcnow().isoformat(),
+    }
+
+
+def mark_page_exported(page: Dict, output_file: Path, title: str) -> None:
+    """Set the GitHub sync properties, skipping a PATCH when they already match."""
+    props = page.get("properties", {})
+    props_update = {}
+    if db_has_property("GitHub Sync") and \
+            (props.get("GitHub Sync", {}).get("select") or {}).get("name") != "Exported":
+        props_update["GitHub Sync"] = {"select": {"name": "Exported"}}
+    file_url = f"modules/exports/{output_file.name}"
+    if db_has_property("GitHub File") and props.get("GitHub File", {}).get("url") != file_url:
+        props_update["GitHub File"] = {"url": file_url}
+    if not props_update:
+        return
+    try:
+        notion_request("patch", f"pages/{page['id']}", json={"properties": props_update})
+    except RuntimeError as exc:
+        print(f"Warning: failed to update Notion page {title}: {exc}")
+
+
+def export_modules_from_notion(full: bool = False):
+    """
+    Export published modules, fetching blocks only for pages edited since the
+    last run. Blocks for changed pages are fetched concurrently; unchanged
+    pages keep their cached blocks and existing export file.
+    """
     EXPORT_DIR.mkdir(parents=True, exist_ok=True)
     pages = fetch_published_notions()
     if not pages:
         print("No Notion modules require export.")
         return
 
-    exported = []
+    cache = NotionPageCache(NOTION_CACHE_DIR)
+    client = notion_client()
+    requests_before = client.request_count
+    changed = []
     for page in pages:
-        props = page.get("properties", {})
-        title_prop = props.get("Name") or props.get("Title") or {}
-        title = notion_rich_text_to_plain(title_prop.get("title", [])) if isinstance(title_prop, dict) else "Untitled"
-        slug = slugify(title)
-        status_prop = props.get("Status", {})
-
-        blocks = collect_blocks(page["id"])
-        sections = convert_blocks_to_sections(blocks)
-
-        module_record = {
-            "module_id": page.get("id"),
-            "title": title,
-            "slug": slug,
-            "description": notion_rich_text_to_plain(props.get("Description", {}).get("rich_text", [])),
-            "category": props.get("Category", {}).get("select", {}).get("name"),
-            "difficulty": props.get("Difficulty", {}).get("select", {}).get("name"),
-            "estimated_minutes": props.get("Estimated Minutes", {}).get("number"),
-            "target_audience": props.get("Target Audience", {}).get("select", {}).get("name"),
-            "status": status_prop.get("select", {}).get("name") if isinstance(status_prop, dict) else None,
-            "tags": [tag["name"] for tag in props.get("Tags", {}).get("multi_select", [])],
-            "sections": sections,
-            "notion_page_id": page["id"],
-            "fetched_at": datetime.utcnow().isoformat(),
-        }
-        output_file = EXPORT_DIR / f"{slug}.json"
+        blocks = None if full else cache.get(page)
+        if blocks is not None and (EXPORT_DIR / f"{slugify(page_title(page))}.json").exists():
+            continue
+        changed.append((page, blocks))
+
+    unchanged = len(pages) - len(changed)
+    if unchanged:
+        print(f"{unchanged} modules unchanged since last export.")
+
+    def export_page(item):
+        page, blocks = item
+        if blocks is None:
+            blocks = collect_blocks(page["id"])
+        module_record = module_record_for_page(page, blocks)
+        title = module_record["title"]
+        output_file = EXPORT_DIR / f"{module_record['slug']}.json"
         with output_file.open("w", encoding="utf-8") as handle:
             json.dump(module_record, handle, indent=2, ensure_ascii=False)
-        exported.append((page["id"], title, output_file))
         print(f"Exported {title} -> {output_file}")
 
-        # Update Notion properties if available
-        props_update = {}
-        if db_has_property("GitHub Sync"):
-            props_update["GitHub Sync"] = {"select": {"name": "Exported"}}
-        if db_has_property("GitHub File"):
-            props_update["GitHub File"] = {"url": f"modules/exports/{output_file.name}"}
-        if props_update:
-            try:
-                notion_request(
-                    "patch",
-                    f"pages/{page['id']}",
-                    json={"properties": props_update},
-                )
-            except RuntimeError as exc:
-                print(f"Warning: failed to update Notion page {title}: {exc}")
+        # Cache under the last_edited_time the blocks were read at. Notion only
+        # keeps minute precision, so the value after our PATCH could hide an
+        # edit made since; the PATCH instead costs one refetch next run, after
+        # which the properties already match and no PATCH is sent.
+        cache.put(page["id"], page.get("last_edited_time"), blocks)
+        mark_page_exported(page, output_file, title)
+        return output_file
 
-    print(f"Exported {len(exported)} modules.")
+    if changed:
+        # Resolve the database schema once before the workers need it
+        get_db_properties()
+    exported = client.map(export_page, changed)
+    print(f"Exported {len(exported)} modules ({client.request_count - requests_before} block/update requests).")
 
 
 # ---------------------------------------------------------------------------
@@ -721,7 +742,8 @@ def main():
     parser_leaderboard = subparsers.add_parser("leaderboard", help="Publish leaderboard page")
     parser_leaderboard.add_argument("--parent-id", help="Parent page for leaderboard table.")
 
-    subparsers.add_parser("export-modules", help="Export published Notion modules to JSON")
+    parser_export = subparsers.add_parser("export-modules", help="Export published Notion modules to JSON")
+    parser_export.add_argument("--full", action="store_true", help="Ignore the page cache and re-fetch every module.")
     subparsers.add_parser("deploy-modules", help="Deploy module JSON files to PostgreSQL")
 
     parser_report = subparsers.add_parser("weekly-report", help="Create weekly lead summary in Notion")
@@ -749,7 +771,7 @@ def main():
                 pct = (row['modules_completed'] / total * 100) if total else 0
                 print(f"{idx}. {row['name']} - {row['modules_completed']} modules ({pct:.1f}%)")
     elif args.command == "export-modules":
-        export_modules_from_notion()
+        export_modules_from_notion(full=args.full)
     elif args.command == "deploy-modules":
         deploy_modules_to_db()
     elif args.command == "weekly-report":
@@ -4,23 +4,40 @@
 This utility reads the large CADENCE Notion export, extracts module markdown
 files listed in ``notion_modules_categorized.csv`` and converts them into the
 JSON structure that the GitHub → Postgres pipeline expects.
+
+The normalized-name index of the archive is cached in ``INDEX_CACHE`` and
+reused while the archive's mtime and size are unchanged. Markdown parsing
+runs in a process pool, and modules whose fingerprint (manifest row plus the
+entry's CRC-32 and size from the zip directory) matches ``INGEST_MANIFEST``
+are skipped without reading the entry.
 """
 
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
+import hashlib
 import json
+import os
 import re
 import uuid
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import zipfile
 
 EXPORT_PATH = Path("temp_cadence_extract/ExportBlock-e881308d-93d4-492e-bdac-6d92e7bb342e-Part-1.zip")
 MANIFEST_CSV = Path("data/projects/CADENCE/notion_modules_categorized.csv")
 OUTPUT_DIR = Path("modules/exports")
+# Kept outside OUTPUT_DIR, which downstream tools glob for *.json modules
+CACHE_DIR = Path("data/projects/CADENCE/.ingest_cache")
+INDEX_CACHE = CACHE_DIR / "md_index.json"
+INGEST_MANIFEST = CACHE_DIR / "ingest_manifest.json"
+
+# Bump when parsing or the record layout changes so every module is rebuilt
+INGEST_VERSION = 1
 
 
 @dataclass
@@ -124,15 +141,41 @@ def parse_markdown_sections(markdown: str) -> List[Dict[str, str]]:
     return sections
 
 
-def locate_markdown_entry(manifest_source: str, md_index: Dict[str, str]) -> Optional[str]:
-    candidates = []
-    slug = slugify(Path(manifest_source).stem)
-    for normalized_name, zip_entry in md_index.items():
-        if normalized_name == slug:
-            return zip_entry
-        if normalized_name.startswith(slug):
-            candidates.append(zip_entry)
-    return candidates[0] if candidates else None
+@dataclass
+class MarkdownIndex:
+    """Normalized export names in sorted order, for exact and prefix lookup.
+
+    ``positions`` keeps each name's order in the archive listing so a prefix
+    match resolves to the same entry a front-to-back scan would find.
+    """
+
+    names: List[str]
+    entries: List[str]
+    positions: List[int]
+
+    @classmethod
+    def from_mapping(cls, md_index: Dict[str, str]) -> "MarkdownIndex":
+        ordered = sorted((name, entry, position) for position, (name, entry) in enumerate(md_index.items()))
+        return cls(
+            names=[name for name, _, _ in ordered],
+            entries=[entry for _, entry, _ in ordered],
+            positions=[position for _, _, position in ordered],
+        )
+
+    def locate(self, manifest_source: str) -> Optional[str]:
+        slug = slugify(Path(manifest_source).stem)
+        start = bisect.bisect_left(self.names, slug)
+        if start < len(self.names) and self.names[start] == slug:
+            return self.entries[start]
+        end = bisect.bisect_right(self.names, slug + "\U0010ffff", lo=start)
+        if start == end:
+            return None
+        first = min(range(start, end), key=self.positions.__getitem__)
+        return self.entries[first]
+
+
+def locate_markdown_entry(manifest_source: str, md_index: MarkdownIndex) -> Optional[str]:
+    return md_index.locate(manifest_source)
 
 
 def build_md_index(zip_path: Path) -> Dict[str, str]:
@@ -147,6 +190,45 @@ def build_md_index(zip_path: Path) -> Dict[str, str]:
         }
 
 
+def load_md_index(zip_path: Path, cache_path: Path = INDEX_CACHE) -> MarkdownIndex:
+    """Cached MarkdownIndex for the archive, rebuilt when its mtime or size changes."""
+    if not zip_path.exists():
+        raise FileNotFoundError(f"Export archive missing: {zip_path}")
+
+    stat = zip_path.stat()
+    key = {"archive": str(zip_path.resolve()), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("key") == key:
+                return MarkdownIndex(**cached["index"])
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    index = MarkdownIndex.from_mapping(build_md_index(zip_path))
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps({"key": key, "index": asdict(index)}), encoding="utf-8")
+    return index
+
+
+def module_fingerprint(meta: ModuleMeta, info: zipfile.ZipInfo) -> str:
+    """Hash of everything a module record is built from, without reading the entry."""
+    payload = json.dumps(
+        [INGEST_VERSION, asdict(meta), info.filename, info.CRC, info.file_size],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_ingest_manifest(path: Path = INGEST_MANIFEST) -> Dict[str, str]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("modules", {})
+    except ValueError:
+        return {}
+
+
 def create_module_record(meta: ModuleMeta, markdown: str, source_entry: str) -> Dict[str, object]:
     module_uuid = str(uuid.uuid5(uuid.NAMESPACE_URL, f"cadence://{meta.title}".lower()))
     slug = slugify(meta.title) or slugify(meta.source_file)
@@ -177,15 +259,31 @@ def create_module_record(meta: ModuleMeta, markdown: str, source_entry: str) ->
     }
 
 
-def ingest_modules(limit: Optional[int] = None, only_titles: Optional[Iterable[str]] = None, overwrite: bool = False):
+def render_module(meta: ModuleMeta, raw: bytes, source_entry: str) -> Tuple[str, str]:
+    """Parse one module in a worker process; returns (slug, JSON text)."""
+    record = create_module_record(meta, raw.decode("utf-8"), source_entry)
+    return record["slug"], json.dumps(record, indent=2, ensure_ascii=False)
+
+
+def ingest_modules(
+    limit: Optional[int] = None,
+    only_titles: Optional[Iterable[str]] = None,
+    overwrite: bool = False,
+    force: bool = False,
+    workers: Optional[int] = None,
+):
     modules = parse_manifest(MANIFEST_CSV)
     selected_titles = {title.lower() for title in only_titles} if only_titles else None
-    md_index = build_md_index(EXPORT_PATH)
+    md_index = load_md_index(EXPORT_PATH)
+    fingerprints = load_ingest_manifest()
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     processed = 0
+    unchanged = 0
     missing_files: List[str] = []
+    jobs: List[Tuple[ModuleMeta, bytes, str]] = []
+    job_fingerprints: List[str] = []
 
     with zipfile.ZipFile(EXPORT_PATH, "r") as archive:
         for meta in modules:
@@ -196,39 +294,73 @@ def ingest_modules(limit: Optional[int] = None, only_titles: Optional[Iterable[s
                 missing_files.append(meta.title)
                 continue
 
-            markdown = archive.read(entry).decode("utf-8")
-            record = create_module_record(meta, markdown, entry)
-            out_path = OUTPUT_DIR / f"{record['slug']}.json"
+            processed += 1
+            slug = slugify(meta.title) or slugify(meta.source_file)
+            out_path = OUTPUT_DIR / f"{slug}.json"
+            info = archive.getinfo(entry)
+            fingerprint = module_fingerprint(meta, info)
 
             if out_path.exists() and not overwrite:
                 print(f"Skipping existing module: {out_path.name}")
+            elif out_path.exists() and not force and fingerprints.get(slug) == fingerprint:
+                unchanged += 1
             else:
-                with out_path.open("w", encoding="utf-8") as handle:
-                    json.dump(record, handle, indent=2, ensure_ascii=False)
-                print(f"Saved {meta.title} -> {out_path}")
-            processed += 1
+                jobs.append((meta, archive.read(info), entry))
+                job_fingerprints.append(fingerprint)
+
             if limit and processed >= limit:
                 break
 
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                rendered = list(pool.map(render_module, *zip(*jobs), chunksize=4))
+        else:
+            rendered = [render_module(*job) for job in jobs]
+
+        for (meta, _, _), (slug, text), fingerprint in zip(jobs, rendered, job_fingerprints):
+            out_path = OUTPUT_DIR / f"{slug}.json"
+            out_path.write_text(text, encoding="utf-8")
+            fingerprints[slug] = fingerprint
+            print(f"Saved {meta.title} -> {out_path}")
+
+        INGEST_MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+        INGEST_MANIFEST.write_text(
+            json.dumps({"version": INGEST_VERSION, "modules": fingerprints}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+
     if missing_files:
         print("\nModules missing markdown exports:")
         for title in missing_files:
             print(f" - {title}")
 
-    print(f"\nProcessed {processed} modules. Output directory: {OUTPUT_DIR}")
+    print(
+        f"\nProcessed {processed} modules ({len(jobs)} written, {unchanged} unchanged). "
+        f"Output directory: {OUTPUT_DIR}"
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Convert CADENCE Notion export markdown into module JSON files.")
     parser.add_argument("--limit", type=int, help="Limit the number of modules to ingest.")
     parser.add_argument("--module", action="append", dest="modules", help="Only process modules with matching titles.")
-    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing JSON files.")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing JSON files whose source changed.")
+    parser.add_argument("--force", action="store_true", help="With --overwrite, rewrite unchanged modules too.")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count).")
     return parser
 
 
 def main():
     args = build_parser().parse_args()
-    ingest_modules(limit=args.limit, only_titles=args.modules, overwrite=args.overwrite)
+    ingest_modules(
+        limit=args.limit,
+        only_titles=args.modules,
+        overwrite=args.overwrite,
+        force=args.force,
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
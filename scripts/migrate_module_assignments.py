@@ -0,0 +1,65 @@
+"""
+Add set-based assignment constraints to module_assignments.
+
+Removes duplicate (module_id, student_id) assignments, keeping the earliest,
+then creates the unique key that bulk assignment upserts against, the
+(due_date, required) index used by the due-date scanner and the
+assignment_notifications table. Safe to re-run.
+
+Usage:
+    python scripts/migrate_module_assignments.py
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import text
+
+# Import after adding to path
+from backend.database import db
+from backend.app import app
+
+MIGRATION_SQL = [
+    """
+    DELETE FROM module_assignments a
+    USING module_assignments b
+    WHERE a.module_id = b.module_id
+      AND a.student_id = b.student_id
+      AND a.id > b.id;
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_module_assignment_student "
+    "ON module_assignments(module_id, student_id);",
+    "CREATE INDEX IF NOT EXISTS ix_module_assignments_due_required "
+    "ON module_assignments(due_date, required);",
+]
+
+
+def main():
+    with app.app_context():
+        result = db.session.execute(text(MIGRATION_SQL[0]))
+        print(f"✓ Removed {result.rowcount} duplicate assignments")
+
+        for statement in MIGRATION_SQL[1:]:
+            db.session.execute(text(statement))
+        db.session.commit()
+        print("✓ module_assignments indexes")
+
+        # Creates assignment_notifications (existing tables are left alone)
+        db.create_all()
+        print("✓ assignment_notifications")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Move module section bodies into the content-addressed store.
+
+Adds the content hash columns to modules and module_sections, creates
+module_content_blobs, and moves existing inline section bodies into it
+(deduplicated by sha256, gzip-compressed when large). Safe to re-run.
+
+Usage:
+    python scripts/migrate_module_content_store.py
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from sqlalchemy import text
+
+# Import after adding to path
+from backend.database import db
+from backend.app import app
+from backend.content_store import migrate_inline_sections
+
+MIGRATION_SQL = [
+    "ALTER TABLE modules ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);",
+    "ALTER TABLE module_sections ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64) "
+    "REFERENCES module_content_blobs(content_hash);",
+    "ALTER TABLE module_sections ADD COLUMN IF NOT EXISTS content_size INTEGER;",
+    "ALTER TABLE module_sections ALTER COLUMN content DROP NOT NULL;",
+    "CREATE INDEX IF NOT EXISTS ix_module_sections_content_hash ON module_sections(content_hash);",
+]
+
+
+def main():
+    with app.app_context():
+        # Creates module_content_blobs (existing tables are left alone)
+        db.create_all()
+        print("✓ module_content_blobs")
+
+        for statement in MIGRATION_SQL:
+            db.session.execute(text(statement))
+        db.session.commit()
+        print("✓ Content hash columns")
+
+        moved = migrate_inline_sections()
+        print(f"✓ Moved {moved} inline section bodies into the content store")
+
+
+if __name__ == '__main__':
+    main()
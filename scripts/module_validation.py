@@ -0,0 +1,68 @@
+"""
+Module JSON schema validation for deploy_modules_to_db.py
+
+Kept free of app and database imports: ProcessPoolExecutor workers import
+this module (under the spawn start method, from scratch), so importing
+backend.app here would run db.create_all() once per worker.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import jsonschema
+
+# Below this many changed files, validation runs inline
+PARALLEL_VALIDATION_MIN = 8
+
+# Schema validator compiled once per process (see compile_validator)
+_validator = None
+
+
+def compile_validator(schema: Dict):
+    """Check the schema once and build a reusable validator for it"""
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+def _init_validator(schema: Dict):
+    global _validator
+    _validator = compile_validator(schema)
+
+
+def validate_module_data(module_data: Dict, validator) -> Optional[str]:
+    """Validate module data with a compiled validator; returns the error message, if any"""
+    error = jsonschema.exceptions.best_match(validator.iter_errors(module_data))
+    return error.message if error else None
+
+
+def load_module_json(file_path: Path) -> Tuple[Optional[Dict], Optional[str]]:
+    """Load a module JSON file; returns (data, error message)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f), None
+    except json.JSONDecodeError as e:
+        return None, f"Invalid JSON: {e}"
+    except Exception as e:
+        return None, f"Error reading file: {e}"
+
+
+def check_module_file(file_path: Path) -> Tuple[Path, Optional[Dict], Optional[str]]:
+    """Load and validate one file with this process's validator"""
+    module_data, error = load_module_json(file_path)
+    if module_data is not None:
+        error = validate_module_data(module_data, _validator)
+        if error:
+            error = f"Validation error: {error}"
+    return file_path, (module_data if not error else None), error
+
+
+def validate_module_files(files: List[Path], schema: Dict, workers: Optional[int] = None):
+    """Validate files, in a process pool when there are enough of them"""
+    if len(files) < PARALLEL_VALIDATION_MIN or workers == 1:
+        _init_validator(schema)
+        return [check_module_file(path) for path in files]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_validator, initargs=(schema,)) as pool:
+        return list(pool.map(check_module_file, files, chunksize=4))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Notion API client and page cache used by the Gamma toolkit.
+
+``NotionClient`` shares one rate limit across a small thread pool, retries
+429/5xx responses with backoff (honouring ``Retry-After``) and paginates
+database queries and block children. ``NotionPageCache`` keeps each page's
+block payload on disk keyed by the page's ``last_edited_time`` so a sync only
+re-fetches pages edited since the previous run.
+
+Point ``base_url`` at a local fake server to exercise the client offline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+# Notion allows an average of three requests per second per integration
+DEFAULT_REQUESTS_PER_SECOND = 3.0
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_MAX_RETRIES = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Token bucket shared by every thread using one client."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class NotionClient:
+    def __init__(
+        self,
+        token: str,
+        base_url: str = NOTION_API_URL,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = 0.5,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION,
+        }
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.limiter = RateLimiter(requests_per_second)
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # One pooled session per worker thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+        return session
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    def request(self, method: str, path: str, **kwargs):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            with self._count_lock:
+                self.request_count += 1
+            try:
+                response = self._session().request(method, url, timeout=60, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"Notion API unreachable: {exc}") from exc
+                time.sleep(self._retry_delay(attempt, None))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            if not response.ok:
+                raise RuntimeError(f"Notion API error ({response.status_code}): {response.text}")
+            return response.json()
+
+    def query_database(self, database_id: str, payload: Optional[Dict] = None) -> List[Dict]:
+        payload = dict(payload or {})
+        results = []
+        while True:
+            data = self.request("post", f"databases/{database_id}/query", json=payload)
+            results.extend(data.get("results", []))
+            if not data.get("has_more"):
+                return results
+            payload["start_cursor"] = data["next_cursor"]
+
+    def block_children(self, block_id: str) -> List[Dict]:
+        blocks = []
+        cursor = None
+        while True:
+            params = {"page_size": 100}
+            if cursor:
+                params["start_cursor"] = cursor
+            data = self.request("get", f"blocks/{block_id}/children", params=params)
+            blocks.extend(data.get("results", []))
+            if not data.get("has_more"):
+                return blocks
+            cursor = data["next_cursor"]
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """Run fn over items on the client's thread pool, preserving order."""
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(fn, items))
+
+
+class NotionPageCache:
+    """Per-page block payloads on disk, valid while last_edited_time matches."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, page_id: str) -> Path:
+        return self.directory / f"{page_id.replace('-', '')}.json"
+
+    def get(self, page: Dict) -> Optional[List[Dict]]:
+        path = self._path(page["id"])
+        if not path.exists():
+            return None
+        try:
+            cached = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+        if cached.get("last_edited_time") != page.get("last_edited_time"):
+            return None
+        return cached.get("blocks")
+
+    def put(self, page_id: str, last_edited_time: Optional[str], blocks: List[Dict]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(page_id)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"page_id": page_id, "last_edited_time": last_edited_time, "blocks": blocks}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
@@ -2,65 +2,122 @@
 """
 Populate structured CADENCE tables from cadence_raw_content
 Transforms raw markdown data into relational schema
+
+Raw rows are streamed once through a server-side cursor and the regex
+extraction runs in worker processes, one batch at a time. Projects,
+meetings and documents are written as each batch completes; people are
+written after the scan, then resolved to ids with a single name lookup for
+the task assignees. Every insert is a multi-row execute_values with
+ON CONFLICT against the unique keys from create_ascent_basecamp_schema.py,
+so re-running the script adds only new records.
 """
 
 import os
 import re
-import json
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from dotenv import load_dotenv
 import psycopg2
+import psycopg2.extras
 from datetime import datetime
 
 load_dotenv()
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Raw rows fetched from the server-side cursor per extraction batch
+STREAM_BATCH_SIZE = 2000
+
+# Rows per multi-row INSERT
+INSERT_PAGE_SIZE = 1000
+
+PROJECT_CATEGORIES = ('documents_program', 'documents_technical')
+DOCUMENT_CATEGORIES = ('documents_technical', 'documents_program', 'documents_workflow')
+
+MENTION_PATTERN = re.compile(r'@([A-Za-z\s]+?)(?:\s|$|,|\.|:)')
+ASSIGNED_PATTERN = re.compile(r'Assigned to:\s*([A-Za-z\s]+?)(?:\n|$|,)', re.IGNORECASE)
+OWNER_PATTERN = re.compile(r'Owner:\s*([A-Za-z\s]+?)(?:\n|$|,)', re.IGNORECASE)
+DUE_DATE_PATTERN = re.compile(r'Due:\s*(\d{4}-\d{2}-\d{2})', re.IGNORECASE)
+ISO_DATE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+# Unique keys the inserts resolve conflicts against
+REQUIRED_INDEXES = (
+    'uq_cadence_people_name', 'uq_cadence_projects_notion', 'uq_cadence_tasks_notion',
+    'uq_cadence_meetings_notion', 'uq_cadence_documents_notion',
+)
+
+INSERT_PEOPLE_SQL = """
+    INSERT INTO cadence_people (name, subsystem, role) VALUES %s
+    ON CONFLICT (name) DO NOTHING
+    RETURNING person_id;
+"""
+
+INSERT_PROJECTS_SQL = """
+    INSERT INTO cadence_projects (name, description, subsystem, status, notion_page_id) VALUES %s
+    ON CONFLICT (notion_page_id) WHERE notion_page_id IS NOT NULL DO NOTHING
+    RETURNING project_id;
+"""
+
+INSERT_TASKS_SQL = """
+    INSERT INTO cadence_tasks (title, description, status, due_date, assignee_id, notion_page_id) VALUES %s
+    ON CONFLICT (notion_page_id) WHERE notion_page_id IS NOT NULL DO NOTHING
+    RETURNING task_id;
+"""
+
+INSERT_MEETINGS_SQL = """
+    INSERT INTO cadence_meetings (name, meeting_date, attendees, notes, notion_page_id) VALUES %s
+    ON CONFLICT (notion_page_id) WHERE notion_page_id IS NOT NULL DO NOTHING
+    RETURNING meeting_id;
+"""
+
+INSERT_DOCUMENTS_SQL = """
+    INSERT INTO cadence_documents (title, url, doc_type, category, subsystem, notion_page_id) VALUES %s
+    ON CONFLICT (notion_page_id) WHERE notion_page_id IS NOT NULL DO NOTHING
+    RETURNING doc_id;
+"""
+
+
 def extract_people_from_content(content):
-    """Extract people mentions from markdown content"""
+    """Extract people mentions from markdown content, in order of appearance by pattern"""
     # Look for @mentions and name patterns
-    people = set()
-    
+    people = {}
+
     if not content:
-        return people
-    
-    # Find @mentions
-    mentions = re.findall(r'@([A-Za-z\s]+?)(?:\s|$|,|\.|:)', content)
-    people.update([m.strip() for m in mentions if len(m.strip()) > 2])
-    
-    # Find "Assigned to:" patterns
-    assigned = re.findall(r'Assigned to:\s*([A-Za-z\s]+?)(?:\n|$|,)', content, re.IGNORECASE)
-    people.update([a.strip() for a in assigned if len(a.strip()) > 2])
-    
-    # Find "Owner:" patterns
-    owners = re.findall(r'Owner:\s*([A-Za-z\s]+?)(?:\n|$|,)', content, re.IGNORECASE)
-    people.update([o.strip() for o in owners if len(o.strip()) > 2])
-    
-    return people
+        return []
+
+    for pattern in (MENTION_PATTERN, ASSIGNED_PATTERN, OWNER_PATTERN):
+        for match in pattern.findall(content):
+            name = match.strip()
+            if len(name) > 2:
+                people.setdefault(name, None)
+
+    return list(people)
 
 def extract_date_from_content(content):
     """Extract dates from content"""
     if not content:
         return None
-    
+
     # Look for "Due:" dates
-    due_match = re.search(r'Due:\s*(\d{4}-\d{2}-\d{2})', content, re.IGNORECASE)
+    due_match = DUE_DATE_PATTERN.search(content)
     if due_match:
         return due_match.group(1)
-    
+
     # Look for ISO dates
-    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', content)
+    date_match = ISO_DATE_PATTERN.search(content)
     if date_match:
         return date_match.group(1)
-    
+
     return None
 
 def extract_status_from_content(content):
     """Extract status information from content"""
     if not content:
         return 'unknown'
-    
+
     # Check for common status indicators
     content_lower = content.lower()
-    
+
     if '✅' in content or 'completed' in content_lower or 'done' in content_lower:
         return 'completed'
     elif '🚧' in content or 'in progress' in content_lower or 'wip' in content_lower:
@@ -69,147 +126,39 @@ def extract_status_from_content(content):
         return 'blocked'
     elif '📝' in content or 'todo' in content_lower or 'to do' in content_lower:
         return 'todo'
-    
+
     return 'active'
 
-def populate_people(cur):
-    """Populate cadence_people table"""
-    print("Populating cadence_people...")
-    
-    # Get all content to extract people mentions
-    cur.execute("""
-        SELECT DISTINCT content, subsystem
-        FROM cadence_raw_content
-        WHERE content IS NOT NULL;
-    """)
-    
-    all_people = {}  # {name: subsystem}
-    
-    for row in cur.fetchall():
-        content, subsystem = row
-        people = extract_people_from_content(content)
-        
-        for person in people:
-            if person not in all_people:
-                all_people[person] = subsystem
-    
-    # Insert unique people
-    inserted = 0
-    for name, subsystem in all_people.items():
-        try:
-            cur.execute("""
-                INSERT INTO cadence_people (name, subsystem, role)
-                VALUES (%s, %s, %s)
-                ON CONFLICT DO NOTHING;
-            """, (name, subsystem, 'team_member'))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Could not insert {name}: {e}")
-    
-    print(f"  ✓ Inserted {inserted} people")
-    return inserted
-
-def populate_projects(cur):
-    """Populate cadence_projects table from documents_program"""
-    print("Populating cadence_projects...")
-    
-    cur.execute("""
-        SELECT id, title, content, subsystem, notion_id
-        FROM cadence_raw_content
-        WHERE category IN ('documents_program', 'documents_technical')
-        AND title IS NOT NULL;
-    """)
-    
-    inserted = 0
-    for row in cur.fetchall():
-        raw_id, title, content, subsystem, notion_id = row
-        
+def extract_row(row):
+    """
+    Derive every structured record one raw row contributes (runs in a worker).
+
+    Returns a dict of people names plus optional project, task, meeting and
+    document tuples; tasks carry the assignee name for later resolution.
+    """
+    raw_id, title, filename, content, category, subsystem, notion_id, date_extracted = row
+    people = extract_people_from_content(content)
+    derived = {'people': people, 'subsystem': subsystem}
+
+    if not title:
+        return derived
+
+    if category in PROJECT_CATEGORIES:
         # Extract description (first paragraph)
-        description = None
-        if content:
-            paragraphs = content.split('\n\n')
-            if len(paragraphs) > 0:
-                description = paragraphs[0][:500]  # First 500 chars
-        
-        status = extract_status_from_content(content)
-        
-        try:
-            cur.execute("""
-                INSERT INTO cadence_projects (name, description, subsystem, status, notion_page_id)
-                VALUES (%s, %s, %s, %s, %s);
-            """, (title, description, subsystem, status, notion_id))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Could not insert project '{title}': {e}")
-    
-    print(f"  ✓ Inserted {inserted} projects")
-    return inserted
-
-def populate_tasks(cur):
-    """Populate cadence_tasks table"""
-    print("Populating cadence_tasks...")
-    
-    cur.execute("""
-        SELECT id, title, content, subsystem, notion_id
-        FROM cadence_raw_content
-        WHERE category = 'tasks'
-        AND title IS NOT NULL;
-    """)
-    
-    inserted = 0
-    for row in cur.fetchall():
-        raw_id, title, content, subsystem, notion_id = row
-        
-        description = content[:1000] if content else None
-        status = extract_status_from_content(content)
-        due_date = extract_date_from_content(content)
-        
-        # Try to find assignee
-        assignee_id = None
-        if content:
-            people = extract_people_from_content(content)
-            if people:
-                # Get first person from database
-                person_name = list(people)[0]
-                cur.execute("SELECT person_id FROM cadence_people WHERE name = %s LIMIT 1;", (person_name,))
-                result = cur.fetchone()
-                if result:
-                    assignee_id = result[0]
-        
-        try:
-            cur.execute("""
-                INSERT INTO cadence_tasks (title, description, status, due_date, assignee_id, notion_page_id)
-                VALUES (%s, %s, %s, %s, %s, %s);
-            """, (title, description, status, due_date, assignee_id, notion_id))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Could not insert task '{title}': {e}")
-    
-    print(f"  ✓ Inserted {inserted} tasks")
-    return inserted
-
-def populate_meetings(cur):
-    """Populate cadence_meetings table"""
-    print("Populating cadence_meetings...")
-    
-    cur.execute("""
-        SELECT id, title, content, subsystem, notion_id, date_extracted
-        FROM cadence_raw_content
-        WHERE category = 'meetings'
-        AND title IS NOT NULL;
-    """)
-    
-    inserted = 0
-    for row in cur.fetchall():
-        raw_id, title, content, subsystem, notion_id, date_extracted = row
-        
-        # Extract attendees
-        attendees = None
-        if content:
-            people = extract_people_from_content(content)
-            if people:
-                attendees = ', '.join(people)
-        
+        description = content.split('\n\n')[0][:500] if content else None
+        derived['project'] = (title, description, subsystem, extract_status_from_content(content), notion_id)
+
+    if category == 'tasks':
+        derived['task'] = (
+            title,
+            content[:1000] if content else None,
+            extract_status_from_content(content),
+            extract_date_from_content(content),
+            people[0] if people else None,
+            notion_id,
+        )
+
+    if category == 'meetings':
         # Use extracted date or find date in content
         meeting_date = date_extracted
         if not meeting_date and content:
@@ -217,93 +166,137 @@ def populate_meetings(cur):
             if date_str:
                 try:
                     meeting_date = datetime.strptime(date_str, '%Y-%m-%d')
-                except:
+                except ValueError:
                     pass
-        
-        try:
-            cur.execute("""
-                INSERT INTO cadence_meetings (name, meeting_date, attendees, notes, notion_page_id)
-                VALUES (%s, %s, %s, %s, %s);
-            """, (title, meeting_date, attendees, content, notion_id))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Could not insert meeting '{title}': {e}")
-    
-    print(f"  ✓ Inserted {inserted} meetings")
-    return inserted
-
-def populate_documents(cur):
-    """Populate cadence_documents table"""
-    print("Populating cadence_documents...")
-    
-    cur.execute("""
-        SELECT id, title, filename, category, subsystem, notion_id
-        FROM cadence_raw_content
-        WHERE category IN ('documents_technical', 'documents_program', 'documents_workflow')
-        AND title IS NOT NULL;
-    """)
-    
-    inserted = 0
-    for row in cur.fetchall():
-        raw_id, title, filename, category, subsystem, notion_id = row
-        
-        # Create URL from notion_id
+        derived['meeting'] = (title, meeting_date, ', '.join(people) if people else None, content, notion_id)
+
+    if category in DOCUMENT_CATEGORIES:
+        # Create URL from notion_id; map category to doc_type
         url = f"https://notion.so/{notion_id}" if notion_id else None
-        
-        # Map category to doc_type
         doc_type = category.replace('documents_', '') if category else 'general'
-        
-        try:
-            cur.execute("""
-                INSERT INTO cadence_documents (title, url, doc_type, category, subsystem, notion_page_id)
-                VALUES (%s, %s, %s, %s, %s, %s);
-            """, (title, url, doc_type, category, subsystem, notion_id))
-            inserted += 1
-        except Exception as e:
-            print(f"  Warning: Could not insert document '{title}': {e}")
-    
-    print(f"  ✓ Inserted {inserted} documents")
-    return inserted
+        derived['document'] = (title, url, doc_type, category, subsystem, notion_id)
+
+    return derived
+
+def insert_rows(cur, sql, rows):
+    """Multi-row insert; returns how many rows were actually inserted"""
+    if not rows:
+        return 0
+    return len(psycopg2.extras.execute_values(cur, sql, rows, page_size=INSERT_PAGE_SIZE, fetch=True))
+
+def check_unique_indexes(cur):
+    """The ON CONFLICT targets must exist; they are created by the schema script"""
+    cur.execute("SELECT indexname FROM pg_indexes WHERE indexname = ANY(%s);", (list(REQUIRED_INDEXES),))
+    missing = set(REQUIRED_INDEXES) - {row[0] for row in cur.fetchall()}
+    if missing:
+        print(f"✗ Missing unique indexes: {', '.join(sorted(missing))}")
+        print("  Run: python scripts/create_ascent_basecamp_schema.py")
+        return False
+    return True
+
+def resolve_people(cur, names):
+    """name -> person_id for the given names in one query"""
+    if not names:
+        return {}
+    cur.execute("SELECT name, person_id FROM cadence_people WHERE name = ANY(%s);", (list(names),))
+    return dict(cur.fetchall())
+
+def populate(conn, workers=None):
+    """Stream raw content once and populate all five tables; returns inserted counts"""
+    counts = {'people': 0, 'projects': 0, 'tasks': 0, 'meetings': 0, 'documents': 0}
+    all_people = {}  # {name: subsystem}
+    tasks = []
+
+    write_cur = conn.cursor()
+    stream = conn.cursor(name='cadence_raw_stream')
+    stream.itersize = STREAM_BATCH_SIZE
+    stream.execute("""
+        SELECT id, title, filename, content, category, subsystem, notion_id, date_extracted
+        FROM cadence_raw_content
+        ORDER BY id;
+    """)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = stream.fetchmany(STREAM_BATCH_SIZE)
+            if not batch:
+                break
+
+            projects, meetings, documents = [], [], []
+            for derived in pool.map(extract_row, batch, chunksize=64):
+                for person in derived['people']:
+                    all_people.setdefault(person, derived['subsystem'])
+                if 'project' in derived:
+                    projects.append(derived['project'])
+                if 'task' in derived:
+                    tasks.append(derived['task'])
+                if 'meeting' in derived:
+                    meetings.append(derived['meeting'])
+                if 'document' in derived:
+                    documents.append(derived['document'])
+
+            counts['projects'] += insert_rows(write_cur, INSERT_PROJECTS_SQL, projects)
+            counts['meetings'] += insert_rows(write_cur, INSERT_MEETINGS_SQL, meetings)
+            counts['documents'] += insert_rows(write_cur, INSERT_DOCUMENTS_SQL, documents)
+            print(f"  … scanned {stream.rownumber} raw records")
+
+    stream.close()
+
+    counts['people'] = insert_rows(
+        write_cur, INSERT_PEOPLE_SQL,
+        [(name, subsystem, 'team_member') for name, subsystem in all_people.items()]
+    )
+
+    # Assignees resolve through one name -> person_id map
+    person_ids = resolve_people(write_cur, {task[4] for task in tasks if task[4]})
+    counts['tasks'] = insert_rows(write_cur, INSERT_TASKS_SQL, [
+        task[:4] + (person_ids.get(task[4]),) + task[5:] for task in tasks
+    ])
+
+    write_cur.close()
+    return counts
 
 def main():
+    parser = argparse.ArgumentParser(description='Populate structured CADENCE tables from cadence_raw_content')
+    parser.add_argument('--workers', type=int, help='Extraction processes (default: CPU count)')
+    args = parser.parse_args()
+
     conn = psycopg2.connect(DATABASE_URL)
     cur = conn.cursor()
-    
+
     print("=" * 80)
     print("POPULATING CADENCE STRUCTURED TABLES")
     print("=" * 80)
     print()
-    
+
     try:
+        if not check_unique_indexes(cur):
+            sys.exit(1)
+
         # Get raw data count
         cur.execute("SELECT COUNT(*) FROM cadence_raw_content;")
         raw_count = cur.fetchone()[0]
         print(f"Source: {raw_count} records in cadence_raw_content")
         print()
-        
-        # Populate tables in order (respecting foreign keys)
-        people_count = populate_people(cur)
-        projects_count = populate_projects(cur)
-        tasks_count = populate_tasks(cur)
-        meetings_count = populate_meetings(cur)
-        documents_count = populate_documents(cur)
-        
+
+        counts = populate(conn, workers=args.workers)
+
         # Commit all changes
         conn.commit()
-        
+
         print()
         print("=" * 80)
-        print("SUMMARY")
+        print("SUMMARY (new records)")
         print("=" * 80)
-        print(f"  • cadence_people:       {people_count:>5} records")
-        print(f"  • cadence_projects:     {projects_count:>5} records")
-        print(f"  • cadence_tasks:        {tasks_count:>5} records")
-        print(f"  • cadence_meetings:     {meetings_count:>5} records")
-        print(f"  • cadence_documents:    {documents_count:>5} records")
+        print(f"  • cadence_people:       {counts['people']:>5} records")
+        print(f"  • cadence_projects:     {counts['projects']:>5} records")
+        print(f"  • cadence_tasks:        {counts['tasks']:>5} records")
+        print(f"  • cadence_meetings:     {counts['meetings']:>5} records")
+        print(f"  • cadence_documents:    {counts['documents']:>5} records")
         print()
         print("✅ CADENCE DATA POPULATION COMPLETE")
         print("=" * 80)
-        
+
     except Exception as e:
         conn.rollback()
         print(f"\n❌ Error: {e}")
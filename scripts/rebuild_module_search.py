@@ -0,0 +1,40 @@
+"""
+Rebuild the full-text module search index.
+
+deploy_modules_to_db.py refreshes a module's search document whenever the
+module changes. Run this to build the index for the first time, or after
+editing modules outside the deploy script. On Postgres the module_search
+table comes from create_ascent_basecamp_schema.py, which must run first.
+
+Usage:
+    python scripts/rebuild_module_search.py
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after adding to path
+from backend.app import app
+from backend.module_search import rebuild_search_index
+
+
+def main():
+    with app.app_context():
+        count = rebuild_search_index()
+        print(f"✓ Indexed {count} modules for search")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Rebuild module_stats summary rows from module_feedback and module_progress.
+
+The LMS routes keep module_stats current incrementally. Run this repair job
+after bulk imports, manual SQL edits, or if the summaries ever drift.
+
+Usage:
+    python scripts/rebuild_module_stats.py
+    python scripts/rebuild_module_stats.py --module-id 12
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after adding to path
+from backend.database import db
+from backend.app import app
+from backend.module_stats import rebuild_module_stats, rebuild_all_module_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Recompute module_stats summary rows from source tables'
+    )
+    parser.add_argument(
+        '--module-id',
+        type=int,
+        help='Rebuild a single module (database id)'
+    )
+
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.module_id:
+            stats = rebuild_module_stats(args.module_id)
+            db.session.commit()
+            print(f"✓ Rebuilt stats for module {args.module_id}: "
+                  f"{stats.student_count} students, {stats.feedback_count} feedback")
+        else:
+            count = rebuild_all_module_stats()
+            print(f"✓ Rebuilt stats for {count} modules")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,44 @@
 #!/usr/bin/env python3
-"""Rebuild modules whose source files are PDFs into JSON exports."""
+"""Rebuild modules whose source files are PDFs into JSON exports.
+
+Each PDF is handled by a worker process that reads pages lazily and stops
+once it has enough paragraphs for the module's sections, so large
+references such as the GMAT guides are never extracted in full. Page text
+is cached on disk by file hash and page number; a rebuild of an unchanged
+PDF reads only the cache and never opens the document.
+
+Usage:
+    python scripts/rebuild_pdf_modules.py [--workers N]
+"""
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
 import json
+import os
 import re
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from PyPDF2 import PdfReader
 
 
 CSV_PATH = Path("data/projects/CADENCE/notion_modules_categorized.csv")
-CONTENT_DIR = Path("temp_cadence_extract/content")
+# PDFs streamed by extract_cadence_project.py --copy-pdfs, then the legacy unzip location
+CONTENT_DIRS = (
+    Path("data/projects/CADENCE/pdfs"),
+    Path("temp_cadence_extract/content"),
+)
 EXPORT_DIR = Path("modules/exports")
+PAGE_CACHE_DIR = Path("data/projects/CADENCE/.pdf_page_cache")
+
+MAX_SECTIONS = 8
+HASH_BUFFER_SIZE = 1024 * 1024
+PARAGRAPH_BREAK = re.compile(r"\n{2,}")
 
 TARGET_TITLES = {
     "Outlook Calendar Tutorial",
@@ -53,22 +75,82 @@ def read_csv_rows() -> Dict[str, Dict]:
         return {row["Title"]: row for row in reader}
 
 
-def extract_pdf_text(pdf_path: Path) -> str:
-    reader = PdfReader(str(pdf_path))
-    chunks = []
-    for page in reader.pages:
-        text = page.extract_text() or ""
-        chunks.append(text)
-    return "\n".join(chunks)
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path: Path, text: str):
+    # Two titles may share one PDF, so temp names are per process
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def iter_page_texts(pdf_path: Path, file_hash: str) -> Iterator[str]:
+    """
+    Yield each page's text in order, from the page cache where possible.
+
+    The PDF is only opened on the first cache miss; a page count recorded on
+    that first open lets fully cached documents skip the reader entirely.
+    """
+    cache_dir = PAGE_CACHE_DIR / file_hash
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = cache_dir / "meta.json"
+    reader = None
+    if meta_path.exists():
+        page_count = json.loads(meta_path.read_text(encoding="utf-8"))["pages"]
+    else:
+        reader = PdfReader(str(pdf_path))
+        page_count = len(reader.pages)
+        write_atomic(meta_path, json.dumps({"source": pdf_path.name, "pages": page_count}))
+
+    for number in range(page_count):
+        page_path = cache_dir / f"{number:05d}.txt"
+        if page_path.exists():
+            yield page_path.read_text(encoding="utf-8")
+            continue
+        if reader is None:
+            reader = PdfReader(str(pdf_path))
+        text = reader.pages[number].extract_text() or ""
+        write_atomic(page_path, text)
+        yield text
+
+
+def iter_paragraphs(texts: Iterable[str]) -> Iterator[str]:
+    """
+    Split a stream of page texts (joined by newlines) into paragraphs.
 
+    Only the trailing, possibly unfinished paragraph is buffered, so a
+    paragraph that runs across a page break is still yielded whole. A page
+    ending in a bare CR is held back so a CRLF spanning the join normalises
+    exactly as it would in the concatenated text.
+    """
+    buffer = ""
+    carry_cr = False
+    for index, text in enumerate(texts):
+        raw = ("\r" if carry_cr else "") + ("\n" if index else "") + text
+        carry_cr = raw.endswith("\r")
+        if carry_cr:
+            raw = raw[:-1]
+        parts = PARAGRAPH_BREAK.split(buffer + raw.replace("\r\n", "\n"))
+        buffer = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+    buffer += "\r" if carry_cr else ""
+    if buffer.strip():
+        yield buffer.strip()
 
-def chunk_text(text: str, max_sections: int = 8) -> List[Dict[str, str]]:
-    clean = re.sub(r"\r\n", "\n", text)
-    clean = re.sub(r"\n{3,}", "\n\n", clean)
-    paragraphs = [p.strip() for p in clean.split("\n\n") if p.strip()]
 
+def sections_from_paragraphs(paragraphs: Iterable[str], max_sections: int = MAX_SECTIONS) -> List[Dict[str, str]]:
     sections = []
-    for idx, paragraph in enumerate(paragraphs[:max_sections]):
+    for idx, paragraph in enumerate(paragraphs):
+        if idx >= max_sections:
+            break
         lines = [ln.strip() for ln in paragraph.splitlines() if ln.strip()]
         heading = lines[0][:80] if lines else f"Section {idx + 1}"
         sections.append(
@@ -89,11 +171,29 @@ def chunk_text(text: str, max_sections: int = 8) -> List[Dict[str, str]]:
     return sections
 
 
-def build_module_record(row: Dict, text: str) -> Dict:
+def pdf_sections(pdf_path: Path) -> List[Dict[str, str]]:
+    """Worker entry point: sections for one PDF, reading only the pages they need"""
+    pages = iter_page_texts(pdf_path, file_sha256(pdf_path))
+    return sections_from_paragraphs(iter_paragraphs(pages))
+
+
+def find_pdf(source_file: str) -> Optional[Path]:
+    for content_dir in CONTENT_DIRS:
+        pdf_path = content_dir / source_file
+        if pdf_path.exists():
+            return pdf_path
+    stem = Path(source_file).stem
+    for content_dir in CONTENT_DIRS:
+        candidates = sorted(content_dir.glob(f"{stem}*.pdf"))
+        if candidates:
+            return candidates[0]
+    return None
+
+
+def build_module_record(row: Dict, sections: List[Dict[str, str]]) -> Dict:
     title = row["Title"]
     slug = slugify(row["Title"])
     module_uuid = str(uuid.uuid5(uuid.NAMESPACE_URL, f"cadence://{title}".lower()))
-    sections = chunk_text(text)
 
     tags = [tag.strip() for tag in (row.get("Tags") or "").split(";") if tag.strip()]
     prereqs = [req.strip() for req in (row.get("Prerequisites") or "").split(";") if req.strip()]
@@ -123,10 +223,15 @@ def build_module_record(row: Dict, text: str) -> Dict:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Rebuild PDF-sourced modules into JSON exports")
+    parser.add_argument("--workers", type=int, help="PDF worker processes (default: CPU count)")
+    args = parser.parse_args()
+
     rows = read_csv_rows()
     EXPORT_DIR.mkdir(parents=True, exist_ok=True)
 
-    for title in TARGET_TITLES:
+    jobs = []
+    for title in sorted(TARGET_TITLES):
         row = rows.get(title)
         if not row:
             print(f"[WARN] {title}: not found in CSV")
@@ -137,25 +242,29 @@ def main():
             print(f"[WARN] {title}: no Source File listed")
             continue
 
-        pdf_path = CONTENT_DIR / source_file
-        if not pdf_path.exists():
-            stem = Path(source_file).stem
-            candidates = list(CONTENT_DIR.glob(f"{stem}*.pdf"))
-            if candidates:
-                pdf_path = candidates[0]
-            else:
-                print(f"[WARN] {title}: source file missing ({pdf_path})")
-                continue
+        pdf_path = find_pdf(source_file)
+        if pdf_path is None:
+            print(f"[WARN] {title}: source file missing ({source_file})")
+            continue
+        jobs.append((row, pdf_path))
 
-        print(f"Rebuilding {title} from {source_file} ...", end=" ")
-        text = extract_pdf_text(pdf_path)
-        record = build_module_record(row, text)
+    if not jobs:
+        return
 
-        out_path = EXPORT_DIR / f"{record['slug']}.json"
-        with out_path.open("w", encoding="utf-8") as handle:
-            json.dump(record, handle, indent=2, ensure_ascii=False)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [(row, pool.submit(pdf_sections, pdf_path)) for row, pdf_path in jobs]
+        for row, future in futures:
+            try:
+                sections = future.result()
+            except Exception as exc:
+                print(f"[WARN] {row['Title']}: failed to read {row['Source File']} ({exc})")
+                continue
 
-        print("OK")
+            record = build_module_record(row, sections)
+            out_path = EXPORT_DIR / f"{record['slug']}.json"
+            with out_path.open("w", encoding="utf-8") as handle:
+                json.dump(record, handle, indent=2, ensure_ascii=False)
+            print(f"Rebuilt {row['Title']} from {row['Source File']}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""
+Precompute ghost race benchmarks from learner_performance.
+
+Writes per-module percentile curves of completion time and mastery score
+into ghost_benchmarks. Modules whose curves are unchanged keep their
+version, so client ETags stay valid. Run after imports or on a schedule.
+
+Usage:
+    python scripts/refresh_ghost_benchmarks.py
+    python scripts/refresh_ghost_benchmarks.py --module-id 12
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+import psycopg2
+import psycopg2.extras
+
+# Import after adding to path
+from backend.ghost_replay import refresh_ghost_benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Recompute ghost race percentile curves'
+    )
+    parser.add_argument(
+        '--module-id',
+        type=int,
+        help='Refresh a single module (database id)'
+    )
+
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.getenv('DATABASE_URL'))
+    try:
+        with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
+            count = refresh_ghost_benchmarks(cur, args.module_id)
+        conn.commit()
+        print(f"✓ Refreshed ghost benchmarks for {count} modules")
+    except Exception as e:
+        conn.rollback()
+        print(f"✗ Failed to refresh ghost benchmarks: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
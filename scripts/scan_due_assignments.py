@@ -0,0 +1,63 @@
+"""
+Write due-soon and overdue reminders for required module assignments.
+
+Scans only assignments whose due date falls inside the reporting window
+(ix_module_assignments_due_required), skips completed modules, and inserts
+one assignment_notifications row per assignment and kind. Meant to run from
+cron; re-running never duplicates a reminder.
+
+Usage:
+    python scripts/scan_due_assignments.py
+    python scripts/scan_due_assignments.py --window-hours 24 --lookback-days 7
+
+Environment variables required:
+    DATABASE_URL - PostgreSQL connection string (Neon)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Import after adding to path
+from backend.app import app
+from backend.due_date_scanner import (
+    DUE_SOON_HOURS, OVERDUE_LOOKBACK_DAYS, SCAN_BATCH_SIZE, scan_due_assignments
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write due-date reminders for module assignments')
+    parser.add_argument('--window-hours', type=int, default=DUE_SOON_HOURS,
+                        help=f'Hours ahead that count as due soon (default: {DUE_SOON_HOURS})')
+    parser.add_argument('--lookback-days', type=int, default=OVERDUE_LOOKBACK_DAYS,
+                        help=f'Days back to report overdue assignments (default: {OVERDUE_LOOKBACK_DAYS})')
+    parser.add_argument('--batch-size', type=int, default=SCAN_BATCH_SIZE,
+                        help=f'Assignments per insert batch (default: {SCAN_BATCH_SIZE})')
+    args = parser.parse_args()
+
+    with app.app_context():
+        try:
+            counts = scan_due_assignments(
+                window_hours=args.window_hours,
+                lookback_days=args.lookback_days,
+                batch_size=args.batch_size
+            )
+        except Exception as e:
+            print(f"✗ Scan failed: {e}")
+            sys.exit(1)
+
+    print(f"✓ Scanned {counts['scanned']} due assignments, "
+          f"wrote {counts['notified']} new notifications")
+
+
+if __name__ == '__main__':
+    main()
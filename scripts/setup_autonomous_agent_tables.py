@@ -23,6 +23,12 @@ def setup_tables():
     cur.execute('ALTER TABLE ascent_basecamp_agent_log ADD COLUMN IF NOT EXISTS next_check_in TIMESTAMP;')
     cur.execute('CREATE INDEX IF NOT EXISTS idx_agent_log_resource ON ascent_basecamp_agent_log(resource_claim);')
     cur.execute('CREATE INDEX IF NOT EXISTS idx_agent_log_session ON ascent_basecamp_agent_log(session_id);')
+    # Help requests are looked up by target agent on every check-in
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_agent_log_help_target
+        ON ascent_basecamp_agent_log ((metadata->>'help_needed_from'), timestamp)
+        WHERE action_type = 'help';
+    """)
     print('   [OK] Agent log table updated\n')
 
     # 2. Create technical_decisions table
@@ -64,6 +70,21 @@ def setup_tables():
     cur.execute('CREATE INDEX IF NOT EXISTS idx_errors_severity ON error_log(severity);')
     print('   [OK] Error log table created\n')
 
+    # 4. Create resource_leases table
+    print('4. Creating resource_leases table...')
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resource_leases (
+            resource VARCHAR(255) PRIMARY KEY,
+            agent_name VARCHAR(100) NOT NULL,
+            acquired_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            heartbeat_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            expires_at TIMESTAMP NOT NULL,
+            metadata JSONB
+        );
+    """)
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_resource_leases_expires ON resource_leases(expires_at);')
+    print('   [OK] Resource leases table created\n')
+
     conn.commit()
     conn.close()
 
@@ -71,6 +92,7 @@ def setup_tables():
     print('New tables:')
     print('  - technical_decisions (for Liz to review agent decisions)')
     print('  - error_log (for Liz to monitor agent errors)')
+    print('  - resource_leases (one row per claimed resource, with expiry)')
     print('\nUpdated tables:')
     print('  - ascent_basecamp_agent_log (added resource_claim, session_id, check_in fields)')
 
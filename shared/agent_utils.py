@@ -3,13 +3,25 @@ Agent Utility Library for Autonomous Multi-Agent Coordination
 
 Used by three independent Claude Code sessions (Alpha, Beta, Gamma)
 to coordinate work through shared database and files.
+
+All database access goes through one AgentClient per process: a small
+connection pool, plain parameterised coordination queries, and a background
+writer that batches fire-and-forget log rows (startup, progress, completion,
+errors, decisions) into multi-row inserts.
+Resource ownership lives in the resource_leases table rather than the log.
+The module-level functions are thin wrappers around the shared client.
 """
 
 import os
 import json
 import uuid
+import atexit
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import traceback
@@ -17,12 +29,333 @@ import traceback
 load_dotenv()
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Seconds queued log rows may wait before the background writer flushes them
+LOG_FLUSH_INTERVAL = float(os.getenv('AGENT_LOG_FLUSH_SECONDS', '2'))
+
+# Rows per multi-row INSERT when flushing
+LOG_BATCH_SIZE = 200
+
+# Minutes a resource lease survives without a check-in heartbeat
+LEASE_TTL_MINUTES = int(os.getenv('AGENT_LEASE_TTL_MINUTES', '30'))
+
+# Seconds log_error/log_decision wait for their row id before giving up
+LOG_RESULT_TIMEOUT = float(os.getenv('AGENT_LOG_RESULT_SECONDS', '30'))
+
+# Coordination queries. Run as plain parameterised statements: behind Neon's
+# -pooler endpoint (PgBouncer in transaction mode) consecutive transactions
+# may land on different server sessions, so session-level PREPARE is unsafe
+STATEMENTS = {
+    'agent_capability': """
+        SELECT capability_level, supervision_level, needs_review
+        FROM agent_capabilities
+        WHERE agent_name = %s
+    """,
+    'active_leases': """
+        SELECT agent_name, resource AS resource_claim, 'working' AS status,
+               acquired_at AS timestamp, heartbeat_at, expires_at
+        FROM resource_leases
+        WHERE expires_at > NOW()
+          AND agent_name != %s
+        ORDER BY acquired_at DESC
+    """,
+    'help_requests': """
+        SELECT log_id, agent_name, message, metadata, timestamp
+        FROM ascent_basecamp_agent_log
+        WHERE action_type = 'help'
+          AND status IN ('blocked', 'waiting')
+          AND metadata->>'help_needed_from' = %s
+          AND timestamp > NOW() - INTERVAL '24 hours'
+        ORDER BY timestamp DESC
+    """,
+    # Takes the lease if it is free, expired or already ours; no row back means someone else holds it
+    'acquire_lease': """
+        INSERT INTO resource_leases (resource, agent_name, acquired_at, heartbeat_at, expires_at, metadata)
+        VALUES (%s, %s, NOW(), NOW(), NOW() + make_interval(mins => %s), %s)
+        ON CONFLICT (resource) DO UPDATE
+        SET agent_name = EXCLUDED.agent_name,
+            acquired_at = CASE WHEN resource_leases.agent_name = EXCLUDED.agent_name
+                               AND resource_leases.expires_at > NOW()
+                               THEN resource_leases.acquired_at ELSE NOW() END,
+            heartbeat_at = NOW(),
+            expires_at = EXCLUDED.expires_at,
+            metadata = EXCLUDED.metadata
+        WHERE resource_leases.expires_at <= NOW()
+           OR resource_leases.agent_name = EXCLUDED.agent_name
+        RETURNING resource
+    """,
+    'lease_holder': """
+        SELECT agent_name, expires_at FROM resource_leases
+        WHERE resource = %s AND expires_at > NOW()
+    """,
+    # Renews our unexpired lease and counts recent help requests for us;
+    # renewed is 0 when the lease expired or another agent holds it, and
+    # leased says whether any lease row exists for the resource at all
+    'heartbeat': """
+        WITH renewed AS (
+            UPDATE resource_leases
+            SET heartbeat_at = NOW(),
+                expires_at = GREATEST(expires_at, NOW() + make_interval(mins => %s))
+            WHERE resource = %s AND agent_name = %s AND expires_at > NOW()
+            RETURNING resource
+        )
+        SELECT (SELECT COUNT(*) FROM renewed) AS renewed,
+               EXISTS (SELECT 1 FROM resource_leases WHERE resource = %s) AS leased,
+               COUNT(*) AS help_count
+        FROM ascent_basecamp_agent_log
+        WHERE action_type = 'help'
+          AND status IN ('blocked', 'waiting')
+          AND metadata->>'help_needed_from' = %s
+          AND timestamp > NOW() - INTERVAL '1 hour'
+    """,
+    'release_lease': """
+        DELETE FROM resource_leases
+        WHERE resource = %s AND agent_name = %s
+    """,
+    'insert_help': """
+        INSERT INTO ascent_basecamp_agent_log (
+            agent_name, action_type, status, message, metadata
+        ) VALUES (%s, 'help', 'blocked', %s, %s)
+        RETURNING log_id
+    """,
+    'insert_resolution': """
+        INSERT INTO ascent_basecamp_agent_log (
+            agent_name, action_type, status, message, metadata
+        ) VALUES (%s, 'complete', 'done', %s, %s)
+    """,
+    'resolve_help': """
+        UPDATE ascent_basecamp_agent_log
+        SET status = 'resolved',
+            resolution = %s
+        WHERE log_id = %s
+    """,
+}
+
+# Batched log targets: multi-row INSERT and column order of the queued rows
+LOG_INSERTS = {
+    'agent_log': """
+        INSERT INTO ascent_basecamp_agent_log (
+            agent_name, action_type, resource_claim, status, session_id,
+            message, metadata, check_in_time, next_check_in
+        ) VALUES %s
+        RETURNING log_id
+    """,
+    'error_log': """
+        INSERT INTO error_log (
+            agent_name, error_type, error_message,
+            stack_trace, severity, resolution_status, metadata
+        ) VALUES %s
+        RETURNING error_id
+    """,
+    'technical_decisions': """
+        INSERT INTO technical_decisions (
+            agent_name, decision_type, decision,
+            rationale, alternatives_considered, impact, status, metadata
+        ) VALUES %s
+        RETURNING decision_id
+    """,
+}
+
+_RECONNECT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
 
 def get_db_connection():
     """Get database connection"""
     return psycopg2.connect(DATABASE_URL)
 
 
+class AgentClient:
+    """
+    Pooled coordination client shared by everything in one agent process.
+
+    Reads and writes whose result the caller needs run synchronously on a
+    pooled connection. Log rows are queued and
+    written by a background thread in batches; each queued write returns a
+    Future that resolves to the new row id once flushed.
+    """
+
+    def __init__(self, dsn=None, flush_interval=LOG_FLUSH_INTERVAL, max_connections=2):
+        self.dsn = dsn or DATABASE_URL
+        self.flush_interval = flush_interval
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='agent-log-writer', daemon=True)
+        self._writer.start()
+
+    # -- connections -------------------------------------------------------
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Keepalives stop idle pooled connections being dropped between check-ins
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    1, self.max_connections, self.dsn,
+                    keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+                )
+            return self._pool
+
+    def _run(self, work):
+        """Run work(conn) in one transaction, reconnecting once if the connection was lost"""
+        for attempt in range(2):
+            pool = self._get_pool()
+            conn = pool.getconn()
+            try:
+                result = work(conn)
+                conn.commit()
+            except _RECONNECT_ERRORS:
+                pool.putconn(conn, close=True)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                conn.rollback()
+                pool.putconn(conn)
+                raise
+            pool.putconn(conn)
+            return result
+
+    def query(self, name, params=(), fetch='all'):
+        """Run one statement from STATEMENTS in its own transaction; fetch is 'all', 'one' or None"""
+        def work(conn):
+            cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+            cur.execute(STATEMENTS[name], params)
+            if fetch == 'one':
+                return cur.fetchone()
+            if fetch == 'all':
+                return cur.fetchall()
+            return None
+        return self._run(work)
+
+    def transaction(self, steps, fetch=None):
+        """Run several (name, params) statements in one transaction, fetching from the last"""
+        def work(conn):
+            cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+            for name, params in steps:
+                cur.execute(STATEMENTS[name], params)
+            if fetch == 'one':
+                return cur.fetchone()
+            if fetch == 'all':
+                return cur.fetchall()
+            return None
+        return self._run(work)
+
+    # -- batched log writes --------------------------------------------------
+
+    def enqueue(self, table, row, urgent=False):
+        """Queue one row for LOG_INSERTS[table]; urgent rows trigger an immediate flush"""
+        if self._closed:
+            raise RuntimeError('AgentClient is closed')
+        future = Future()
+        self._queue.put((table, row, future))
+        if urgent or self._queue.qsize() >= LOG_BATCH_SIZE:
+            self._wake.set()
+        return future
+
+    def log_agent_action(self, agent_name, action_type, status, message, resource=None,
+                         session_id=None, metadata=None, next_check_in_minutes=None, urgent=False):
+        now = datetime.now()
+        next_check_in = now + timedelta(minutes=next_check_in_minutes) if next_check_in_minutes else None
+        return self.enqueue('agent_log', (
+            agent_name, action_type, resource, status, session_id, message,
+            json.dumps(metadata) if metadata is not None else None,
+            now, next_check_in,
+        ), urgent=urgent)
+
+    def log_error(self, agent_name, error_type, error_message, severity='medium',
+                  stack_trace=None, metadata=None, urgent=False):
+        return self.enqueue('error_log', (
+            agent_name, error_type, error_message, stack_trace, severity, 'unresolved',
+            json.dumps(metadata) if metadata else None,
+        ), urgent=urgent)
+
+    def log_decision(self, agent_name, decision_type, decision, rationale, impact='medium',
+                     alternatives=None, metadata=None, urgent=False):
+        return self.enqueue('technical_decisions', (
+            agent_name, decision_type, decision, rationale, alternatives, impact, 'proposed',
+            json.dumps(metadata) if metadata else None,
+        ), urgent=urgent)
+
+    def flush(self):
+        """Write every queued row now, one multi-row INSERT per table per batch"""
+        with self._flush_lock:
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not pending:
+                return 0
+
+            by_table = {}
+            for table, row, future in pending:
+                by_table.setdefault(table, []).append((row, future))
+
+            def work(conn):
+                cur = conn.cursor()
+                ids = {}
+                for table, items in by_table.items():
+                    returned = psycopg2.extras.execute_values(
+                        cur, LOG_INSERTS[table], [row for row, _ in items],
+                        page_size=LOG_BATCH_SIZE, fetch=True,
+                    )
+                    ids[table] = [row[0] for row in returned]
+                return ids
+
+            try:
+                ids = self._run(work)
+            except Exception as e:
+                print(f"[WARN] Failed to write {len(pending)} agent log records: {e}")
+                for _, _, future in pending:
+                    future.set_exception(e)
+                return 0
+
+            for table, items in by_table.items():
+                for (_, future), row_id in zip(items, ids[table]):
+                    future.set_result(row_id)
+            return len(pending)
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._queue.empty():
+                self.flush()
+            if self._closed and self._queue.empty():
+                return
+
+    def close(self):
+        """Flush outstanding log rows and release pooled connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide AgentClient, flushed and closed at interpreter exit"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = AgentClient()
+            atexit.register(_client.close)
+        return _client
+
+
 def startup_protocol(agent_name):
     """
     Execute startup protocol for an agent.
@@ -47,17 +380,10 @@ def startup_protocol(agent_name):
     # Step 1: Generate session ID and announce presence
     session_id = f"{agent_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
 
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    client = get_client()
 
     # Check agent capabilities
-    cur.execute("""
-        SELECT capability_level, supervision_level, needs_review
-        FROM agent_capabilities
-        WHERE agent_name = %s;
-    """, (agent_name,))
-
-    capability = cur.fetchone()
+    capability = client.query('agent_capability', (agent_name,), fetch='one')
     if capability:
         capability_level = capability['capability_level']
         supervision_level = capability['supervision_level']
@@ -72,21 +398,10 @@ def startup_protocol(agent_name):
         supervision_level = 'normal'
         needs_review = False
 
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, status, session_id,
-            check_in_time, next_check_in, message
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """, (
-        agent_name,
-        'startup',
-        'ready',
-        session_id,
-        datetime.now(),
-        datetime.now() + timedelta(minutes=10),
-        f'{agent_name} online - session {session_id}'
-    ))
-    conn.commit()
+    client.log_agent_action(
+        agent_name, 'startup', 'ready', f'{agent_name} online - session {session_id}',
+        session_id=session_id, next_check_in_minutes=10,
+    )
 
     print(f"[OK] Session ID: {session_id}")
 
@@ -108,34 +423,14 @@ def startup_protocol(agent_name):
 
     # Step 3: Check active resource claims by other agents
     print("\n[Step 3] Checking active resource claims...")
-    cur.execute("""
-        SELECT agent_name, resource_claim, status, timestamp
-        FROM ascent_basecamp_agent_log
-        WHERE action_type = 'claim'
-          AND status = 'working'
-          AND agent_name != %s
-          AND timestamp > NOW() - INTERVAL '2 hours'
-        ORDER BY timestamp DESC;
-    """, (agent_name,))
-
-    active_claims = cur.fetchall()
+    active_claims = client.query('active_leases', (agent_name,))
     print(f"   Found {len(active_claims)} active claims by other agents")
     for claim in active_claims:
         print(f"   - {claim['agent_name']} working on {claim['resource_claim']}")
 
     # Step 4: Check for help requests directed at me
     print("\n[Step 4] Checking for help requests...")
-    cur.execute("""
-        SELECT log_id, agent_name, message, metadata, timestamp
-        FROM ascent_basecamp_agent_log
-        WHERE action_type = 'help'
-          AND status IN ('blocked', 'waiting')
-          AND metadata->>'help_needed_from' = %s
-          AND timestamp > NOW() - INTERVAL '24 hours'
-        ORDER BY timestamp DESC;
-    """, (agent_name,))
-
-    help_requests = cur.fetchall()
+    help_requests = client.query('help_requests', (agent_name,))
     if help_requests:
         print(f"   [ALERT] {len(help_requests)} help requests waiting for me!")
         for req in help_requests:
@@ -164,8 +459,6 @@ def startup_protocol(agent_name):
     except FileNotFoundError:
         print(f"   [WARN] Queue file not found: {queue_file}")
 
-    conn.close()
-
     # Return context
     context = {
         'session_id': session_id,
@@ -191,6 +484,10 @@ def claim_resource(agent_name, resource, estimated_minutes=30):
     """
     Claim a resource before working on it.
 
+    Takes a lease in resource_leases that lasts at least LEASE_TTL_MINUTES
+    (or estimated_minutes, if longer) and is renewed by check_in. A lease
+    held by another agent blocks the claim until it is released or expires.
+
     Args:
         agent_name: Name of agent claiming resource
         resource: Resource identifier (file path, table name, etc.)
@@ -199,58 +496,34 @@ def claim_resource(agent_name, resource, estimated_minutes=30):
     Returns:
         bool: True if claim successful, False if conflict
     """
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-
-    # Check if already claimed
-    cur.execute("""
-        SELECT agent_name FROM ascent_basecamp_agent_log
-        WHERE resource_claim = %s
-          AND status = 'working'
-          AND action_type = 'claim'
-          AND timestamp > NOW() - INTERVAL '2 hours'
-        ORDER BY timestamp DESC LIMIT 1;
-    """, (resource,))
-
-    existing_claim = cur.fetchone()
-
-    if existing_claim and existing_claim['agent_name'] != agent_name:
+    client = get_client()
+
+    # One atomic statement: succeeds if the lease is free, expired or already ours
+    acquired = client.query('acquire_lease', (
+        resource,
+        agent_name,
+        max(int(estimated_minutes), LEASE_TTL_MINUTES),
+        json.dumps({'estimated_minutes': estimated_minutes}),
+    ), fetch='one')
+
+    if not acquired:
         # Resource already claimed by another agent
-        print(f"[CONFLICT] {resource} already claimed by {existing_claim['agent_name']}")
+        holder = client.query('lease_holder', (resource,), fetch='one')
+        holder_name = holder['agent_name'] if holder else 'another agent'
+        print(f"[CONFLICT] {resource} already claimed by {holder_name}")
 
         # Log conflict
-        cur.execute("""
-            INSERT INTO error_log (
-                agent_name, error_type, error_message, severity
-            ) VALUES (%s, %s, %s, %s)
-        """, (
-            agent_name,
-            'conflict',
-            f'Attempted to claim {resource} but already claimed by {existing_claim["agent_name"]}',
-            'medium'
-        ))
-        conn.commit()
-        conn.close()
+        client.log_error(
+            agent_name, 'conflict',
+            f'Attempted to claim {resource} but already claimed by {holder_name}',
+        )
         return False
 
-    # Claim it
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, resource_claim, status,
-            message, metadata, check_in_time, next_check_in
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """, (
-        agent_name,
-        'claim',
-        resource,
-        'working',
-        f'Claimed {resource} - ETA {estimated_minutes} minutes',
-        json.dumps({'estimated_minutes': estimated_minutes}),
-        datetime.now(),
-        datetime.now() + timedelta(minutes=10)
-    ))
-    conn.commit()
-    conn.close()
+    # The log row is an audit trail only; the lease is the source of truth
+    client.log_agent_action(
+        agent_name, 'claim', 'working', f'Claimed {resource} - ETA {estimated_minutes} minutes',
+        resource=resource, metadata={'estimated_minutes': estimated_minutes}, next_check_in_minutes=10,
+    )
 
     print(f"[CLAIMED] {resource} (ETA: {estimated_minutes} min)")
     return True
@@ -260,6 +533,11 @@ def check_in(agent_name, resource, progress_percent, message, metadata=None):
     """
     Report progress while working on a resource.
 
+    Also serves as the heartbeat that keeps this agent's lease on the
+    resource from expiring. If the resource has a lease this agent could
+    not renew (it expired or another agent claimed the resource) a warning
+    is printed and a conflict is logged; unclaimed resources are ignored.
+
     Args:
         agent_name: Name of agent
         resource: Resource being worked on
@@ -267,45 +545,37 @@ def check_in(agent_name, resource, progress_percent, message, metadata=None):
         message: Status message
         metadata: Optional dict of additional data
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
+    client = get_client()
 
     if metadata is None:
         metadata = {}
 
     metadata['progress_percent'] = progress_percent
 
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, resource_claim, status,
-            message, metadata, check_in_time, next_check_in
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """, (
-        agent_name,
-        'progress',
-        resource,
-        'working',
-        message,
-        json.dumps(metadata),
-        datetime.now(),
-        datetime.now() + timedelta(minutes=10)
-    ))
-    conn.commit()
-
-    # Check for new help requests
-    cur.execute("""
-        SELECT COUNT(*) FROM ascent_basecamp_agent_log
-        WHERE action_type = 'help'
-          AND status IN ('blocked', 'waiting')
-          AND metadata->>'help_needed_from' = %s
-          AND timestamp > NOW() - INTERVAL '1 hour'
-    """, (agent_name,))
+    # Progress rows are batched by the background writer
+    client.log_agent_action(
+        agent_name, 'progress', 'working', message,
+        resource=resource, metadata=metadata, next_check_in_minutes=10,
+    )
 
-    help_count = cur.fetchone()[0]
-    conn.close()
+    # Renew our lease and check for new help requests in one round trip
+    heartbeat = client.query('heartbeat', (
+        LEASE_TTL_MINUTES, resource, agent_name, resource, agent_name,
+    ), fetch='one')
+    help_count = heartbeat['help_count']
 
     print(f"[CHECK-IN] {resource} - {progress_percent}% - {message}")
 
+    if heartbeat['leased'] and not heartbeat['renewed']:
+        # A lease exists but was not renewed: ours lapsed or another agent
+        # holds it. Resources that were never claimed have no lease row.
+        print(f"   [WARN] No live lease on {resource} - it expired or another agent claimed it. "
+              f"Call claim_resource() again before continuing.")
+        client.log_error(
+            agent_name, 'conflict',
+            f'Check-in on {resource} found no live lease (expired or claimed by another agent)',
+        )
+
     if help_count > 0:
         print(f"   [ALERT] {help_count} new help requests! Consider pausing current work.")
 
@@ -314,7 +584,7 @@ def check_in(agent_name, resource, progress_percent, message, metadata=None):
 
 def release_resource(agent_name, resource, outcome_message, metadata=None):
     """
-    Release resource when done.
+    Release resource when done, dropping this agent's lease on it.
 
     Args:
         agent_name: Name of agent
@@ -322,32 +592,34 @@ def release_resource(agent_name, resource, outcome_message, metadata=None):
         outcome_message: Description of outcome
         metadata: Optional dict with results
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
     if metadata is None:
         metadata = {}
 
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, resource_claim, status,
-            message, metadata, check_in_time
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """, (
-        agent_name,
-        'complete',
-        resource,
-        'done',
-        outcome_message,
-        json.dumps(metadata),
-        datetime.now()
-    ))
-    conn.commit()
-    conn.close()
+    client = get_client()
+    # Dropped synchronously so another agent can claim it straight away
+    client.query('release_lease', (resource, agent_name), fetch=None)
+    client.log_agent_action(
+        agent_name, 'complete', 'done', outcome_message,
+        resource=resource, metadata=metadata,
+    )
 
     print(f"[RELEASED] {resource} - {outcome_message}")
 
 
+def list_active_leases(exclude_agent=None):
+    """
+    List unexpired resource leases, newest first.
+
+    Args:
+        exclude_agent: Optional agent whose own leases are left out
+
+    Returns:
+        list: dicts with agent_name, resource_claim, status, timestamp,
+              heartbeat_at and expires_at
+    """
+    return [dict(row) for row in get_client().query('active_leases', (exclude_agent or '',))]
+
+
 def request_help(agent_name, help_from, reason, priority='medium', metadata=None):
     """
     Request help from another agent.
@@ -362,31 +634,14 @@ def request_help(agent_name, help_from, reason, priority='medium', metadata=None
     Returns:
         int: log_id of help request
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
     if metadata is None:
         metadata = {}
 
     metadata['help_needed_from'] = help_from
     metadata['priority'] = priority
 
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, status, message, metadata
-        ) VALUES (%s, %s, %s, %s, %s)
-        RETURNING log_id;
-    """, (
-        agent_name,
-        'help',
-        'blocked',
-        reason,
-        json.dumps(metadata)
-    ))
-
-    log_id = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
+    # Written synchronously: the helper's next check-in must see it
+    log_id = get_client().query('insert_help', (agent_name, reason, json.dumps(metadata)), fetch='one')[0]
 
     print(f"[HELP REQUESTED] From {help_from}")
     print(f"   Reason: {reason}")
@@ -405,30 +660,14 @@ def resolve_help_request(agent_name, request_log_id, resolution_message):
         request_log_id: ID of original help request
         resolution_message: Description of resolution
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        UPDATE ascent_basecamp_agent_log
-        SET status = 'resolved',
-            resolution = %s
-        WHERE log_id = %s;
-    """, (resolution_message, request_log_id))
-
-    cur.execute("""
-        INSERT INTO ascent_basecamp_agent_log (
-            agent_name, action_type, status, message, metadata
-        ) VALUES (%s, %s, %s, %s, %s)
-    """, (
-        agent_name,
-        'complete',
-        'done',
-        f'Resolved help request #{request_log_id}',
-        json.dumps({'resolved_request_id': request_log_id})
-    ))
-
-    conn.commit()
-    conn.close()
+    get_client().transaction([
+        ('resolve_help', (resolution_message, request_log_id)),
+        ('insert_resolution', (
+            agent_name,
+            f'Resolved help request #{request_log_id}',
+            json.dumps({'resolved_request_id': request_log_id}),
+        )),
+    ])
 
     print(f"[RESOLVED] Help request #{request_log_id} - {resolution_message}")
 
@@ -446,30 +685,17 @@ def log_error(agent_name, error_type, error_message, severity='medium', stack_tr
         metadata: Optional dict with additional context
 
     Returns:
-        int: error_id
+        int: error_id, or None if the write is not confirmed within LOG_RESULT_TIMEOUT
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        INSERT INTO error_log (
-            agent_name, error_type, error_message,
-            stack_trace, severity, resolution_status, metadata
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING error_id;
-    """, (
-        agent_name,
-        error_type,
-        error_message,
-        stack_trace,
-        severity,
-        'unresolved',
-        json.dumps(metadata) if metadata else None
-    ))
-
-    error_id = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
+    # Batched with any queued log rows; flushed now so the id can be returned
+    future = get_client().log_error(
+        agent_name, error_type, error_message, severity, stack_trace, metadata, urgent=True
+    )
+    try:
+        error_id = future.result(timeout=LOG_RESULT_TIMEOUT)
+    except FutureTimeoutError:
+        print(f"[WARN] log_error not confirmed within {LOG_RESULT_TIMEOUT:.0f}s; the row stays queued")
+        return None
 
     print(f"[ERROR LOGGED] #{error_id} - {error_type} - {severity}")
     print(f"   {error_message}")
@@ -491,31 +717,17 @@ def log_decision(agent_name, decision_type, decision, rationale, impact='medium'
         metadata: Optional dict with additional context
 
     Returns:
-        int: decision_id
+        int: decision_id, or None if the write is not confirmed within LOG_RESULT_TIMEOUT
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        INSERT INTO technical_decisions (
-            agent_name, decision_type, decision,
-            rationale, alternatives_considered, impact, status, metadata
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING decision_id;
-    """, (
-        agent_name,
-        decision_type,
-        decision,
-        rationale,
-        alternatives,
-        impact,
-        'proposed',
-        json.dumps(metadata) if metadata else None
-    ))
-
-    decision_id = cur.fetchone()[0]
-    conn.commit()
-    conn.close()
+    # Batched with any queued log rows; flushed now so the id can be returned
+    future = get_client().log_decision(
+        agent_name, decision_type, decision, rationale, impact, alternatives, metadata, urgent=True
+    )
+    try:
+        decision_id = future.result(timeout=LOG_RESULT_TIMEOUT)
+    except FutureTimeoutError:
+        print(f"[WARN] log_decision not confirmed within {LOG_RESULT_TIMEOUT:.0f}s; the row stays queued")
+        return None
 
     print(f"[DECISION LOGGED] #{decision_id} - {decision_type} - {impact} impact")
     print(f"   Decision: {decision}")
@@ -4,6 +4,7 @@ SQLAlchemy declarative models for FRAMES migration (Milestone A)
 These models mirror the lightweight dataclasses in `models.py` and are
 intended for use by the migration CLI and future DB-backed endpoints.
 """
+import gzip
 from datetime import datetime
 from backend.database import db
 
@@ -473,10 +474,18 @@ class Module(db.Model):
     # Metadata
     target_audience = db.Column(db.String(100), default='incoming_students')
     revision = db.Column(db.Integer, default=1)
+    content_hash = db.Column(db.String(64))  # sha256 over metadata + section hashes, set on deploy
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = db.Column(db.DateTime)
 
+    sections = db.relationship(
+        'ModuleSection',
+        order_by='ModuleSection.section_number',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -493,12 +502,28 @@ class Module(db.Model):
             'tags': self.tags or [],
             'target_audience': self.target_audience,
             'revision': self.revision,
+            'content_hash': self.content_hash,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'published_at': self.published_at.isoformat() if self.published_at else None,
         }
 
 
+class ModuleContentBlob(db.Model):
+    """Section bodies stored once per content hash, gzip-compressed when large"""
+    __tablename__ = 'module_content_blobs'
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # sha256 of the uncompressed text
+    encoding = db.Column(db.String(10), nullable=False, default='identity')  # identity, gzip
+    body = db.Column(db.LargeBinary, nullable=False)
+    size = db.Column(db.Integer, nullable=False)  # uncompressed bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def text(self):
+        data = gzip.decompress(self.body) if self.encoding == 'gzip' else self.body
+        return data.decode('utf-8')
+
+
 class ModuleSection(db.Model):
     """Content sections within a module"""
     __tablename__ = 'module_sections'
@@ -508,11 +533,22 @@ class ModuleSection(db.Model):
     section_number = db.Column(db.Integer, nullable=False)
     section_type = db.Column(db.String(50), nullable=False)  # text, video, image, checklist, etc.
     title = db.Column(db.String(255))
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text)  # legacy inline body; new sections reference content_hash
+    content_hash = db.Column(db.String(64), db.ForeignKey('module_content_blobs.content_hash'), index=True)
+    content_size = db.Column(db.Integer)
     media_url = db.Column(db.String(500))
     duration_seconds = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    blob = db.relationship('ModuleContentBlob', lazy='select')
+
+    @property
+    def body(self):
+        """Section text, from the content store or the legacy inline column"""
+        if self.content_hash:
+            return self.blob.text()
+        return self.content
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -520,7 +556,8 @@ class ModuleSection(db.Model):
             'section_number': self.section_number,
             'section_type': self.section_type,
             'title': self.title,
-            'content': self.content,
+            'content': self.body,
+            'content_hash': self.content_hash,
             'media_url': self.media_url,
             'duration_seconds': self.duration_seconds,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -530,6 +567,10 @@ class ModuleSection(db.Model):
 class ModuleAssignment(db.Model):
     """Assignment of modules to students"""
     __tablename__ = 'module_assignments'
+    __table_args__ = (
+        db.UniqueConstraint('module_id', 'student_id', name='uq_module_assignment_student'),
+        db.Index('ix_module_assignments_due_required', 'due_date', 'required'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     module_id = db.Column(db.Integer, db.ForeignKey('modules.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -551,6 +592,35 @@ class ModuleAssignment(db.Model):
         }
 
 
+class AssignmentNotification(db.Model):
+    """Due-soon and overdue reminders written by the due-date scanner"""
+    __tablename__ = 'assignment_notifications'
+    __table_args__ = (
+        db.UniqueConstraint('assignment_id', 'kind', name='uq_assignment_notification_kind'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    assignment_id = db.Column(db.Integer, db.ForeignKey('module_assignments.id', ondelete='CASCADE'), nullable=False)
+    student_id = db.Column(db.String, db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
+    module_id = db.Column(db.Integer, db.ForeignKey('modules.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # due_soon, overdue
+    due_date = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'assignment_id': self.assignment_id,
+            'student_id': self.student_id,
+            'module_id': self.module_id,
+            'kind': self.kind,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'read_at': self.read_at.isoformat() if self.read_at else None,
+        }
+
+
 class ModuleProgress(db.Model):
     """Student progress through modules"""
     __tablename__ = 'module_progress'
@@ -662,3 +732,56 @@ class ModuleFeedback(db.Model):
         }
 
 
+
+
+class ModuleStats(db.Model):
+    """Running aggregates per module, maintained on feedback and progress writes"""
+    __tablename__ = 'module_stats'
+
+    module_id = db.Column(db.Integer, db.ForeignKey('modules.id', ondelete='CASCADE'), primary_key=True)
+
+    # Feedback aggregates
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_count = db.Column(db.Integer, nullable=False, default=0)
+    clarity_sum = db.Column(db.Integer, nullable=False, default=0)
+    clarity_count = db.Column(db.Integer, nullable=False, default=0)
+    usefulness_sum = db.Column(db.Integer, nullable=False, default=0)
+    usefulness_count = db.Column(db.Integer, nullable=False, default=0)
+    difficulty_counts = db.Column(db.JSON, default=dict)  # {too_easy: n, just_right: n, too_hard: n}
+
+    # Progress aggregates
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+    total_time_seconds = db.Column(db.Integer, nullable=False, default=0)
+    status_counts = db.Column(db.JSON, default=dict)  # {not_started: n, in_progress: n, completed: n}
+    section_completions = db.Column(db.JSON, default=dict)  # {section_number: n}
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def completed_count(self):
+        return (self.status_counts or {}).get('completed', 0)
+
+    def feedback_aggregate(self):
+        def avg(total, count):
+            return round(total / count, 2) if count else None
+
+        return {
+            'avg_rating': avg(self.rating_sum, self.rating_count),
+            'avg_clarity': avg(self.clarity_sum, self.clarity_count),
+            'avg_usefulness': avg(self.usefulness_sum, self.usefulness_count),
+            'difficulty_breakdown': self.difficulty_counts or {},
+        }
+
+    def to_dict(self):
+        return {
+            'module_id': self.module_id,
+            'feedback_count': self.feedback_count,
+            'aggregate': self.feedback_aggregate(),
+            'student_count': self.student_count,
+            'completed_count': self.completed_count,
+            'total_time_seconds': self.total_time_seconds,
+            'status_counts': self.status_counts or {},
+            'section_completions': self.section_completions or {},
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }